@@ -2,13 +2,54 @@
 Main Agent Module - ReAct Agent implementing Plan-and-Execute architecture
 """
 
-import json
 import asyncio
-from typing import Dict, List, Any, Optional, AsyncGenerator, Union, Callable
-from dataclasses import dataclass
+import time
+import orjson
+from collections import deque
+from typing import Dict, List, Any, Optional, AsyncGenerator, Union, Callable, Tuple
+from dataclasses import dataclass, field
+from langchain.schema import SystemMessage, HumanMessage
+from config import settings
+from utils.logging_config import get_logger
 from .planner import Planner, ExecutionPlan, PlanStep
 from .executor import Executor, ExecutionResult
 from .tools import Tool
+from .plan_cache import PlanCache, context_fingerprint, request_fingerprint
+from .llm_clients import get_chat_model
+
+logger = get_logger(__name__)
+
+# Upper bounds on step observations / the execution summary in the final-response prompt
+MAX_OBSERVATION_CHARS = 500
+MAX_SUMMARY_CHARS = 1500
+
+# Single-step LLM answers shorter than this are returned without a synthesis call
+TRIVIAL_RESPONSE_MAX_CHARS = 400
+
+# Final response prompts; the system message never changes so it is built once
+FINAL_RESPONSE_SYSTEM_MESSAGE = SystemMessage(content="""You are an expert reasoning assistant. You have just completed detailed internal reasoning about the user's request and executed a comprehensive plan. 
+
+Now provide your final, well-reasoned response that addresses their question comprehensively based on your analysis and execution results. Be clear, helpful, and direct.
+
+MANDATORY CITATION RULES:
+- For every fact from retrieved documents, use citation tokens: [[doc:X, seg:Y]] where X is document ID and Y is segment ordinal
+- Look for document context in format: {Document Title} [Document ID: X] and snippets with [§ordinal]
+- Use the EXACT Document ID from brackets and EXACT segment ordinal from [§ordinal]
+- Example: If you see "{Document ABC} [Document ID: 456]" and "[§7] Some text", cite as [[doc:456, seg:7]]
+- Always include citation tokens for verifiable facts from documents
+
+Do not mention the internal planning or execution process - just provide the final answer as if you reasoned through it naturally.""")
+
+FINAL_RESPONSE_USER_TEMPLATE = """User's original request: "{user_message}"
+
+Plan objective: {objective}
+
+{retrieved_context}
+
+Execution results summary:
+{execution_summary}
+
+Based on the retrieved information and execution results, provide a comprehensive response to the user's request. Use specific details from the retrieved documents and cite sources where appropriate."""
 
 
 @dataclass
@@ -22,14 +63,39 @@ class AgentResponse:
     error: Optional[str] = None
 
 
+def _truncate_middle(text: str, max_chars: int) -> str:
+    """Shorten text to about max_chars, keeping its beginning and end"""
+    if len(text) <= max_chars:
+        return text
+    half = max_chars // 2
+    return f"{text[:half]} ... [truncated] ... {text[-half:]}"
+
+
+@dataclass(slots=True)
+class _HistoryEntry:
+    """A processed request kept in session history, serialized on demand"""
+    user_message: str
+    plan: ExecutionPlan
+    execution_results: List[ExecutionResult]
+    response: str
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "user_message": self.user_message,
+            "plan": self.plan.to_dict(),
+            "results": [r.to_dict() for r in self.execution_results],
+            "response": self.response
+        }
+
+
+@dataclass(slots=True)
 class StreamingEvent:
     """Represents a streaming event from the agent"""
-    
-    def __init__(self, event_type: str, content: str, data: Dict[str, Any] = None):
-        self.type = event_type
-        self.content = content
-        self.data = data or {}
-        self.timestamp = asyncio.get_event_loop().time()
+    type: str
+    content: str
+    data: Dict[str, Any] = field(default_factory=dict)
+    timestamp: float = field(default_factory=time.monotonic)
+    _sse_bytes: Optional[bytes] = field(default=None, init=False, repr=False, compare=False)
     
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -39,9 +105,20 @@ class StreamingEvent:
             **self.data
         }
     
+    @property
+    def sse_bytes(self) -> bytes:
+        """Server-Sent Events frame, serialized once and reused"""
+        if self._sse_bytes is None:
+            self._sse_bytes = b"data: " + orjson.dumps(self.to_dict(), default=str) + b"\n\n"
+        return self._sse_bytes
+    
+    def to_sse_bytes(self) -> bytes:
+        """Convert to Server-Sent Events format as bytes"""
+        return self.sse_bytes
+    
     def to_sse_format(self) -> str:
         """Convert to Server-Sent Events format"""
-        return f"data: {json.dumps(self.to_dict())}\n\n"
+        return self.sse_bytes.decode("utf-8")
 
 
 class ReActAgent:
@@ -57,7 +134,10 @@ class ReActAgent:
                  planner_temperature: float = 0.1,
                  executor_temperature: float = None,
                  planner: Optional[Planner] = None,
-                 executor: Optional[Executor] = None):
+                 executor: Optional[Executor] = None,
+                 plan_cache_enabled: bool = True,
+                 plan_cache: Optional[PlanCache] = None,
+                 max_step_concurrency: int = 4):
         """
         Initialize the ReAct Agent
         
@@ -67,10 +147,27 @@ class ReActAgent:
             executor_temperature: Temperature for execution (higher = more creative)
             planner: Optional injected planner instance
             executor: Optional injected executor instance
+            plan_cache_enabled: Whether to reuse plans for repeated requests
+            plan_cache: Optional injected plan cache instance
+            max_step_concurrency: Maximum number of independent plan steps run at once
         """
         self.planner = planner or Planner(model_name, planner_temperature)
         self.executor = executor or Executor(model_name, executor_temperature)
-        self.session_history = []
+        self.session_history: "deque[_HistoryEntry]" = deque(maxlen=settings.agent.history_max_entries)
+        self._step_semaphore = asyncio.Semaphore(max_step_concurrency)
+        
+        # Shared LLM client for final response generation
+        self._response_llm = get_chat_model(settings.MODEL_NAME, settings.MODEL_TEMPERATURE)
+        
+        if plan_cache_enabled:
+            # An injected cache may still be empty (and therefore falsy)
+            self.plan_cache = plan_cache if plan_cache is not None else PlanCache(
+                db_path=settings.agent.plan_cache_path,
+                max_entries=settings.agent.plan_cache_max_entries,
+                ttl_sec=settings.agent.plan_cache_ttl_sec
+            )
+        else:
+            self.plan_cache = None
         
     async def process_request(self, 
                             user_message: str, 
@@ -87,12 +184,16 @@ class ReActAgent:
         Returns:
             AgentResponse: Complete response with plan, results, and final content
         """
+        started: Dict[PlanStep, asyncio.Task] = {}
         try:
             # Phase 1: Planning
-            plan = await self.planner.create_plan(user_message, has_image, context)
+            plan, cache_key = await self._plan_request(
+                user_message, has_image, context, self._step_prefetcher(context, started)
+            )
             
             # Phase 2: Execution
-            execution_results = await self.executor.execute_plan(plan)
+            execution_results = await self.executor.execute_plan(plan, started=started)
+            self._cache_plan(cache_key, plan, execution_results)
             
             # Phase 3: Response Generation
             final_content = await self._generate_final_response(
@@ -100,12 +201,11 @@ class ReActAgent:
             )
             
             # Store in session history
-            self.session_history.append({
-                "user_message": user_message,
-                "plan": plan.to_dict(),
-                "results": [r.to_dict() for r in execution_results],
-                "response": final_content
-            })
+            self.session_history.append(
+                _HistoryEntry(user_message, plan, execution_results, final_content)
+            )
+            
+            successful_steps, execution_time = self._tally_results(execution_results)
             
             return AgentResponse(
                 content=final_content,
@@ -113,13 +213,14 @@ class ReActAgent:
                 execution_results=execution_results,
                 metadata={
                     "total_steps": len(plan.steps),
-                    "successful_steps": sum(1 for r in execution_results if r.success),
-                    "execution_time": sum(r.execution_time for r in execution_results),
+                    "successful_steps": successful_steps,
+                    "execution_time": execution_time,
                     "plan_status": plan.status
                 }
             )
             
         except Exception as e:
+            self._cancel_started(started)
             return AgentResponse(
                 content=f"I encountered an error while processing your request: {str(e)}",
                 plan=None,
@@ -144,6 +245,7 @@ class ReActAgent:
         Yields:
             StreamingEvent: Real-time events during processing
         """
+        started: Dict[PlanStep, asyncio.Task] = {}
         try:
             step_counter = 0
             
@@ -153,30 +255,40 @@ class ReActAgent:
                 return step_counter
             
             # Phase 1: Planning (internal, no UI output)
-            plan = await self.planner.create_plan(user_message, has_image, context)
+            plan, cache_key = await self._plan_request(
+                user_message, has_image, context, self._step_prefetcher(context, started)
+            )
             
             execution_results = []
             
-            for i, step in enumerate(plan.steps):
-                yield StreamingEvent(
-                    "thinking_step",
-                    step.action,
-                    {"step": next_step(), "total_steps": len(plan.steps)}
-                )
-                
-                try:
-                    result = await self.executor.execute_step(step, context or {})
-                    execution_results.append(result)
-                    
-                except Exception as e:
+            # Steps within a wave are independent of each other and run concurrently
+            for wave in plan.get_execution_waves():
+                for step in wave:
                     yield StreamingEvent(
                         "thinking_step",
-                        f"⚠ ERROR: {str(e)[:100]}...",
+                        step.action,
                         {"step": next_step(), "total_steps": len(plan.steps)}
                     )
+                
+                outcomes = await asyncio.gather(
+                    *(started.pop(step, None) or self._execute_step_bounded(step, context or {}) for step in wave),
+                    return_exceptions=True
+                )
+                
+                for outcome in outcomes:
+                    if isinstance(outcome, BaseException):
+                        yield StreamingEvent(
+                            "thinking_step",
+                            f"⚠ ERROR: {str(outcome)[:100]}...",
+                            {"step": next_step(), "total_steps": len(plan.steps)}
+                        )
+                    else:
+                        execution_results.append(outcome)
+            
+            self._cache_plan(cache_key, plan, execution_results)
             
             # Phase 3: Completion
-            success_count = sum(1 for result in execution_results if result.success)
+            success_count, _ = self._tally_results(execution_results)
             total_steps = len(execution_results)
             
             yield StreamingEvent(
@@ -198,11 +310,15 @@ class ReActAgent:
                 {}
             )
             
-            final_content = await self._generate_final_response(
+            # Stream the final response token by token as it is generated
+            response_parts = []
+            async for token in self._stream_final_response(
                 user_message, plan, execution_results, context
-            )
+            ):
+                response_parts.append(token)
+                yield StreamingEvent("response_chunk", token, {})
             
-            # Stream the final response (could be enhanced to stream token by token)
+            final_content = "".join(response_parts)
             yield StreamingEvent(
                 "response_complete",
                 final_content,
@@ -216,93 +332,242 @@ class ReActAgent:
             )
             
         except Exception as e:
+            self._cancel_started(started)
             yield StreamingEvent(
                 "error",
                 f"An error occurred: {str(e)}",
                 {"error": str(e)}
             )
     
-    async def _generate_final_response(self, 
-                                     user_message: str,
-                                     plan: ExecutionPlan,
-                                     execution_results: List[ExecutionResult],
-                                     context: Dict[str, Any] = None) -> str:
+    @staticmethod
+    def _tally_results(execution_results: List[ExecutionResult]) -> Tuple[int, float]:
+        """Count successful steps and total execution time in a single pass"""
+        successful = 0
+        total_time = 0.0
+        for result in execution_results:
+            if result.success:
+                successful += 1
+            total_time += result.execution_time
+        return successful, total_time
+    
+    async def _execute_step_bounded(self, step: PlanStep, context: Dict[str, Any]) -> ExecutionResult:
+        """Execute a step while respecting the step concurrency limit"""
+        async with self._step_semaphore:
+            return await self.executor.execute_step(step, context)
+    
+    def _step_prefetcher(self,
+                         context: Optional[Dict[str, Any]],
+                         started: Dict[PlanStep, asyncio.Task]) -> Optional[Callable[[int, PlanStep], None]]:
         """
-        Generate the final response based on plan execution results
+        Build a planner callback that starts steps while the rest of the plan streams in
+        
+        Steps without prerequisites are started as soon as they arrive and
+        recorded in started, so the first search overlaps the planning call.
+        Returns None when plan streaming is disabled.
+        """
+        if not settings.agent.planner_streaming:
+            return None
+        
+        def on_step(index: int, step: PlanStep):
+            if not ExecutionPlan.step_dependencies(index, step):
+                started[step] = asyncio.create_task(self._execute_step_bounded(step, context or {}))
+        
+        return on_step
+    
+    @staticmethod
+    def _cancel_started(started: Dict[PlanStep, asyncio.Task]):
+        """Cancel steps started during planning that will never be awaited"""
+        for task in started.values():
+            task.cancel()
+        started.clear()
+    
+    async def _plan_request(self,
+                            user_message: str,
+                            has_image: bool,
+                            context: Dict[str, Any] = None,
+                            on_step: Optional[Callable[[int, PlanStep], None]] = None) -> Tuple[ExecutionPlan, Optional[str]]:
+        """
+        Create a plan, reusing the cached plan for a repeated request
+        
+        Args:
+            user_message: The user's input message
+            has_image: Whether an image was uploaded
+            context: Additional context for planning
+            on_step: Optional callback for each step as a freshly generated plan streams in
+            
+        Returns:
+            Tuple of the plan and the cache key to store it under (None if caching is off)
+        """
+        if self.plan_cache is None:
+            return await self.planner.create_plan(user_message, has_image, context, on_step=on_step), None
+        
+        try:
+            context_key = context_fingerprint(has_image, context, getattr(self.planner, "cache_key", ""))
+            fingerprint = request_fingerprint(user_message, context_key)
+            
+            # Cached steps name the entities of the request they were planned for,
+            # so only an exact repeat of the request may reuse them
+            hit = self.plan_cache.get(fingerprint)
+            if hit:
+                logger.info("Plan cache hit, skipping planner")
+                return ExecutionPlan.from_dict(hit.plan, context), None
+        except Exception as e:
+            logger.warning(f"Plan cache lookup failed: {str(e)}")
+            fingerprint = None
+        
+        return await self.planner.create_plan(user_message, has_image, context, on_step=on_step), fingerprint
+    
+    def _cache_plan(self,
+                    cache_key: Optional[str],
+                    plan: ExecutionPlan,
+                    execution_results: List[ExecutionResult]):
+        """Store a freshly created plan if every step executed successfully"""
+        if not cache_key or not execution_results or not all(r.success for r in execution_results):
+            return
+        
+        try:
+            self.plan_cache.store(cache_key, plan.to_template())
+        except Exception as e:
+            logger.warning(f"Failed to cache plan: {str(e)}")
+    
+    @staticmethod
+    def _shortcut_final_response(execution_results: List[ExecutionResult]) -> Optional[str]:
+        """
+        Return a final response directly when an LLM synthesis call cannot add anything
         
         Args:
-            user_message: Original user message
-            plan: Execution plan that was used
             execution_results: Results from executing the plan
-            context: Additional context
             
         Returns:
-            Final response content
+            Final response content, or None if the response must be synthesized
         """
-        from langchain_openai import ChatOpenAI
-        from langchain.schema import SystemMessage, HumanMessage
-        from config import settings
+        if not execution_results:
+            return "I couldn't execute any plan steps. Please rephrase your request."
         
-        # Use a separate LLM instance for final response generation
-        response_llm = ChatOpenAI(
-            model=settings.MODEL_NAME,
-            temperature=settings.MODEL_TEMPERATURE,
-            openai_api_key=settings.OPENAI_API_KEY
-        )
+        if not any(r.success for r in execution_results):
+            errors = "; ".join(r.error or "unknown error" for r in execution_results[:3])
+            return f"I attempted {len(execution_results)} step(s) but all of them failed: {errors}"
+        
+        if len(execution_results) == 1:
+            result = execution_results[0]
+            # A single direct LLM answer is already a well-formed response
+            if (result.success and not result.step.tool_needed
+                    and isinstance(result.result, str) and len(result.result) < TRIVIAL_RESPONSE_MAX_CHARS):
+                return result.result
         
+        return None
+    
+    def _build_final_response_messages(self,
+                                       user_message: str,
+                                       plan: ExecutionPlan,
+                                       execution_results: List[ExecutionResult]) -> List[Union[SystemMessage, HumanMessage]]:
+        """Build the prompt messages for the final response from the execution results"""
         # Build context from execution results
-        execution_summary = ""
-        retrieved_context = ""
+        step_summaries = []
+        context_parts = []
         
         for i, result in enumerate(execution_results):
             status = "✓" if result.success else "✗"
-            execution_summary += f"{status} Step {i+1}: {result.step.action}\n"
+            lines = [f"{status} Step {i+1}: {result.step.action}"]
             
             # Extract retrieved document context if available
             if result.success and isinstance(result.result, dict) and "context" in result.result:
-                retrieved_context += f"\n--- Retrieved Information ---\n{result.result['context']}\n"
+                context_parts.append(f"\n--- Retrieved Information ---\n{result.result['context']}\n")
             
             if result.observations:
-                execution_summary += f"  Result: {result.observations[0]}\n"
+                lines.append(f"  Result: {_truncate_middle(result.observations[0], MAX_OBSERVATION_CHARS)}")
             if result.error:
-                execution_summary += f"  Error: {result.error}\n"
-            execution_summary += "\n"
+                lines.append(f"  Error: {result.error}")
+            lines.append("")
+            step_summaries.append("\n".join(lines))
         
-        system_prompt = """You are an expert reasoning assistant. You have just completed detailed internal reasoning about the user's request and executed a comprehensive plan. 
-
-Now provide your final, well-reasoned response that addresses their question comprehensively based on your analysis and execution results. Be clear, helpful, and direct.
-
-MANDATORY CITATION RULES:
-- For every fact from retrieved documents, use citation tokens: [[doc:X, seg:Y]] where X is document ID and Y is segment ordinal
-- Look for document context in format: {Document Title} [Document ID: X] and snippets with [§ordinal]
-- Use the EXACT Document ID from brackets and EXACT segment ordinal from [§ordinal]
-- Example: If you see "{Document ABC} [Document ID: 456]" and "[§7] Some text", cite as [[doc:456, seg:7]]
-- Always include citation tokens for verifiable facts from documents
-
-Do not mention the internal planning or execution process - just provide the final answer as if you reasoned through it naturally."""
+        # Keep the opening and closing steps when the summary would dominate the prompt
+        if len(step_summaries) > 4 and sum(len(summary) for summary in step_summaries) > MAX_SUMMARY_CHARS:
+            omitted = len(step_summaries) - 4
+            logger.debug(f"Omitting {omitted} intermediate steps from final response summary")
+            step_summaries = step_summaries[:2] + [f"... {omitted} intermediate steps omitted ...\n"] + step_summaries[-2:]
         
-        user_prompt = f"""User's original request: "{user_message}"
-
-Plan objective: {plan.objective}
-
-{retrieved_context}
-
-Execution results summary:
-{execution_summary}
-
-Based on the retrieved information and execution results, provide a comprehensive response to the user's request. Use specific details from the retrieved documents and cite sources where appropriate."""
+        execution_summary = "\n".join(step_summaries)
+        retrieved_context = "".join(context_parts)
+        
+        user_prompt = FINAL_RESPONSE_USER_TEMPLATE.format(
+            user_message=user_message,
+            objective=plan.objective,
+            retrieved_context=retrieved_context,
+            execution_summary=execution_summary
+        )
         
-        messages = [
-            SystemMessage(content=system_prompt),
+        return [
+            FINAL_RESPONSE_SYSTEM_MESSAGE,
             HumanMessage(content=user_prompt)
         ]
+    
+    async def _generate_final_response(self, 
+                                     user_message: str,
+                                     plan: ExecutionPlan,
+                                     execution_results: List[ExecutionResult],
+                                     context: Dict[str, Any] = None) -> str:
+        """
+        Generate the final response based on plan execution results
+        
+        Args:
+            user_message: Original user message
+            plan: Execution plan that was used
+            execution_results: Results from executing the plan
+            context: Additional context
+            
+        Returns:
+            Final response content
+        """
+        shortcut = self._shortcut_final_response(execution_results)
+        if shortcut is not None:
+            return shortcut
+        
+        messages = self._build_final_response_messages(user_message, plan, execution_results)
         
         try:
-            response = response_llm.invoke(messages)
+            async with asyncio.timeout(settings.openai.timeout_sec):
+                response = await self._response_llm.ainvoke(messages)
             return response.content
+        except asyncio.TimeoutError:
+            return "I've analyzed your request thoroughly, but generating the final response timed out. Please try again."
         except Exception as e:
             return f"I've analyzed your request thoroughly, but encountered an issue generating the final response: {str(e)}"
     
+    async def _stream_final_response(self,
+                                     user_message: str,
+                                     plan: ExecutionPlan,
+                                     execution_results: List[ExecutionResult],
+                                     context: Dict[str, Any] = None) -> AsyncGenerator[str, None]:
+        """
+        Stream the final response token by token
+        
+        Args:
+            user_message: Original user message
+            plan: Execution plan that was used
+            execution_results: Results from executing the plan
+            context: Additional context
+            
+        Yields:
+            Chunks of the final response content
+        """
+        shortcut = self._shortcut_final_response(execution_results)
+        if shortcut is not None:
+            yield shortcut
+            return
+        
+        messages = self._build_final_response_messages(user_message, plan, execution_results)
+        
+        try:
+            async with asyncio.timeout(settings.openai.timeout_sec):
+                async for chunk in self._response_llm.astream(messages):
+                    if chunk.content:
+                        yield chunk.content
+        except asyncio.TimeoutError:
+            yield "I've analyzed your request thoroughly, but generating the final response timed out. Please try again."
+        except Exception as e:
+            yield f"I've analyzed your request thoroughly, but encountered an issue generating the final response: {str(e)}"
+    
     def add_tool(self, name: str, tool: Tool):
         """Add a custom tool to the executor"""
         self.executor.add_tool(name, tool)
@@ -317,8 +582,8 @@ Based on the retrieved information and execution results, provide a comprehensiv
     
     def get_session_history(self) -> List[Dict[str, Any]]:
         """Get the session history"""
-        return self.session_history
+        return [entry.to_dict() for entry in self.session_history]
     
     def clear_session(self):
         """Clear the session history"""
-        self.session_history = []
\ No newline at end of file
+        self.session_history.clear()
\ No newline at end of file
@@ -2,13 +2,16 @@
 Agent factory for creating agents with dependency injection.
 """
 
-from typing import Optional, Dict, Any
+from collections import OrderedDict
+from typing import Optional, Dict, Any, Tuple
 from agent.agent import ReActAgent
+from agent.plan_cache import PlanCache
 from agent.planner import Planner
 from agent.executor import Executor
 from agent.rag_tool import RAGTool
 from agent.document_analysis_tool import DocumentAnalysisTool
 from services.service_container import service_container, get_search_service, get_analysis_service
+from config import settings
 from utils.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -17,8 +20,16 @@ logger = get_logger(__name__)
 class AgentFactory:
     """Factory for creating agents with proper dependency injection."""
     
+    # Maximum number of distinct executor configurations kept alive
+    MAX_CACHED_EXECUTORS = 8
+    
     def __init__(self):
         self.service_container = service_container
+        self._tools_cache: Optional[Dict[str, Any]] = None
+        self._analysis_tools_cache: Optional[Dict[str, Any]] = None
+        self._planner_cache: Dict[Tuple, Planner] = {}
+        self._executor_cache: "OrderedDict[Tuple, Executor]" = OrderedDict()
+        self._plan_cache: Optional[PlanCache] = None
     
     def create_react_agent(self, 
                           model_name: str = None,
@@ -28,6 +39,12 @@ class AgentFactory:
         """
         Create a ReAct agent with dependency injection.
         
+        Every call returns a new agent with its own session history, so the
+        factory can be used per request. Only the stateless parts are reused:
+        agents with the same model settings and tools share planner and
+        executor instances (so tools added via add_tool are visible to all of
+        them), and every agent shares one plan cache.
+        
         Args:
             model_name: LLM model to use
             planner_temperature: Temperature for planning
@@ -40,16 +57,29 @@ class AgentFactory:
         logger.info("Creating ReAct agent with dependency injection")
         
         # Create tools with dependency injection
-        tools = self._create_tools()
-        
-        # Add any custom tools
+        tools = {**self._create_tools(), **(custom_tools or {})}
         if custom_tools:
-            tools.update(custom_tools)
             logger.info(f"Added {len(custom_tools)} custom tools")
         
-        # Create planner and executor
-        planner = Planner(model_name, planner_temperature)
-        executor = Executor(model_name, executor_temperature, tools)
+        # Reuse planner and executor instances across agents with the same configuration
+        planner_key = (model_name, planner_temperature)
+        planner = self._planner_cache.get(planner_key)
+        if planner is None:
+            planner = self._planner_cache[planner_key] = Planner(model_name, planner_temperature)
+        
+        # Tools are keyed by identity; the cached executor keeps them alive
+        executor_key = (
+            model_name,
+            executor_temperature,
+            frozenset((name, id(tool)) for name, tool in tools.items())
+        )
+        executor = self._executor_cache.get(executor_key)
+        if executor is None:
+            executor = self._executor_cache[executor_key] = Executor(model_name, executor_temperature, tools)
+            if len(self._executor_cache) > self.MAX_CACHED_EXECUTORS:
+                self._executor_cache.popitem(last=False)
+        else:
+            self._executor_cache.move_to_end(executor_key)
         
         # Create agent
         agent = ReActAgent(
@@ -57,7 +87,8 @@ class AgentFactory:
             planner_temperature=planner_temperature,
             executor_temperature=executor_temperature,
             planner=planner,
-            executor=executor
+            executor=executor,
+            plan_cache=self._get_plan_cache()
         )
         
         logger.info("ReAct agent created successfully")
@@ -77,7 +108,7 @@ class AgentFactory:
         
         # Only include essential tools for speed
         tools = {
-            "search_documents": RAGTool(get_search_service())
+            "search_documents": self._create_tools()["search_documents"]
         }
         
         # Use faster temperatures
@@ -103,7 +134,22 @@ class AgentFactory:
         """
         logger.info("Creating analysis-specialized agent")
         
-        # Include analysis-focused tools
+        # Use balanced temperatures for analysis
+        agent = self.create_react_agent(
+            model_name=model_name,
+            planner_temperature=0.1,
+            executor_temperature=0.2,
+            custom_tools=self._create_analysis_tools()
+        )
+        
+        logger.info("Analysis agent created successfully")
+        return agent
+    
+    def _create_analysis_tools(self) -> Dict[str, Any]:
+        """Create analysis-focused tools once, so analysis agents share one executor."""
+        if self._analysis_tools_cache is not None:
+            return dict(self._analysis_tools_cache)
+        
         from services.interfaces import DocumentService, FrameworkService
         
         tools = {
@@ -115,19 +161,24 @@ class AgentFactory:
             )
         }
         
-        # Use balanced temperatures for analysis
-        agent = self.create_react_agent(
-            model_name=model_name,
-            planner_temperature=0.1,
-            executor_temperature=0.2,
-            custom_tools=tools
-        )
-        
-        logger.info("Analysis agent created successfully")
-        return agent
+        self._analysis_tools_cache = tools
+        return dict(tools)
+    
+    def _get_plan_cache(self) -> PlanCache:
+        """Plan cache shared by every agent this factory creates."""
+        if self._plan_cache is None:
+            self._plan_cache = PlanCache(
+                db_path=settings.agent.plan_cache_path,
+                max_entries=settings.agent.plan_cache_max_entries,
+                ttl_sec=settings.agent.plan_cache_ttl_sec
+            )
+        return self._plan_cache
     
     def _create_tools(self) -> Dict[str, Any]:
-        """Create standard tools with dependency injection."""
+        """Create standard tools with dependency injection, once per service configuration."""
+        if self._tools_cache is not None:
+            return dict(self._tools_cache)
+        
         tools = {
             "search_documents": RAGTool(get_search_service())
         }
@@ -140,7 +191,8 @@ class AgentFactory:
             logger.warning(f"Could not create document analysis tool: {str(e)}")
         
         logger.info(f"Created {len(tools)} standard tools")
-        return tools
+        self._tools_cache = tools
+        return dict(tools)
     
     def configure_services(self, **service_overrides):
         """
@@ -157,6 +209,12 @@ class AgentFactory:
             else:
                 self.service_container.register_instance(interface, implementation)
         
+        # Tools and executors were built against the previous services
+        self._tools_cache = None
+        self._analysis_tools_cache = None
+        self._planner_cache.clear()
+        self._executor_cache.clear()
+        
         logger.info("Service configuration completed")
 
 
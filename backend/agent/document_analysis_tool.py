@@ -3,9 +3,9 @@ Document Analysis Tool for the agent system.
 """
 
 import io
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, AsyncGenerator, Tuple, List
 from agent.tools import Tool
-from services.interfaces import DocumentService, FrameworkService, AnalysisService
+from services.interfaces import DocumentService, FrameworkService, AnalysisService, AnalysisReport
 from services.service_container import get_document_service, get_framework_service, get_analysis_service
 from utils.logging_config import get_logger
 
@@ -28,7 +28,7 @@ class DocumentAnalysisTool(Tool):
         self.framework_service = framework_service or get_framework_service()
         self.analysis_service = analysis_service or get_analysis_service()
     
-    async def execute(self, parameters: Dict[str, Any]) -> str:
+    async def execute(self, parameters: Dict[str, Any]) -> AnalysisReport:
         """
         Execute document analysis.
         
@@ -39,13 +39,81 @@ class DocumentAnalysisTool(Tool):
                 - file_text: pre-parsed text (optional)
                 - framework_ids: specific frameworks to use (optional)
         
+        Returns:
+            Structured analysis report; call to_markdown() to render it
+        
+        Raises:
+            ValueError: If required parameters are missing
+            RuntimeError: If analysis fails
+        """
+        filename, document_text, framework_ids = await self._prepare_analysis(parameters)
+        
+        try:
+            # Run analysis on the already-parsed text so it is not parsed again
+            analysis_result = await self.analysis_service.analyze_document(
+                None, filename, framework_ids, document_text=document_text
+            )
+        except Exception as e:
+            raise RuntimeError(f"Document analysis failed: {str(e)}")
+        
+        if not analysis_result.success:
+            raise RuntimeError(f"Document analysis failed: Analysis failed: {analysis_result.error}")
+        
+        return AnalysisReport(
+            filename=filename,
+            frameworks=analysis_result.framework_results,
+            overall_summary=analysis_result.overall_summary,
+            formatter=self.analysis_service
+        )
+    
+    async def execute_markdown(self, parameters: Dict[str, Any]) -> str:
+        """
+        Execute document analysis and return the formatted markdown report.
+        
+        Args:
+            parameters: Same as execute()
+        
         Returns:
             Formatted analysis results string
+        """
+        return "".join([section async for section in self.execute_streaming(parameters)])
+    
+    async def execute_streaming(self, parameters: Dict[str, Any]) -> AsyncGenerator[str, None]:
+        """
+        Execute document analysis, yielding each framework section as soon as it is ready.
+        
+        Args:
+            parameters: Same as execute()
+        
+        Yields:
+            Markdown report sections, framework sections in completion order
         
         Raises:
             ValueError: If required parameters are missing
             RuntimeError: If analysis fails
         """
+        filename, document_text, framework_ids = await self._prepare_analysis(parameters)
+        
+        try:
+            # Emit the detailed rule-by-rule breakdown one framework at a time
+            async for section in self.analysis_service.stream_analysis_results(
+                None, filename, framework_ids, document_text=document_text
+            ):
+                yield section
+        except Exception as e:
+            raise RuntimeError(f"Document analysis failed: {str(e)}")
+    
+    async def _prepare_analysis(self, parameters: Dict[str, Any]) -> Tuple[str, str, List[str]]:
+        """
+        Validate parameters, parse the document and pick the frameworks to analyze.
+        
+        Returns:
+            Tuple of (filename, document_text, framework_ids)
+        
+        Raises:
+            ValueError: If required parameters are missing
+            RuntimeError: If parsing or framework matching fails
+        """
         # Validate required parameters
         file_content = parameters.get("file_content")
         filename = parameters.get("filename")
@@ -64,6 +132,10 @@ class DocumentAnalysisTool(Tool):
                 if not file_content:
                     raise ValueError("file_content is required when file_text is not provided")
                 
+                # A blank upload is rejected on its bytes, before any parsing work
+                if file_content.isspace():
+                    raise ValueError(f"Document {filename} appears to be empty or could not be parsed")
+                
                 logger.info(f"Parsing document: {filename}")
                 file_stream = io.BytesIO(file_content)
                 parse_result = await self.document_service.parse_document(file_stream, filename)
@@ -75,7 +147,8 @@ class DocumentAnalysisTool(Tool):
             else:
                 document_text = file_text
             
-            if not document_text.strip():
+            # Checked before framework matching so empty documents never reach the embedding call
+            if not document_text or document_text.isspace():
                 raise ValueError(f"Document {filename} appears to be empty or could not be parsed")
             
             # Find relevant frameworks if not specified
@@ -87,28 +160,8 @@ class DocumentAnalysisTool(Tool):
             if not framework_ids:
                 raise RuntimeError("No relevant compliance frameworks found for this document")
             
-            logger.info(f"Analyzing document against {len(framework_ids)} frameworks")
-            
-            # Create file stream for analysis
-            if file_content:
-                file_stream = io.BytesIO(file_content)
-            else:
-                file_stream = io.BytesIO(document_text.encode('utf-8'))
-            
-            # Run analysis using the analysis service
-            analysis_result = await self.analysis_service.analyze_document(
-                file_stream, filename, framework_ids
-            )
-            
-            if not analysis_result.success:
-                raise RuntimeError(f"Analysis failed: {analysis_result.error}")
-            
-            # Format results with detailed rule-by-rule breakdown
-            logger.info("Formatting detailed analysis results")
-            return await self.analysis_service.format_analysis_results(
-                analysis_result.framework_results, filename
-            )
-            
         except Exception as e:
             raise RuntimeError(f"Document analysis failed: {str(e)}")
-    
+        
+        logger.info(f"Analyzing document against {len(framework_ids)} frameworks")
+        return filename, document_text, framework_ids
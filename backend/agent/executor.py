@@ -3,18 +3,59 @@ Executor Module - Responsible for executing individual steps of a plan
 """
 
 import asyncio
+import json
+import re
 import time
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple
 from langchain_openai import ChatOpenAI
 from langchain.schema import SystemMessage, HumanMessage
 from config import settings
 from .planner import ExecutionPlan, PlanStep
 from .tools import Tool
 from .rag_tool import RAGTool
+from .llm_clients import get_chat_model
 from utils.logging_config import get_logger, log_external_service_call
 from utils.retry import retry_external_service
 from utils.exceptions import ExternalServiceError, ProcessingError, create_external_service_error
 
+# Sent first on every step and must stay byte-identical across calls so OpenAI
+# can serve it from the prompt cache; step-specific text goes in the human message.
+EXECUTOR_PROMPT_CACHE_KEY = "executor"
+
+EXECUTOR_SYSTEM_PROMPT = """You are a RAG synthesis agent responsible for combining retrieved document information to answer user questions.
+
+Your job is to:
+1. Synthesize information from retrieved documents into comprehensive answers
+2. Cite specific sources when referencing document content
+3. Provide clear, well-structured responses based on the available information
+4. Acknowledge limitations when documents don't contain sufficient information
+
+When synthesizing information:
+- Combine insights from multiple sources when available
+- Maintain accuracy to the source documents
+- Organize information logically
+- Provide direct answers to the user's question based on the retrieved context
+
+Respond with a JSON object of the form:
+{"result": "<your full response for this step>", "observations": ["<1-2 concrete outcomes or insights useful for subsequent steps>"]}"""
+EXECUTOR_SYSTEM_MESSAGE = SystemMessage(content=EXECUTOR_SYSTEM_PROMPT)
+
+EXECUTION_PROMPT_TAIL = """
+Execute this action and provide the result. 
+
+For synthesis steps: Combine the retrieved information to provide a comprehensive answer to the user's question. Use specific details from the documents and cite sources where appropriate.
+
+For other steps: Be specific and detailed in your response.
+"""
+
+# Sentence boundaries for deriving observations from a step result; only the
+# first OBSERVATION_SOURCE_CHARS are scanned since at most 2 sentences are kept
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+OBSERVATION_SOURCE_CHARS = 256
+
+# "Search documents for [information about][:] <query>"
+_RAG_QUERY_RE = re.compile(r"^\s*Search documents for(?:\s+information about)?\s*:?\s*(.+)$", re.IGNORECASE | re.DOTALL)
+
 
 class ExecutionResult:
     """Represents the result of executing a single step"""
@@ -48,12 +89,41 @@ class Executor:
     """Executes individual steps of execution plans using available tools"""
     
     def __init__(self, model_name: str = None, temperature: float = None, tools: Optional[Dict[str, Tool]] = None):
-        self.llm = ChatOpenAI(
-            model=model_name or settings.MODEL_NAME,
-            temperature=temperature or settings.MODEL_TEMPERATURE,
-            openai_api_key=settings.OPENAI_API_KEY
-        )
-        self.tools = tools or self._initialize_tools()
+        self.model_name = model_name or settings.MODEL_NAME
+        self.temperature = temperature or settings.MODEL_TEMPERATURE
+        # Model and default tools are built on first use
+        self._llm: Optional[ChatOpenAI] = None
+        self._tools: Optional[Dict[str, Tool]] = tools or None
+        # (context, synthesis block, generic block) of the most recent context
+        self._context_blocks: Optional[Tuple[Dict[str, Any], str, str]] = None
+        # Bound once; binding allocates a new logger and context dict
+        self._llm_logger = get_logger(__name__).bind(component="executor", operation="llm_execution")
+
+    @property
+    def llm(self) -> ChatOpenAI:
+        """LLM used for steps without a tool, created on first use"""
+        if self._llm is None:
+            self._llm = get_chat_model(
+                self.model_name,
+                self.temperature,
+                prompt_cache_key=EXECUTOR_PROMPT_CACHE_KEY
+            )
+        return self._llm
+
+    @llm.setter
+    def llm(self, llm: ChatOpenAI):
+        self._llm = llm
+
+    @property
+    def tools(self) -> Dict[str, Tool]:
+        """Available tools, defaulting to the RAG tool on first use"""
+        if self._tools is None:
+            self._tools = self._initialize_tools()
+        return self._tools
+
+    @tools.setter
+    def tools(self, tools: Dict[str, Tool]):
+        self._tools = tools
 
     def _initialize_tools(self) -> Dict[str, Tool]:
         """Initialize available tools for RAG-only execution"""
@@ -62,18 +132,23 @@ class Executor:
             "search_documents": RAGTool()
         }
 
-    async def execute_plan(self, plan: ExecutionPlan, progress_callback: Optional[callable] = None) -> List[ExecutionResult]:
+    async def execute_plan(self,
+                           plan: ExecutionPlan,
+                           progress_callback: Optional[callable] = None,
+                           started: Optional[Dict[PlanStep, asyncio.Task]] = None) -> List[ExecutionResult]:
         """
         Execute a complete plan step by step
         
         Args:
             plan: The execution plan to execute
             progress_callback: Optional callback for progress updates
+            started: Optional tasks already executing steps of the plan (e.g. started
+                while the plan was streamed in); they are awaited instead of rerun
             
         Returns:
             List of execution results for each step
         """
-        results = []
+        failed = 0
         plan.status = "executing"
 
         if progress_callback:
@@ -83,33 +158,70 @@ class Executor:
                 "plan": plan.to_dict()
             })
 
-        while not plan.is_complete():
-            current_step = plan.get_current_step()
-            if not current_step:
-                break
+        # Each step starts as soon as the steps it depends on have finished, so
+        # independent LLM and tool round-trips overlap instead of running back to back
+        dependencies = plan.get_dependencies()
+        remaining = [len(prerequisites) for prerequisites in dependencies]
+        dependents = [[] for _ in plan.steps]
+        for i, prerequisites in enumerate(dependencies):
+            for d in prerequisites:
+                dependents[d].append(i)
 
-            # Execute the current step
-            result = await self.execute_step(current_step, plan.context, progress_callback)
-            results.append(result)
+        running: Dict[asyncio.Task, int] = {}
 
-            # Update step status
-            current_step.status = "completed" if result.success else "failed"
-            current_step.result = result.result
-            current_step.observations = result.observations
+        started = dict(started) if started else {}
 
-            # Move to next step
-            plan.advance_step()
+        def start(i: int):
+            task = started.pop(plan.steps[i], None)
+            if task is None:
+                task = asyncio.create_task(self.execute_step(plan.steps[i], plan.context, progress_callback))
+            running[task] = i
 
-            # Check if we need to stop due to critical failure
-            if not result.success and self._is_critical_failure(result):
-                plan.status = "failed"
-                break
+        for i, count in enumerate(remaining):
+            if count == 0:
+                start(i)
+
+        results_by_index: Dict[int, ExecutionResult] = {}
+        stopped = False
+        try:
+            while running:
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                # Step state is only updated here, between awaits, never from the tasks
+                for task in sorted(done, key=running.__getitem__):
+                    i = running.pop(task)
+                    result = task.result()
+                    step = plan.steps[i]
+                    results_by_index[i] = result
+                    failed += not result.success
+
+                    # Update step status
+                    step.finish(result.success, result.result, result.observations)
+
+                    # Move to next step
+                    plan.advance_step()
+
+                    # Steps already running finish, but nothing new starts after a critical failure
+                    if not result.success and self._is_critical_failure(result):
+                        plan.status = "failed"
+                        stopped = True
+                    if stopped:
+                        continue
+
+                    for j in dependents[i]:
+                        remaining[j] -= 1
+                        if remaining[j] == 0:
+                            start(j)
+        finally:
+            for task in (*running, *started.values()):
+                task.cancel()
+
+        results = [results_by_index[i] for i in sorted(results_by_index)]
 
         # Mark plan as completed if all steps succeeded
-        if plan.is_complete() and all(r.success for r in results):
-            plan.status = "completed"
-        elif not all(r.success for r in results):
+        if failed:
             plan.status = "partial_failure"
+        elif plan.is_complete():
+            plan.status = "completed"
 
         if progress_callback:
             await progress_callback({
@@ -154,13 +266,13 @@ class Executor:
 
         try:
             # Determine execution method based on step requirements
+            # LLM steps return their observations from the same call; tool steps
+            # get them without another LLM round-trip
             if step.tool_needed and step.tool_needed in self.tools:
                 result = await self._execute_with_tool(step, context, progress_callback)
+                observations = self._generate_observations(step)
             else:
-                result = await self._execute_with_llm(step, context, progress_callback)
-
-            # Generate observations about the execution
-            observations = await self._generate_observations(step, result, context)
+                result, observations = await self._execute_with_llm(step, context, progress_callback)
 
             execution_result = ExecutionResult(
                 step=step,
@@ -220,11 +332,8 @@ class Executor:
         # Extract search query from the step action for RAG tool
         if step.tool_needed == "search_documents":
             # Extract query from action like "Search documents for information about X"
-            query = step.action.replace("Search documents for", "").strip()
-            if query.startswith("information about"):
-                query = query.replace("information about", "").strip()
-            if query.startswith(":"):
-                query = query[1:].strip()
+            match = _RAG_QUERY_RE.match(step.action)
+            query = match.group(1).strip() if match else step.action
             
             return await tool.execute(query=query)
         
@@ -232,15 +341,14 @@ class Executor:
         return await tool.execute(action=step.action, reasoning=step.reasoning, context=context)
 
     @retry_external_service("llm_execution")
-    async def _execute_with_llm(self, step: PlanStep, context: Dict[str, Any], progress_callback: Optional[callable] = None) -> str:
-        """Execute step using direct LLM interaction"""
+    async def _execute_with_llm(self, step: PlanStep, context: Dict[str, Any], progress_callback: Optional[callable] = None) -> Tuple[str, List[str]]:
+        """Execute step using direct LLM interaction, returning (result, observations)"""
         start_time = time.time()
-        logger = get_logger(__name__)
         
         execution_prompt = self._build_execution_prompt(step, context)
         
         messages = [
-            SystemMessage(content=self._get_executor_system_prompt()),
+            EXECUTOR_SYSTEM_MESSAGE,
             HumanMessage(content=execution_prompt)
         ]
 
@@ -251,25 +359,25 @@ class Executor:
             })
 
         try:
-            response = self.llm.invoke(messages)
+            response = await self.llm.ainvoke(messages, response_format={"type": "json_object"})
             
             # Log successful LLM call
             duration = time.time() - start_time
             log_external_service_call(
-                logger.bind(operation="llm_execution"),
+                self._llm_logger,
                 "OpenAI", "chat_completion", duration, True,
                 model=settings.MODEL_NAME,
                 prompt_length=len(execution_prompt),
                 response_length=len(response.content)
             )
             
-            return response.content
+            return self._parse_execution_response(step, response.content)
             
         except Exception as e:
             # Log failed LLM call
             duration = time.time() - start_time
             log_external_service_call(
-                logger.bind(operation="llm_execution"),
+                self._llm_logger,
                 "OpenAI", "chat_completion", duration, False,
                 model=settings.MODEL_NAME,
                 prompt_length=len(execution_prompt)
@@ -278,61 +386,67 @@ class Executor:
             # Raise appropriate error
             raise create_external_service_error("OpenAI", "chat_completion", e)
 
-    async def _generate_observations(self, step: PlanStep, result: Any, context: Dict[str, Any]) -> List[str]:
-        """Generate observations about the step execution"""
-        observation_prompt = f"""
-        Step executed: {step.action}
-        Step reasoning: {step.reasoning}
-        Execution result: {str(result)[:200]}...
-        
-        Generate 1-2 specific observations about what was accomplished in this step and what was learned.
-        Focus on concrete outcomes and insights that would be useful for subsequent steps.
-        """
-
-        messages = [
-            SystemMessage(content="You are analyzing execution results and generating insightful observations."),
-            HumanMessage(content=observation_prompt)
-        ]
-
+    def _parse_execution_response(self, step: PlanStep, content: str) -> Tuple[str, List[str]]:
+        """Split a JSON execution response into the result and up to 2 observations"""
         try:
-            response = self.llm.invoke(messages)
-            # Split into separate observations if multiple sentences
-            observations = [obs.strip() for obs in response.content.split('.') if obs.strip()]
-            return observations[:2]  # Limit to 2 observations
-        except:
-            return [f"Completed: {step.action}"]
+            payload = json.loads(content)
+            result = payload["result"]
+        except (ValueError, TypeError, KeyError):
+            # Not the requested shape; keep the raw answer as the result
+            return content, self._generate_observations(step, content)
+        
+        if not isinstance(result, str):
+            result = json.dumps(result)
+        observations = payload.get("observations")
+        if not isinstance(observations, list):
+            observations = []
+        observations = [obs.strip() for obs in observations if isinstance(obs, str) and obs.strip()]
+        return result, observations[:2] or self._generate_observations(step, result)
+
+    def _generate_observations(self, step: PlanStep, result_text: Optional[str] = None) -> List[str]:
+        """Fallback observations (the result's first sentences) for steps that did not report any"""
+        if result_text:
+            sentences = _SENTENCE_RE.split(result_text[:OBSERVATION_SOURCE_CHARS], maxsplit=2)[:2]
+            observations = [sentence.strip() for sentence in sentences if sentence.strip()]
+            if observations:
+                return observations
+        return [f"Completed: {step.action}"]
 
     def _build_execution_prompt(self, step: PlanStep, context: Dict[str, Any]) -> str:
         """Build prompt for LLM execution of a step"""
-        prompt = f"""Execute this specific step:
-
-ACTION: {step.action}
-REASONING: {step.reasoning}
+        synthesize = "synthesize" in step.action.lower()
+        return (
+            f"Execute this specific step:\n\nACTION: {step.action}\nREASONING: {step.reasoning}\n\n"
+            f"{self._context_block(context, synthesize)}{EXECUTION_PROMPT_TAIL}"
+        )
 
-"""
+    def _context_block(self, context: Dict[str, Any], synthesize: bool) -> str:
+        """Render the context section of the execution prompt, once per context object
         
+        Every step of a plan gets the same (unmodified) context dict, so both
+        renderings are computed on first use and reused for the remaining steps.
+        """
+        cached = self._context_blocks
+        if cached is None or cached[0] is not context:
+            cached = self._context_blocks = (context, *self._render_context_blocks(context))
+        return cached[1] if synthesize else cached[2]
+
+    @staticmethod
+    def _render_context_blocks(context: Dict[str, Any]) -> Tuple[str, str]:
+        """Render (synthesis, generic) context sections"""
+        if not context:
+            return "", ""
         # Include retrieved document context for synthesis steps
-        if "synthesize" in step.action.lower() and context:
-            prompt += "RETRIEVED INFORMATION:\n"
-            for key, value in context.items():
-                if "context" in key.lower() and isinstance(value, str):
-                    prompt += f"{value}\n\n"
-                else:
-                    prompt += f"- {key}: {value}\n"
-        elif context:
-            prompt += "CONTEXT:\n"
-            for key, value in context.items():
-                prompt += f"- {key}: {value}\n"
-
-        prompt += """
-Execute this action and provide the result. 
-
-For synthesis steps: Combine the retrieved information to provide a comprehensive answer to the user's question. Use specific details from the documents and cite sources where appropriate.
-
-For other steps: Be specific and detailed in your response.
-"""
-
-        return prompt
+        synthesis_lines = ["RETRIEVED INFORMATION:\n"]
+        generic_lines = ["CONTEXT:\n"]
+        for key, value in context.items():
+            item = f"- {key}: {value}\n"
+            generic_lines.append(item)
+            if "context" in key.lower() and isinstance(value, str):
+                synthesis_lines.append(f"{value}\n\n")
+            else:
+                synthesis_lines.append(item)
+        return "".join(synthesis_lines), "".join(generic_lines)
 
     def _build_tool_prompt(self, step: PlanStep, context: Dict[str, Any]) -> str:
         """Build prompt for tool execution"""
@@ -347,19 +461,7 @@ For other steps: Be specific and detailed in your response.
 
     def _get_executor_system_prompt(self) -> str:
         """System prompt for the RAG-focused executor"""
-        return """You are a RAG synthesis agent responsible for combining retrieved document information to answer user questions.
-
-Your job is to:
-1. Synthesize information from retrieved documents into comprehensive answers
-2. Cite specific sources when referencing document content
-3. Provide clear, well-structured responses based on the available information
-4. Acknowledge limitations when documents don't contain sufficient information
-
-When synthesizing information:
-- Combine insights from multiple sources when available
-- Maintain accuracy to the source documents
-- Organize information logically
-- Provide direct answers to the user's question based on the retrieved context"""
+        return EXECUTOR_SYSTEM_PROMPT
 
     def _is_critical_failure(self, result: ExecutionResult) -> bool:
         """Determine if a failure should stop the entire plan execution"""
@@ -3,7 +3,8 @@ File context handling for the orchestrator system.
 """
 
 import io
-from typing import Dict, Any, Optional, List
+import re
+from typing import Dict, Any, Optional, List, Tuple
 from dataclasses import dataclass
 from fastapi import UploadFile
 from utils.logging_config import get_logger
@@ -27,6 +28,33 @@ class FileContextBuilder:
     }
     
     MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
+    READ_CHUNK_SIZE = 1 << 20  # 1MB
+    
+    # PDF readers accept the header anywhere in the first 1KB
+    PDF_MAGIC = b"%PDF"
+    PDF_MAGIC_WINDOW = 1024
+    
+    async def read_file_content(self, file: UploadFile) -> bytes:
+        """
+        Read an uploaded PDF in chunks, stopping as soon as it is known to be invalid.
+        
+        Oversized uploads are rejected once MAX_FILE_SIZE is exceeded and
+        non-PDF uploads after the first chunk, instead of after buffering the
+        whole file.
+        
+        Raises:
+            ValueError: If the file is not a PDF or is too large
+        """
+        # BytesIO.getvalue() hands over its buffer instead of copying it, and
+        # BytesIO(bytes) downstream shares it again, so the upload is held once
+        buf = io.BytesIO()
+        while chunk := await file.read(self.READ_CHUNK_SIZE):
+            if not buf.tell() and self.PDF_MAGIC not in chunk[:self.PDF_MAGIC_WINDOW]:
+                raise ValueError("File content is not a valid PDF")
+            buf.write(chunk)
+            if buf.tell() > self.MAX_FILE_SIZE:
+                raise ValueError(f"File too large. Maximum allowed: {self.MAX_FILE_SIZE} bytes")
+        return buf.getvalue()
     
     async def build_file_context(self, file: Optional[UploadFile]) -> Optional[FileContext]:
         """
@@ -50,14 +78,10 @@ class FileContextBuilder:
             raise ValueError(f"Unsupported file type: {file_ext}. Only PDF files are supported.")
         
         try:
-            # Read file content
-            file_content = await file.read()
+            # Read file content; size and type are enforced while reading
+            file_content = await self.read_file_content(file)
             file_size = len(file_content)
             
-            # Validate file size
-            if file_size > self.MAX_FILE_SIZE:
-                raise ValueError(f"File too large: {file_size} bytes. Maximum allowed: {self.MAX_FILE_SIZE} bytes")
-            
             if file_size == 0:
                 raise ValueError("File is empty")
             
@@ -83,13 +107,13 @@ class FileContextBuilder:
 class DocumentAnalysisDetector:
     """Detects when user wants to perform document analysis."""
     
-    ANALYSIS_KEYWORDS = [
+    ANALYSIS_KEYWORDS = frozenset({
         'analyze', 'analysis', 'check', 'review', 'evaluate', 'assess',
         'compliance', 'compliant', 'regulation', 'regulatory', 'standard',
         'audit', 'inspect', 'examine', 'validate', 'verify', 'test'
-    ]
+    })
     
-    ANALYSIS_PHRASES = [
+    ANALYSIS_PHRASES = frozenset({
         'analyze this document',
         'check compliance',
         'review against',
@@ -100,65 +124,59 @@ class DocumentAnalysisDetector:
         'analyze file',
         'compliance check',
         'regulatory review'
-    ]
+    })
     
-    def should_analyze_document(self, message: str, file_context: Optional[FileContext]) -> bool:
+    # Each term set is matched by one compiled alternation, i.e. a single C-level
+    # scan of the message instead of one substring search per term
+    PHRASE_PATTERN = re.compile("|".join(map(re.escape, sorted(ANALYSIS_PHRASES, key=lambda t: (-len(t), t)))))
+    KEYWORD_PATTERN = re.compile("|".join(map(re.escape, sorted(ANALYSIS_KEYWORDS, key=lambda t: (-len(t), t)))))
+    
+    def _count_matches(self, message_lower: str) -> Tuple[int, int]:
+        """Number of distinct analysis phrases and keywords found in the message."""
+        phrase_matches = len(set(self.PHRASE_PATTERN.findall(message_lower)))
+        keyword_matches = len(set(self.KEYWORD_PATTERN.findall(message_lower)))
+        return phrase_matches, keyword_matches
+    
+    def analyze(self, message: str, file_context: Optional[FileContext]) -> Tuple[bool, float]:
         """
-        Determine if user wants document analysis.
+        Determine if user wants document analysis, and how confident that is.
         
         Args:
             message: User's message text
             file_context: File context if file is present
             
         Returns:
-            True if document analysis should be performed
+            Tuple of (whether document analysis should be performed, confidence score)
         """
         if not file_context:
-            return False
-            
-        message_lower = message.lower()
+            return False, 0.0
         
         # Strong indicators
-        phrase_matches = sum(1 for phrase in self.ANALYSIS_PHRASES if phrase in message_lower)
-        keyword_matches = sum(1 for keyword in self.ANALYSIS_KEYWORDS if keyword in message_lower)
+        phrase_matches, keyword_matches = self._count_matches(message.lower())
         
         # File + analysis keywords = document analysis intent
         if phrase_matches > 0:
             logger.info(f"Document analysis detected: phrase matches ({phrase_matches})")
-            return True
+            return True, 0.95 if phrase_matches >= 2 else 0.85
             
         if keyword_matches >= 2:
             logger.info(f"Document analysis detected: keyword matches ({keyword_matches})")
-            return True
+            return True, 0.80 if keyword_matches >= 3 else 0.70
             
         # File with minimal text could be analysis request
-        if len(message.strip()) < 50 and keyword_matches >= 1:
+        if keyword_matches >= 1 and len(message.strip()) < 50:
             logger.info("Document analysis detected: short message with analysis keyword")
-            return True
+            return True, 0.60
             
-        return False
+        return False, 0.0
+    
+    def should_analyze_document(self, message: str, file_context: Optional[FileContext]) -> bool:
+        """Determine if user wants document analysis."""
+        return self.analyze(message, file_context)[0]
     
     def get_analysis_confidence(self, message: str, file_context: Optional[FileContext]) -> float:
         """Get confidence score for document analysis intent."""
-        if not file_context:
-            return 0.0
-            
-        message_lower = message.lower()
-        phrase_matches = sum(1 for phrase in self.ANALYSIS_PHRASES if phrase in message_lower)
-        keyword_matches = sum(1 for keyword in self.ANALYSIS_KEYWORDS if keyword in message_lower)
-        
-        if phrase_matches >= 2:
-            return 0.95
-        elif phrase_matches >= 1:
-            return 0.85
-        elif keyword_matches >= 3:
-            return 0.80
-        elif keyword_matches >= 2:
-            return 0.70
-        elif keyword_matches >= 1 and len(message.strip()) < 50:
-            return 0.60
-        else:
-            return 0.0
+        return self.analyze(message, file_context)[1]
 
 # Singleton instances
 file_context_builder = FileContextBuilder()
@@ -0,0 +1,145 @@
+"""
+Shared LLM clients - one ChatOpenAI instance per distinct configuration
+
+ChatOpenAI owns its HTTP client and connection pool, so building one per call
+throws away keep-alive connections and TLS sessions. Callers that need a model
+with a given configuration should get it from here instead. The same applies
+to the raw OpenAI SDK clients.
+
+Every async client sends its requests through one process-wide httpx pool
+(HTTP/2 when available, so concurrent calls are multiplexed over a single
+connection). It is closed by close_http_clients() on application shutdown.
+"""
+
+import asyncio
+import importlib.util
+import time
+from functools import lru_cache
+from typing import Optional, Set
+
+import httpx
+from langchain_openai import ChatOpenAI
+from openai import AsyncOpenAI
+from config import settings
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Upper bound for a connection warm-up; it only ever saves a handshake
+WARM_TIMEOUT_SEC = 5.0
+# How long an idle pooled connection is kept open
+KEEPALIVE_EXPIRY_SEC = 5.0
+
+# Monotonic time of the last response received over the shared pool
+_last_response_at = 0.0
+# Running warm-ups; the loop only keeps weak references to tasks
+_warm_tasks: Set[asyncio.Task] = set()
+
+
+async def _record_response(response: httpx.Response):
+    """Note that the pool holds a freshly used connection"""
+    global _last_response_at
+    _last_response_at = time.monotonic()
+
+
+@lru_cache(maxsize=1)
+def get_async_http_client() -> httpx.AsyncClient:
+    """Get the shared httpx connection pool used for OpenAI calls"""
+    http2 = settings.openai.http2
+    if http2 and importlib.util.find_spec("h2") is None:
+        logger.warning("HTTP/2 requested for OpenAI calls but the h2 package is not installed; using HTTP/1.1")
+        http2 = False
+
+    return httpx.AsyncClient(
+        http2=http2,
+        timeout=settings.openai.timeout_sec,
+        limits=httpx.Limits(
+            max_connections=settings.openai.max_connections,
+            max_keepalive_connections=settings.openai.max_keepalive_connections,
+            keepalive_expiry=KEEPALIVE_EXPIRY_SEC
+        ),
+        event_hooks={"response": [_record_response]}
+    )
+
+
+@lru_cache(maxsize=16)
+def get_chat_model(model_name: Optional[str] = None,
+                   temperature: Optional[float] = None,
+                   max_tokens: Optional[int] = None,
+                   prompt_cache_key: Optional[str] = None) -> ChatOpenAI:
+    """
+    Get a shared ChatOpenAI client for the given configuration
+    
+    Args:
+        model_name: LLM model to use (defaults to settings.MODEL_NAME)
+        temperature: Sampling temperature (defaults to settings.MODEL_TEMPERATURE)
+        max_tokens: Optional response token limit
+        prompt_cache_key: Optional OpenAI prompt cache key sent with every request
+        
+    Returns:
+        ChatOpenAI instance shared by every caller with the same configuration
+    """
+    return ChatOpenAI(
+        model=model_name or settings.MODEL_NAME,
+        temperature=settings.MODEL_TEMPERATURE if temperature is None else temperature,
+        openai_api_key=settings.OPENAI_API_KEY,
+        max_tokens=max_tokens,
+        model_kwargs={"prompt_cache_key": prompt_cache_key} if prompt_cache_key else {},
+        http_async_client=get_async_http_client()
+    )
+
+
+@lru_cache(maxsize=1)
+def get_async_openai_client() -> AsyncOpenAI:
+    """Get the shared AsyncOpenAI client"""
+    return AsyncOpenAI(api_key=settings.openai.api_key, http_client=get_async_http_client())
+
+
+async def warm_http_client():
+    """
+    Open a pooled connection to the OpenAI API ahead of an imminent request
+    
+    Idle connections expire from the pool after a few seconds, so the first
+    call after a pause pays for TCP and TLS setup. Running this alongside other
+    I/O (e.g. retrieval) takes that setup off the critical path. Any response,
+    including an error status, leaves a usable connection behind.
+    """
+    try:
+        await get_async_http_client().head(
+            str(get_async_openai_client().base_url),
+            timeout=WARM_TIMEOUT_SEC
+        )
+    except httpx.HTTPError as e:
+        logger.debug(f"OpenAI connection warm-up failed: {e}")
+
+
+def start_http_warmup():
+    """
+    Warm the shared pool in the background, unless a connection is still alive
+    
+    Nothing is sent when a response arrived within the keep-alive window (the
+    connection it came over is still pooled) or a warm-up is already running.
+    """
+    if _warm_tasks or time.monotonic() - _last_response_at < KEEPALIVE_EXPIRY_SEC:
+        return
+    task = asyncio.create_task(warm_http_client())
+    _warm_tasks.add(task)
+    task.add_done_callback(_finish_warmup)
+
+
+def _finish_warmup(task: asyncio.Task):
+    """Forget a finished warm-up, retrieving any unexpected error"""
+    _warm_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        logger.debug(f"OpenAI connection warm-up failed: {task.exception()}")
+
+
+async def close_http_clients():
+    """Close the shared connection pool and forget every client built on it"""
+    for task in list(_warm_tasks):
+        task.cancel()
+    if get_async_http_client.cache_info().currsize:
+        await get_async_http_client().aclose()
+    get_async_openai_client.cache_clear()
+    get_chat_model.cache_clear()
+    get_async_http_client.cache_clear()
@@ -12,7 +12,7 @@ from langchain_openai import ChatOpenAI
 from langchain.schema import SystemMessage, HumanMessage
 from config import settings
 
-from search.multi_document_search import ContextBundle, build_grouped_context
+from search.multi_document_search import ContextBundle, build_grouped_context, format_context_text
 from .smart_routing_config import SmartRoutingConfig
 from .smart_probe import ProbeSignals
 from .short_path import build_context_short_path
@@ -245,21 +245,14 @@ def _deduplicate_and_merge_contexts(contexts: List[ContextBundle]) -> ContextBun
     for block in merged_blocks:
         block.snippets = block.snippets[:5]  # Max 5 snippets per doc in LONG path
     
-    # Format merged context
-    context_parts = []
-    for block in merged_blocks:
-        if block.snippets:  # Only include blocks with content
-            context_parts.append(f"{{{block.title}}} [Document ID: {block.document_id}]")
-            for snippet in block.snippets:
-                context_parts.append(snippet)
-            context_parts.append("")
-    
-    merged_context_text = "\n".join(context_parts).strip()
+    # Format merged context, only including blocks with content
+    content_blocks = [block for block in merged_blocks if block.snippets]
+    merged_context_text = format_context_text(content_blocks)
     
     return ContextBundle(
         query=" + ".join(all_queries),
         context_text=merged_context_text,
-        blocks=[block for block in merged_blocks if block.snippets]
+        blocks=content_blocks
     )
 
 
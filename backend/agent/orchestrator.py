@@ -10,35 +10,30 @@ Required environment variables:
 Usage:
     from agent.orchestrator import handle_message
     
-    response = handle_message("Hello, how are you?")
+    response = await handle_message("Hello, how are you?")
     print(response)
 """
 
+import asyncio
 import logging
-import json
-from typing import Dict, Any
-from openai import OpenAI
+import re
+from typing import Dict, Any, List, Optional, Tuple
+import orjson
 from config import settings
+from .llm_clients import get_async_openai_client
+from .orchestrator_cache import route_cache, light_response_cache
 
 logger = logging.getLogger(__name__)
 
 
-def route_message(user_text: str) -> Dict[str, Any]:
-    """
-    Run orchestrator prompt to determine routing strategy.
-    
-    Args:
-        user_text: User's input message
-        
-    Returns:
-        Dict containing routing decision and metadata
-        
-    Raises:
-        ValueError: If JSON parsing fails or required fields are missing
-    """
-    client = OpenAI(api_key=settings.openai.api_key)
-    
-    system_prompt = """You are a lightweight orchestrator that routes between simple responses and document-based answers.
+# System prompts are sent as the first message and must stay byte-identical
+# across calls: OpenAI caches the longest repeated prompt prefix, so anything
+# per-request (user text, timestamps, ids) belongs in the user message only.
+# prompt_cache_key groups requests sharing a prefix on the same cache.
+ROUTER_PROMPT_CACHE_KEY = "orchestrator-router"
+LIGHT_PROMPT_CACHE_KEY = "orchestrator-light"
+
+ROUTER_SYSTEM_PROMPT = """You are a lightweight orchestrator that routes between simple responses and document-based answers.
 - Output strict JSON only, no prose.
 - LIGHT: Use for simple greetings, chitchat, basic definitions that don't require document lookup
 - HEAVY: Use for ANY informational questions that could benefit from document search, including questions about specific topics, requests for explanations, summaries, analysis, or any detailed information
@@ -55,34 +50,229 @@ JSON schema:
     "why":{"type":"string"}
   },"required":["route","intent","confidence","query","light_draft","why"],
   "additionalProperties":false }"""
+
+ROUTER_BATCH_INSTRUCTIONS = """
+
+You will receive a JSON array of independent messages, each with an "idx". Route every message on its own.
+Output a JSON object {"results": [...]} with exactly one object per message, each following the schema above plus its "idx"."""
+
+# The single-message prompt is a prefix of the batch prompt, so both share a cache entry
+ROUTER_BATCH_SYSTEM_PROMPT = ROUTER_SYSTEM_PROMPT + ROUTER_BATCH_INSTRUCTIONS
+
+LIGHT_SYSTEM_PROMPT = "You are the LIGHT responder. Provide helpful informational responses without tools. For instructional requests (recipes, how-to guides, explanations), provide clear step-by-step information. Keep responses concise but complete. If you cannot provide a satisfactory answer, output exactly: ESCALATE."
+
+REQUIRED_ROUTE_FIELDS = ("route", "intent", "confidence", "query", "light_draft", "why")
+ROUTES = frozenset({"LIGHT", "HEAVY"})
+INTENTS = frozenset({"chitchat", "faq", "document_query", "clarify"})
+
+# Bare salutations always route LIGHT, so they are answered without any LLM call
+_GREETING_RE = re.compile(r"^\s*(hi|hello|hey|thanks|thank you|bye)[!.?\s]*$", re.IGNORECASE)
+
+_GREETING_REPLIES = {
+    "hi": "Hi! How can I help you today?",
+    "hello": "Hello! How can I help you today?",
+    "hey": "Hey! How can I help you today?",
+    "thanks": "You're welcome! Let me know if there's anything else I can help with.",
+    "thank you": "You're welcome! Let me know if there's anything else I can help with.",
+    "bye": "Goodbye! Feel free to come back anytime.",
+}
+
+
+def _validate_route(result: Any) -> Dict[str, Any]:
+    """Ensure a routing decision has every required field, each of the schema's type"""
+    if not isinstance(result, dict) or not all(field in result for field in REQUIRED_ROUTE_FIELDS):
+        raise ValueError(f"Missing required fields in orchestrator response: {result}")
+    confidence = result["confidence"]
+    if (result["route"] not in ROUTES
+            or result["intent"] not in INTENTS
+            or type(confidence) not in (int, float)
+            or not all(type(result[field]) is str for field in ("query", "light_draft", "why"))):
+        raise ValueError(f"Invalid field values in orchestrator response: {result}")
+    return result
+
+
+async def _route_single(user_text: str) -> Dict[str, Any]:
+    """Route one message with its own orchestrator completion"""
+    client = get_async_openai_client()
     
     try:
-        response = client.chat.completions.create(
+        response = await client.chat.completions.create(
             model="gpt-4o-mini",
             messages=[
-                {"role": "system", "content": system_prompt},
+                {"role": "system", "content": ROUTER_SYSTEM_PROMPT},
                 {"role": "user", "content": user_text}
             ],
             response_format={"type": "json_object"},
-            temperature=0.1
+            temperature=0.1,
+            prompt_cache_key=ROUTER_PROMPT_CACHE_KEY
         )
         
-        result = json.loads(response.choices[0].message.content)
+        return _validate_route(orjson.loads(response.choices[0].message.content))
         
-        # Validate required fields
-        required_fields = ["route", "intent", "confidence", "query", "light_draft", "why"]
-        if not all(field in result for field in required_fields):
-            raise ValueError(f"Missing required fields in orchestrator response: {result}")
-            
-        return result
-        
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         raise ValueError(f"Failed to parse orchestrator JSON response: {e}")
     except Exception as e:
         raise ValueError(f"Orchestrator API call failed: {e}")
 
 
-def run_light_agent(user_text: str, intent: str, query: str, light_draft: str) -> str:
+async def _route_many(user_texts: List[str]) -> List[Dict[str, Any]]:
+    """Route several messages with one orchestrator completion
+    
+    Messages the batched answer does not cover are routed individually.
+    """
+    client = get_async_openai_client()
+    batch = [{"idx": i, "text": text} for i, text in enumerate(user_texts)]
+    
+    routed: Dict[int, Dict[str, Any]] = {}
+    try:
+        response = await client.chat.completions.create(
+            model="gpt-4o-mini",
+            messages=[
+                {"role": "system", "content": ROUTER_BATCH_SYSTEM_PROMPT},
+                {"role": "user", "content": orjson.dumps(batch).decode()}
+            ],
+            response_format={"type": "json_object"},
+            temperature=0.1,
+            prompt_cache_key=ROUTER_PROMPT_CACHE_KEY
+        )
+        for item in orjson.loads(response.choices[0].message.content).get("results", []):
+            try:
+                idx = item.pop("idx")
+                if isinstance(idx, int) and 0 <= idx < len(user_texts):
+                    routed[idx] = _validate_route(item)
+            except (AttributeError, KeyError, ValueError):
+                continue
+    except Exception as e:
+        logger.warning(f"Batched routing of {len(user_texts)} messages failed: {str(e)}")
+    
+    missing = [i for i in range(len(user_texts)) if i not in routed]
+    if missing:
+        logger.info(f"Routing {len(missing)} of {len(user_texts)} batched messages individually")
+        outcomes = await asyncio.gather(*(_route_single(user_texts[i]) for i in missing), return_exceptions=True)
+        routed.update(zip(missing, outcomes))
+    return [routed[i] for i in range(len(user_texts))]
+
+
+class RouteBatcher:
+    """Coalesces concurrent route requests into one orchestrator completion
+    
+    Requests arriving within window_ms of the first pending one (up to
+    max_batch of them) share a completion, so the system prompt is sent once
+    per batch instead of once per message.
+    """
+    
+    def __init__(self, window_ms: float = 20, max_batch: int = 32):
+        self.window_ms = window_ms
+        self.max_batch = max_batch
+        self._pending: List[Tuple[str, asyncio.Future]] = []
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+    
+    async def route(self, user_text: str) -> Dict[str, Any]:
+        """Route a message, possibly together with concurrent ones"""
+        if self.window_ms <= 0 or self.max_batch <= 1:
+            return await _route_single(user_text)
+        
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((user_text, future))
+        
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.window_ms / 1000, self._flush)
+        
+        return await future
+    
+    def _flush(self):
+        """Send every pending message as one batch"""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        batch, self._pending = self._pending, []
+        if batch:
+            asyncio.get_running_loop().create_task(self._dispatch(batch))
+    
+    async def _dispatch(self, batch: List[Tuple[str, asyncio.Future]]):
+        """Resolve the waiting futures of a batch"""
+        user_texts = [text for text, _ in batch]
+        try:
+            if len(batch) == 1:
+                outcomes = [await _route_single(user_texts[0])]
+            else:
+                logger.info(f"Routing {len(batch)} messages in one orchestrator call")
+                outcomes = await _route_many(user_texts)
+        except Exception as e:
+            outcomes = [e] * len(batch)
+        
+        for (_, future), outcome in zip(batch, outcomes):
+            if future.done():
+                continue
+            if isinstance(outcome, Exception):
+                future.set_exception(outcome)
+            else:
+                future.set_result(outcome)
+
+
+route_batcher = RouteBatcher(
+    window_ms=settings.agent.route_batch_window_ms,
+    max_batch=settings.agent.route_batch_max_size
+)
+
+
+async def route_message(user_text: str) -> Dict[str, Any]:
+    """
+    Run orchestrator prompt to determine routing strategy.
+    
+    Concurrent calls are batched into a single orchestrator completion.
+    
+    Args:
+        user_text: User's input message
+        
+    Returns:
+        Dict containing routing decision and metadata
+        
+    Raises:
+        ValueError: If JSON parsing fails or required fields are missing
+    """
+    cached = route_cache.get(user_text)
+    if cached is not None:
+        return dict(cached)
+    
+    routing = asyncio.ensure_future(route_batcher.route(user_text))
+    embedding = None
+    if route_cache.semantic:
+        # The message is embedded alongside routing, never ahead of it; a near
+        # match only wins if it is found before the orchestrator answers
+        embedding_task = asyncio.ensure_future(asyncio.to_thread(route_cache.embed, user_text))
+        await asyncio.wait({routing, embedding_task}, return_when=asyncio.FIRST_COMPLETED)
+        if embedding_task.done():
+            embedding = embedding_task.result()
+            similar = route_cache.get_similar(embedding) if embedding is not None and not routing.done() else None
+            if similar is not None:
+                routing.cancel()
+                return _reuse_route_decision(similar, user_text)
+        else:
+            # Not indexed for similarity; the exact entry is still cached
+            embedding_task.cancel()
+    
+    result = await routing
+    
+    route_cache.set(user_text, dict(result), embedding)
+    return result
+
+
+def _reuse_route_decision(cached: Dict[str, Any], user_text: str) -> Dict[str, Any]:
+    """
+    Adapt the routing decision cached for a similar message to this one
+    
+    Only the decision carries over; the rewritten query and light draft were
+    written for the other message, so the query falls back to the message
+    itself and the light agent drafts from scratch.
+    """
+    return {**cached, "query": user_text, "light_draft": ""}
+
+
+async def run_light_agent(user_text: str, intent: str, query: str, light_draft: str) -> str:
     """
     Run light one-shot prompt for simple responses.
     
@@ -95,9 +285,11 @@ def run_light_agent(user_text: str, intent: str, query: str, light_draft: str) -
     Returns:
         Brief response (≤2 sentences) or "ESCALATE" if uncertain
     """
-    client = OpenAI(api_key=settings.openai.api_key)
+    cached = light_response_cache.get(user_text)
+    if cached is not None:
+        return cached
     
-    system_prompt = "You are the LIGHT responder. Provide helpful informational responses without tools. For instructional requests (recipes, how-to guides, explanations), provide clear step-by-step information. Keep responses concise but complete. If you cannot provide a satisfactory answer, output exactly: ESCALATE."
+    client = get_async_openai_client()
     
     user_prompt = f"""Original message: "{user_text}"
 Intent: {intent}
@@ -107,23 +299,28 @@ Suggested draft: "{light_draft}"
 Provide a brief, helpful response or output exactly "ESCALATE" if you're uncertain."""
     
     try:
-        response = client.chat.completions.create(
+        response = await client.chat.completions.create(
             model="gpt-4o-mini",
             messages=[
-                {"role": "system", "content": system_prompt},
+                {"role": "system", "content": LIGHT_SYSTEM_PROMPT},
                 {"role": "user", "content": user_prompt}
             ],
             temperature=0.3,
-            max_tokens=500
+            max_tokens=500,
+            prompt_cache_key=LIGHT_PROMPT_CACHE_KEY
         )
         
-        return response.choices[0].message.content.strip()
+        light_response = response.choices[0].message.content.strip()
+        # Escalations are not cached so a transient failure is retried next time
+        if light_response != "ESCALATE":
+            light_response_cache.set(user_text, light_response)
+        return light_response
         
     except Exception as e:
         return "ESCALATE"
 
 
-def run_heavy_agent(user_text: str) -> str:
+async def run_heavy_agent(user_text: str) -> str:
     """
     Enhanced heavy agent using smart orchestrator with fallback to ReAct agent.
     
@@ -133,49 +330,36 @@ def run_heavy_agent(user_text: str) -> str:
     Returns:
         Response from smart orchestrator or fallback ReAct agent
     """
-    import asyncio
-    
     try:
         # First try the new smart orchestrator
         from .smart_orchestrator import smart_handle_message
         
         logger.info(f"HEAVY AGENT: Using smart orchestrator for query: {user_text[:100]}...")
         
-        # Run the async smart orchestrator
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-        try:
-            response = loop.run_until_complete(smart_handle_message(user_text))
-            logger.info("HEAVY AGENT: Smart orchestrator completed successfully")
-            return response
-        finally:
-            loop.close()
+        response = await smart_handle_message(user_text)
+        logger.info("HEAVY AGENT: Smart orchestrator completed successfully")
+        return response
             
     except Exception as e:
         logger.warning(f"Smart orchestrator failed: {str(e)}, falling back to ReAct agent")
         
         # Fallback to original ReAct agent if smart orchestrator fails
         try:
-            from .agent import ReActAgent
-            agent = ReActAgent()
+            from .agent_factory import create_react_agent
+            agent = create_react_agent()
             
             logger.info("HEAVY AGENT: Using fallback ReAct agent")
             
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                response = loop.run_until_complete(agent.process_request(user_text))
-                logger.info("HEAVY AGENT: ReAct agent completed successfully")
-                return response.content
-            finally:
-                loop.close()
+            response = await agent.process_request(user_text)
+            logger.info("HEAVY AGENT: ReAct agent completed successfully")
+            return response.content
                 
         except Exception as fallback_error:
             logger.error(f"Fallback ReAct agent failed: {str(fallback_error)}")
             return f"I encountered an error while processing your request: {str(e)} (fallback also failed: {str(fallback_error)})"
 
 
-def handle_message(user_text: str) -> str:
+async def handle_message(user_text: str) -> str:
     """
     Main entrypoint for message handling with routing and escalation.
     
@@ -185,9 +369,15 @@ def handle_message(user_text: str) -> str:
     Returns:
         Response from either light or heavy agent path
     """
+    # Step 0: Answer bare greetings without routing
+    greeting = _GREETING_RE.match(user_text)
+    if greeting:
+        logger.info("route=LIGHT_FASTPATH")
+        return _GREETING_REPLIES[greeting.group(1).lower()]
+    
     try:
         # Step 1: Get routing decision
-        routing_result = route_message(user_text)
+        routing_result = await route_message(user_text)
         
         # Step 2: Apply routing logic
         should_use_light = (
@@ -202,7 +392,7 @@ def handle_message(user_text: str) -> str:
         
         if should_use_light:
             # Step 3a: Try light path
-            light_response = run_light_agent(
+            light_response = await run_light_agent(
                 user_text,
                 routing_result["intent"],
                 routing_result["query"],
@@ -211,13 +401,13 @@ def handle_message(user_text: str) -> str:
             
             # Step 3b: Handle escalation
             if light_response == "ESCALATE":
-                return run_heavy_agent(user_text)
+                return await run_heavy_agent(user_text)
             else:
                 return light_response
         else:
             # Step 3c: Use heavy path directly
-            return run_heavy_agent(user_text)
+            return await run_heavy_agent(user_text)
             
     except Exception as e:
         # Fallback to heavy agent on any orchestration errors
-        return run_heavy_agent(user_text)
\ No newline at end of file
+        return await run_heavy_agent(user_text)
\ No newline at end of file
@@ -0,0 +1,197 @@
+"""
+Orchestrator Cache - Reuses routing decisions and light responses for repeated messages
+
+Lookups go through two tiers:
+- exact: keyed by the hash of the normalized message, so "Hello" and "hello "
+  share an entry without any network call
+- semantic (optional): the closest cached message is returned if the cosine
+  similarity of its embedding clears the threshold. The caller embeds the
+  message (embed) and decides what part of a near match may be reused, since
+  a similar message is still a different message.
+
+Both tiers are LRU-bounded and entries expire after a TTL.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, Optional, Tuple
+
+import numpy as np
+import xxhash
+
+from config import settings
+from services.embedding_service import embedding_service
+from utils.logging_config import get_logger
+from .plan_cache import normalize_message
+
+logger = get_logger(__name__)
+
+
+@lru_cache(maxsize=1024)
+def _cached_message_embedding(normalized_message: str) -> Tuple[float, ...]:
+    """Embed a normalized message; raises, so failures are never cached"""
+    return tuple(embedding_service.generate_embedding(normalized_message))
+
+
+def message_embedding(normalized_message: str) -> Optional[Tuple[float, ...]]:
+    """Embed a normalized message once, shared by every cache that looks it up"""
+    try:
+        return _cached_message_embedding(normalized_message)
+    except Exception as e:
+        # Not remembered, so the next lookup of this message tries again
+        logger.debug(f"Skipping semantic cache lookup: {str(e)}")
+        return None
+
+
+class OrchestratorCache:
+    """Two-tier (exact + semantic) LRU cache with a TTL"""
+
+    # Rows of the similarity matrix; bounds each semantic lookup to one small matmul
+    SEMANTIC_MAX_ENTRIES = 2048
+
+    def __init__(self,
+                 name: str,
+                 max_entries: int = 10000,
+                 ttl_sec: float = 3600,
+                 threshold: float = 0.95,
+                 semantic: bool = True):
+        """
+        Initialize the cache
+
+        Args:
+            name: Name used in log messages
+            max_entries: Maximum number of exact entries
+            ttl_sec: Age after which an entry expires
+            threshold: Minimum cosine similarity for a semantic hit
+            semantic: Whether to fall back to embedding similarity on exact misses
+        """
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_sec = ttl_sec
+        self.threshold = threshold
+        self.semantic = semantic
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        # Semantic tier: key -> matrix row, in LRU order
+        self._slots: "OrderedDict[str, int]" = OrderedDict()
+        self._slot_keys: list = []
+        self._vectors: Optional[np.ndarray] = None
+        self._free_slots: list = []
+
+    @staticmethod
+    def _key(normalized_message: str) -> str:
+        return xxhash.xxh3_128_hexdigest(normalized_message.encode("utf-8"))
+
+    def get(self, user_text: str) -> Optional[Any]:
+        """Return the value cached for exactly this (normalized) message, if any"""
+        key = self._key(normalize_message(user_text))
+
+        with self._lock:
+            value = self._get_entry(key, time.time())
+        if value is not None:
+            logger.debug(f"{self.name} cache hit (exact)")
+        return value
+
+    def embed(self, user_text: str) -> Optional[Tuple[float, ...]]:
+        """Embed user_text for the semantic tier (blocking; None if the tier is off or embedding fails)"""
+        if not self.semantic:
+            return None
+        return message_embedding(normalize_message(user_text))
+
+    def get_similar(self, embedding: Tuple[float, ...]) -> Optional[Any]:
+        """Return the value cached for the message most similar to embedding, if close enough"""
+        with self._lock:
+            if self._vectors is None or not self._slots:
+                return None
+            similarities = self._vectors[:len(self._slot_keys)] @ np.asarray(embedding, dtype=np.float32)
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold or self._slot_keys[best] is None:
+                return None
+            value = self._get_entry(self._slot_keys[best], time.time())
+        if value is not None:
+            logger.debug(f"{self.name} cache hit (semantic, similarity={float(similarities[best]):.3f})")
+        return value
+
+    def set(self, user_text: str, value: Any, embedding: Optional[Tuple[float, ...]] = None):
+        """Cache value for user_text, indexing it in the semantic tier when its embedding is given"""
+        key = self._key(normalize_message(user_text))
+
+        with self._lock:
+            self._entries[key] = (value, time.time())
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                self._drop_slot(evicted)
+            if embedding is not None and self.semantic:
+                self._store_vector(key, embedding)
+
+    def clear(self):
+        """Remove every cached entry"""
+        with self._lock:
+            self._entries.clear()
+            self._slots.clear()
+            self._slot_keys = []
+            self._free_slots = []
+            self._vectors = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _get_entry(self, key: str, now: float) -> Optional[Any]:
+        """Exact lookup with TTL and LRU bookkeeping (lock held)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, created_at = entry
+        if now - created_at > self.ttl_sec:
+            del self._entries[key]
+            self._drop_slot(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def _store_vector(self, key: str, embedding: Tuple[float, ...]):
+        """Place the embedding of key in the similarity matrix (lock held)"""
+        if self._vectors is None:
+            self._vectors = np.zeros((self.SEMANTIC_MAX_ENTRIES, len(embedding)), dtype=np.float32)
+
+        slot = self._slots.get(key)
+        if slot is None:
+            if self._free_slots:
+                slot = self._free_slots.pop()
+            elif len(self._slot_keys) < self.SEMANTIC_MAX_ENTRIES:
+                slot = len(self._slot_keys)
+                self._slot_keys.append(None)
+            else:
+                # Reuse the row of the least recently stored message
+                _, slot = self._slots.popitem(last=False)
+            self._slots[key] = slot
+        self._slots.move_to_end(key)
+        self._slot_keys[slot] = key
+        self._vectors[slot] = embedding
+
+    def _drop_slot(self, key: str):
+        """Remove key from the semantic tier (lock held)"""
+        slot = self._slots.pop(key, None)
+        if slot is not None:
+            self._slot_keys[slot] = None
+            self._vectors[slot] = 0.0
+            self._free_slots.append(slot)
+
+
+route_cache = OrchestratorCache(
+    "route",
+    max_entries=settings.agent.orchestrator_cache_max_entries,
+    ttl_sec=settings.agent.orchestrator_cache_ttl_sec,
+    threshold=settings.agent.orchestrator_cache_threshold
+)
+
+# A light answer is written for one exact message, so it is never served to a similar one
+light_response_cache = OrchestratorCache(
+    "light_response",
+    max_entries=settings.agent.orchestrator_cache_max_entries,
+    ttl_sec=settings.agent.orchestrator_cache_ttl_sec,
+    semantic=False
+)
@@ -0,0 +1,266 @@
+"""
+Plan Cache - Reuses execution plans for repeated requests
+
+Plans are keyed by a deterministic fingerprint of the normalized user message
+and the planning inputs (planner configuration + has_image flag + normalized
+context). Plan steps carry the literal entities of the request they were
+planned for, so only an exact repeat is ever served a cached plan.
+
+Only the `max_entries` most frequently used plans are kept in the in-memory
+index (LFU), which keeps lookups O(max_entries). Hit counts for every plan are
+kept in SQLite so plans can be re-admitted by frequency after a restart.
+"""
+
+import heapq
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Any, Optional
+
+import orjson
+import xxhash
+
+from utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Context keys that change between otherwise identical requests
+VOLATILE_CONTEXT_KEYS = frozenset({"timestamp", "request_id", "start_time"})
+
+_CONTAINER_TYPES = (dict, list, tuple)
+
+
+@dataclass
+class PlanCacheHit:
+    """A cached plan that matched the current request"""
+    fingerprint: str
+    plan: Dict[str, Any]
+
+
+@dataclass
+class _PlanEntry:
+    """In-memory index entry for a cached plan"""
+    fingerprint: str
+    plan: Dict[str, Any]
+    created_at: float
+
+
+def normalize_context(context: Any) -> Any:
+    """Recursively drop volatile fields so equivalent contexts hash identically"""
+    # Scalars are passed through inline; recursing into them dominated fingerprinting
+    if isinstance(context, dict):
+        return {
+            str(key): normalize_context(value) if isinstance(value, _CONTAINER_TYPES) else value
+            for key, value in context.items()
+            if key not in VOLATILE_CONTEXT_KEYS
+        }
+    if isinstance(context, _CONTAINER_TYPES):
+        return [
+            normalize_context(value) if isinstance(value, _CONTAINER_TYPES) else value
+            for value in context
+        ]
+    return context
+
+
+def normalize_message(user_message: str) -> str:
+    """Collapse whitespace and case so trivially different messages share a fingerprint"""
+    return " ".join(user_message.casefold().split())
+
+
+def _hash_payload(payload: Any) -> str:
+    """xxh3-128 of the canonical JSON encoding of payload (a cache key, not a security boundary)"""
+    encoded = orjson.dumps(payload, option=orjson.OPT_SORT_KEYS, default=str)
+    return xxhash.xxh3_128_hexdigest(encoded)
+
+
+def planner_fingerprint(system_prompt: str, model_name: str, temperature: float) -> str:
+    """Fingerprint of a planner configuration; changing the prompt or model retires its cached plans"""
+    return _hash_payload({"system_prompt": system_prompt, "model": model_name, "temperature": temperature})
+
+
+def context_fingerprint(has_image: bool, context: Optional[Dict[str, Any]], planner_key: str = "") -> str:
+    """Fingerprint of everything besides the user message that influences planning"""
+    return _hash_payload({
+        "planner": planner_key,
+        "has_image": has_image,
+        "context": normalize_context(context or {})
+    })
+
+
+def request_fingerprint(user_message: str, context_key: str) -> str:
+    """Fingerprint identifying a single cached plan"""
+    return _hash_payload({"message": normalize_message(user_message), "context_key": context_key})
+
+
+class PlanCache:
+    """Exact-match plan cache backed by an LFU-bounded in-memory index and SQLite"""
+
+    GC_INTERVAL_SEC = 3600
+
+    def __init__(self,
+                 db_path: str = ":memory:",
+                 max_entries: int = 256,
+                 ttl_sec: int = 7 * 24 * 3600,
+                 max_bytes: int = 100 * 1024 * 1024):
+        """
+        Initialize the plan cache
+
+        Args:
+            db_path: SQLite database path (":memory:" keeps the cache process-local)
+            max_entries: Maximum number of plans held in the in-memory index
+            ttl_sec: Age after which a cached plan expires
+            max_bytes: Upper bound on the size of persisted plans
+        """
+        self.max_entries = max_entries
+        self.ttl_sec = ttl_sec
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._cache_table: "OrderedDict[str, _PlanEntry]" = OrderedDict()
+        self._global_table: Dict[str, int] = {}
+        self._last_gc = 0.0
+
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS plan_templates (
+                fingerprint TEXT PRIMARY KEY,
+                plan BLOB NOT NULL,
+                created_at REAL NOT NULL,
+                frequency INTEGER NOT NULL DEFAULT 1
+            )
+            """
+        )
+        self._conn.commit()
+        self._load()
+
+    def _load(self):
+        """Load the most frequently used persisted plans into the in-memory index"""
+        with self._lock:
+            self._purge_expired()
+            rows = self._conn.execute(
+                "SELECT fingerprint, plan, created_at FROM plan_templates "
+                "ORDER BY frequency DESC, created_at DESC LIMIT ?",
+                (self.max_entries,)
+            ).fetchall()
+
+        for fingerprint, plan, created_at in reversed(rows):
+            self._cache_table[fingerprint] = _PlanEntry(
+                fingerprint=fingerprint,
+                plan=orjson.loads(plan),
+                created_at=created_at
+            )
+
+        if rows:
+            logger.info(f"Loaded {len(rows)} of {len(self._global_table)} cached plans")
+
+    def _is_expired(self, entry: _PlanEntry, now: float) -> bool:
+        return now - entry.created_at > self.ttl_sec
+
+    def _evict_one(self):
+        """Evict the least frequently used plan from the in-memory index"""
+        victim = heapq.nsmallest(1, self._cache_table, key=lambda fp: self._global_table.get(fp, 0))[0]
+        del self._cache_table[victim]
+        logger.debug(f"Evicted plan {victim[:12]} (frequency={self._global_table.get(victim, 0)})")
+
+    def _purge_expired(self):
+        """Drop expired plans and trim the persisted store to max_bytes (lock held)"""
+        now = time.time()
+        self._last_gc = now
+
+        for fingerprint in [fp for fp, e in self._cache_table.items() if self._is_expired(e, now)]:
+            del self._cache_table[fingerprint]
+        self._conn.execute("DELETE FROM plan_templates WHERE created_at < ?", (now - self.ttl_sec,))
+
+        total_bytes = self._conn.execute(
+            "SELECT COALESCE(SUM(LENGTH(plan)), 0) FROM plan_templates"
+        ).fetchone()[0]
+        if total_bytes > self.max_bytes:
+            # Drop the least frequently used plans until the store fits again
+            rows = self._conn.execute(
+                "SELECT fingerprint, LENGTH(plan) FROM plan_templates ORDER BY frequency ASC, created_at ASC"
+            ).fetchall()
+            doomed = []
+            for fingerprint, size in rows:
+                if total_bytes <= self.max_bytes:
+                    break
+                doomed.append((fingerprint,))
+                total_bytes -= size
+                self._cache_table.pop(fingerprint, None)
+            self._conn.executemany("DELETE FROM plan_templates WHERE fingerprint = ?", doomed)
+            logger.info(f"Trimmed {len(doomed)} plans to respect plan cache size bound")
+
+        self._conn.commit()
+        self._global_table = dict(
+            self._conn.execute("SELECT fingerprint, frequency FROM plan_templates").fetchall()
+        )
+
+    def get(self, fingerprint: str) -> Optional[PlanCacheHit]:
+        """
+        Find the plan cached for exactly this request
+
+        Args:
+            fingerprint: Fingerprint from request_fingerprint()
+
+        Returns:
+            PlanCacheHit if the request was cached, None otherwise
+        """
+        with self._lock:
+            entry = self._cache_table.get(fingerprint)
+            if entry is None or self._is_expired(entry, time.time()):
+                return None
+            self._record_hit(entry)
+            return PlanCacheHit(fingerprint=fingerprint, plan=entry.plan)
+
+    def _record_hit(self, entry: _PlanEntry):
+        """Bump the frequency and recency of a served plan (lock held)"""
+        self._global_table[entry.fingerprint] = self._global_table.get(entry.fingerprint, 0) + 1
+        self._cache_table.move_to_end(entry.fingerprint)
+        self._conn.execute(
+            "UPDATE plan_templates SET frequency = frequency + 1 WHERE fingerprint = ?",
+            (entry.fingerprint,)
+        )
+        self._conn.commit()
+
+    def store(self, fingerprint: str, plan: Dict[str, Any]):
+        """
+        Cache a plan that executed successfully
+
+        Args:
+            fingerprint: Fingerprint from request_fingerprint()
+            plan: Serialized plan template
+        """
+        created_at = time.time()
+
+        with self._lock:
+            if created_at - self._last_gc >= self.GC_INTERVAL_SEC:
+                self._purge_expired()
+
+            if fingerprint not in self._cache_table and len(self._cache_table) >= self.max_entries:
+                self._evict_one()
+
+            self._cache_table[fingerprint] = _PlanEntry(
+                fingerprint=fingerprint,
+                plan=plan,
+                created_at=created_at
+            )
+            self._cache_table.move_to_end(fingerprint)
+            frequency = self._global_table.get(fingerprint, 0) + 1
+            self._global_table[fingerprint] = frequency
+            self._conn.execute(
+                "INSERT OR REPLACE INTO plan_templates (fingerprint, plan, created_at, frequency) VALUES (?, ?, ?, ?)",
+                (fingerprint, orjson.dumps(plan, default=str), created_at, frequency)
+            )
+            self._conn.commit()
+
+    def clear(self):
+        """Remove every cached plan"""
+        with self._lock:
+            self._cache_table.clear()
+            self._global_table.clear()
+            self._conn.execute("DELETE FROM plan_templates")
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        return len(self._cache_table)
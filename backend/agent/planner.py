@@ -2,34 +2,295 @@
 Planner Module - Responsible for generating multi-step plans for user queries
 """
 
+import asyncio
 import json
 import re
-from typing import Dict, List, Any, Optional
-from langchain_openai import ChatOpenAI
+from collections import Counter
+from typing import Callable, Dict, List, Any, Optional, Tuple
 from langchain.schema import SystemMessage, HumanMessage
+import orjson
 from config import settings
+from .llm_clients import get_chat_model
+from .plan_cache import planner_fingerprint
+
+# System prompts carry every static instruction and are sent first, so they stay
+# byte-identical across calls and OpenAI can serve them from the prompt cache;
+# the human message only holds request-specific content.
+PLANNER_PROMPT_CACHE_KEY = "planner"
+
+PLANNER_SYSTEM_PROMPT = """You are a RAG (Retrieval-Augmented Generation) planning agent. Your ONLY purpose is to create plans for answering questions using document search and information synthesis.
+
+You can ONLY create plans with these two types of steps:
+1. SEARCH: Use "search_documents" tool to find relevant information
+2. SYNTHESIZE: Combine retrieved information to answer the user's question
+
+Available tool: "search_documents" - searches through uploaded documents
+
+For each user question, create a plan following this pattern:
+- Step 1: Search for relevant information using specific search queries
+- Step 2: (Optional) Search for additional information if the question has multiple aspects  
+- Final Step: Synthesize the retrieved information to provide a comprehensive answer
+
+Output your plan as a JSON object with this structure:
+{
+    "objective": "Answer the user's question using document search and synthesis",
+    "complexity": "low|medium|high",
+    "steps": [
+        {
+            "action": "Search documents for [specific search query]",
+            "reasoning": "Why this search is needed to answer the question",
+            "tool_needed": "search_documents",
+            "depends_on": [],
+            "expected_outcome": "What information should be found"
+        },
+        {
+            "action": "Synthesize retrieved information to answer: [user's question]",
+            "reasoning": "Combine findings to provide comprehensive answer",
+            "tool_needed": null,
+            "depends_on": [0],
+            "expected_outcome": "Clear, well-supported answer to the user's question"
+        }
+    ]
+}
+
+"depends_on" lists the 0-based indices of earlier steps whose results a step needs. Searches that do not build on each other should have an empty list so they can run in parallel; the synthesis step depends on every search.
+
+Keep plans simple and focused on document-based information retrieval and synthesis only.
+
+Analyze the request carefully and create a step-by-step plan. Consider:
+- What is the user really asking for?
+- What information or resources might be needed?
+- What are the logical steps to accomplish this?
+- What could go wrong and how to handle it?
+
+Create a comprehensive plan that will lead to a successful outcome."""
+PLANNER_SYSTEM_MESSAGE = SystemMessage(content=PLANNER_SYSTEM_PROMPT)
+
+REPLANNER_SYSTEM_PROMPT = """You are a replanning agent. Based on the execution results of a previous plan, you need to determine what additional steps are needed to complete the user's objective.
+
+Analyze:
+1. What was accomplished successfully
+2. What failed or was incomplete
+3. What new information was discovered
+4. What the user actually needs now
+
+Create additional steps to complete the objective, or modify the approach based on new findings.
+
+Based on the results you are given, determine what additional steps are needed to fully accomplish the objective. Create new steps that:
+1. Build on what was already accomplished
+2. Address any failures or incomplete results
+3. Incorporate any new information discovered
+4. Respond to user feedback if provided
+
+Output only the additional steps needed as a JSON plan."""
+REPLANNER_SYSTEM_MESSAGE = SystemMessage(content=REPLANNER_SYSTEM_PROMPT)
+
+_JSON_DECODER = json.JSONDecoder()
+# Greetings and acknowledgements need no documents, so they get a one-step plan without an LLM call
+_TRIVIAL_REQUEST_RE = re.compile(
+    r"^\s*(hi|hello|hey|thanks|thank you|thx|bye|great|cool)[!.?\s]*$",
+    re.IGNORECASE
+)
+# (action template, reasoning, tool) of each step of the plan used when LLM planning fails
+_FALLBACK_STEP_TEMPLATES = (
+    (
+        "Search documents for information related to: {user_message}",
+        "Find relevant documents to answer the user's question",
+        "search_documents"
+    ),
+    (
+        "Synthesize retrieved information to answer: {user_message}",
+        "Combine document findings to provide comprehensive answer",
+        None
+    ),
+    (
+        "Formulate comprehensive response",
+        "Provide a complete and helpful answer to the user",
+        None
+    ),
+)
+# Start of the steps array in a (possibly still streaming) plan
+_STEPS_ARRAY_RE = re.compile(r'(?<!\\)"steps"\s*:\s*\[')
+
+
+def _extract_bullet(line: str) -> Optional[str]:
+    """
+    Get the text of a bulleted ("-", "*") or numbered ("1.") line in one pass
+    
+    Returns:
+        The text after the marker, or None if the line is not a non-empty list item
+    """
+    i, n = 0, len(line)
+    while i < n and line[i] in " \t":
+        i += 1
+    if i == n:
+        return None
+
+    if line[i] in "-*":
+        j = i + 1
+    elif line[i].isdigit():
+        j = i + 1
+        while j < n and line[j].isdigit():
+            j += 1
+        if j == n or line[j] != ".":
+            return None
+        j += 1
+    else:
+        return None
+
+    while j < n and line[j] in " \t":
+        j += 1
+    return line[j:].rstrip() or None
+
+
+class _StepStreamParser:
+    """
+    Incremental parser for the steps of a streamed plan
+    
+    Feeding it the response chunk by chunk yields every step object of the
+    "steps" array as soon as its closing brace has arrived. Each object is
+    decoded once it is complete, so the work is linear in the response size.
+    """
+    
+    def __init__(self):
+        self._buffer = ""
+        self._pos = -1  # position in the steps array; -1 until it is found
+        self._done = False
+    
+    @property
+    def text(self) -> str:
+        """The full response received so far"""
+        return self._buffer
+    
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """Add a response chunk and return the step objects it completed"""
+        self._buffer += chunk
+        if self._done:
+            return []
+        
+        if self._pos < 0:
+            match = _STEPS_ARRAY_RE.search(self._buffer)
+            if not match:
+                return []
+            self._pos = match.end()
+        
+        steps = []
+        buffer = self._buffer
+        while True:
+            while self._pos < len(buffer) and buffer[self._pos] in " \t\r\n,":
+                self._pos += 1
+            if self._pos >= len(buffer):
+                break
+            if buffer[self._pos] != "{":
+                # End of the array (or something unexpected): the full parse takes over
+                self._done = True
+                break
+            # The object cannot be complete until a closing brace has arrived
+            if buffer.find("}", self._pos) == -1:
+                break
+            try:
+                step, end = _JSON_DECODER.raw_decode(buffer, self._pos)
+            except json.JSONDecodeError:
+                break
+            self._pos = end
+            if isinstance(step, dict):
+                steps.append(step)
+        return steps
+
+
+def _coerce_depends_on(value: Any) -> Optional[List[int]]:
+    """
+    Normalize an LLM-provided depends_on value to a list of step indices
+    
+    Returns:
+        The indices as ints, or None (depend on the previous step) if the value is malformed
+    """
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, int):
+        return [value]
+    if not isinstance(value, list):
+        return None
+    
+    indices = []
+    for item in value:
+        if isinstance(item, str) and item.strip().isdigit():
+            item = int(item)
+        elif not isinstance(item, int) or isinstance(item, bool):
+            return None
+        indices.append(item)
+    return indices
 
 
 class PlanStep:
     """Represents a single step in an execution plan"""
+
+    # Plans create many steps; slots keep them small and attribute access cheap
+    __slots__ = ("action", "reasoning", "tool_needed", "depends_on", "_status", "_plan", "result", "observations", "_dict")
     
-    def __init__(self, action: str, reasoning: str, tool_needed: Optional[str] = None):
+    def __init__(self, action: str, reasoning: str, tool_needed: Optional[str] = None, depends_on: Optional[List[int]] = None):
         self.action = action
         self.reasoning = reasoning
         self.tool_needed = tool_needed
-        self.status = "pending"  # pending, executing, completed, failed
+        self.depends_on = depends_on  # indices of prerequisite steps; None = previous step
+        self._plan = None  # owning ExecutionPlan, whose status counts follow this step
+        self._status = "pending"  # pending, executing, completed, failed
         self.result = None
         self.observations = []
+        self._dict = None  # cached serialization, dropped by _invalidate()
+
+    @property
+    def status(self) -> str:
+        return self._status
+
+    @status.setter
+    def status(self, value: str):
+        plan = self._plan
+        if plan is not None:
+            plan._status_counts[self._status] -= 1
+            plan._status_counts[value] += 1
+        self._status = value
+        self._invalidate()
+
+    def finish(self, success: bool, result: Any, observations: List[str]):
+        """Record the outcome of executing the step"""
+        self.result = result
+        self.observations = observations
+        self.status = "completed" if success else "failed"
+
+    def _invalidate(self):
+        """Drop the cached serialization of the step and of the plan holding it"""
+        self._dict = None
+        if self._plan is not None:
+            self._plan._dict = None
+
+    def _serialize(self) -> Dict[str, Any]:
+        """Serialization cached until the step changes through status or finish()"""
+        if self._dict is None:
+            self._dict = {
+                "action": self.action,
+                "reasoning": self.reasoning,
+                "tool_needed": self.tool_needed,
+                "depends_on": self.depends_on,
+                "status": self._status,
+                "result": self.result,
+                "observations": self.observations
+            }
+        return self._dict
 
     def to_dict(self) -> Dict[str, Any]:
-        return {
-            "action": self.action,
-            "reasoning": self.reasoning,
-            "tool_needed": self.tool_needed,
-            "status": self.status,
-            "result": self.result,
-            "observations": self.observations
-        }
+        """Serialize the step"""
+        return dict(self._serialize())
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "PlanStep":
+        """Build a fresh (pending) step from a serialized step"""
+        return cls(
+            action=data.get("action", ""),
+            reasoning=data.get("reasoning", ""),
+            tool_needed=data.get("tool_needed"),
+            depends_on=_coerce_depends_on(data.get("depends_on"))
+        )
     
     def __repr__(self) -> str:
         return f"PlanStep(action='{self.action[:50]}...', status='{self.status}')"
@@ -37,13 +298,39 @@ class PlanStep:
 
 class ExecutionPlan:
     """Represents a complete execution plan with multiple steps"""
+
+    __slots__ = ("objective", "steps", "context", "_status", "current_step_index", "_status_counts", "_dict")
     
     def __init__(self, objective: str, steps: List[PlanStep], context: Dict[str, Any] = None):
         self.objective = objective
-        self.steps = steps
+        self.steps = []
         self.context = context or {}
-        self.status = "created"  # created, executing, completed, failed, needs_replanning
+        self._status = "created"  # created, executing, completed, failed, needs_replanning
         self.current_step_index = 0
+        # Step statuses are counted as they change, so progress queries are O(1)
+        self._status_counts = Counter()
+        self._dict = None  # cached serialization, dropped whenever the plan or a step changes
+        self.add_steps(steps)
+
+    @property
+    def status(self) -> str:
+        return self._status
+
+    @status.setter
+    def status(self, value: str):
+        self._status = value
+        self._dict = None
+
+    def add_steps(self, steps: List[PlanStep]):
+        """Append steps to the plan and track their statuses"""
+        for step in steps:
+            if step._plan is not None and step._plan is not self:
+                step._plan._status_counts[step._status] -= 1
+            step._plan = self
+            self._status_counts[step._status] += 1
+            step._dict = None
+        self.steps.extend(steps)
+        self._dict = None
 
     def get_current_step(self) -> Optional[PlanStep]:
         """Get the current step to execute"""
@@ -54,15 +341,51 @@ class ExecutionPlan:
     def advance_step(self):
         """Move to the next step"""
         self.current_step_index += 1
+        self._dict = None
 
     def is_complete(self) -> bool:
         """Check if all steps have been executed"""
         return self.current_step_index >= len(self.steps)
 
+    def get_dependencies(self) -> List[List[int]]:
+        """
+        Get the indices of the steps each step has to wait for
+        
+        A step without explicit dependencies depends on the step before it, so
+        plans without dependency information run strictly in order. Invalid
+        and forward references are ignored.
+        
+        Returns:
+            One sorted list of earlier step indices per step
+        """
+        return [self.step_dependencies(i, step) for i, step in enumerate(self.steps)]
+
+    @staticmethod
+    def step_dependencies(index: int, step: PlanStep) -> List[int]:
+        """Get the sorted indices of the earlier steps the step at index has to wait for"""
+        depends_on = step.depends_on if step.depends_on is not None else ([index - 1] if index > 0 else [])
+        return sorted({d for d in depends_on if isinstance(d, int) and 0 <= d < index})
+
+    def get_execution_waves(self) -> List[List[PlanStep]]:
+        """
+        Group steps into waves that can run concurrently
+        
+        Returns:
+            List of waves; every step in a wave only depends on earlier waves
+        """
+        levels = []
+        for prerequisites in self.get_dependencies():
+            levels.append(max(levels[d] for d in prerequisites) + 1 if prerequisites else 0)
+
+        waves = [[] for _ in range(max(levels) + 1)] if levels else []
+        for step, level in zip(self.steps, levels):
+            waves[level].append(step)
+        return waves
+
     def get_progress(self) -> Dict[str, Any]:
         """Get progress statistics"""
-        completed = sum(1 for step in self.steps if step.status == "completed")
-        failed = sum(1 for step in self.steps if step.status == "failed")
+        completed = self._status_counts["completed"]
+        failed = self._status_counts["failed"]
         return {
             "total_steps": len(self.steps),
             "completed": completed,
@@ -72,14 +395,47 @@ class ExecutionPlan:
         }
 
     def to_dict(self) -> Dict[str, Any]:
+        """
+        Serialize the plan
+        
+        The serialization is cached until the plan or one of its steps changes
+        (status, finish(), advance_step, add_steps); callers get their own copy.
+        """
+        if self._dict is None:
+            self._dict = {
+                "objective": self.objective,
+                "steps": [step._serialize() for step in self.steps],
+                "context": self.context,
+                "status": self._status,
+                "current_step_index": self.current_step_index,
+                "progress": self.get_progress()
+            }
+        cached = self._dict
+        return {**cached, "steps": [dict(step) for step in cached["steps"]], "progress": dict(cached["progress"])}
+
+    def to_template(self) -> Dict[str, Any]:
+        """Serialize only the reusable parts of the plan (no execution state)"""
         return {
             "objective": self.objective,
-            "steps": [step.to_dict() for step in self.steps],
-            "context": self.context,
-            "status": self.status,
-            "current_step_index": self.current_step_index,
-            "progress": self.get_progress()
+            "steps": [
+                {
+                    "action": step.action,
+                    "reasoning": step.reasoning,
+                    "tool_needed": step.tool_needed,
+                    "depends_on": step.depends_on
+                }
+                for step in self.steps
+            ]
         }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], context: Dict[str, Any] = None) -> "ExecutionPlan":
+        """Build a fresh plan from a serialized plan or plan template"""
+        return cls(
+            objective=data.get("objective", "Process user request"),
+            steps=[PlanStep.from_dict(step) for step in data.get("steps", [])],
+            context=context
+        )
     
     def __repr__(self) -> str:
         return f"ExecutionPlan(objective='{self.objective[:50]}...', steps={len(self.steps)}, status='{self.status}')"
@@ -89,13 +445,22 @@ class Planner:
     """Strategic planner that creates execution plans for user requests"""
     
     def __init__(self, model_name: str = None, temperature: float = 0.1):
-        self.llm = ChatOpenAI(
-            model=model_name or settings.MODEL_NAME,
-            temperature=temperature,  # Lower temperature for more consistent planning
-            openai_api_key=settings.OPENAI_API_KEY
+        # Shared with every planner of the same configuration, along with its connection pool
+        self.llm = get_chat_model(
+            model_name or settings.MODEL_NAME,
+            temperature,  # Lower temperature for more consistent planning
+            prompt_cache_key=PLANNER_PROMPT_CACHE_KEY
         )
-
-    async def create_plan(self, user_message: str, has_image: bool = False, context: Dict[str, Any] = None) -> ExecutionPlan:
+        # Bounds concurrent planning calls so bursts of requests don't hit rate limits
+        self._llm_semaphore = asyncio.Semaphore(settings.agent.planner_max_concurrency)
+        # Scopes cached plans to this prompt and model
+        self.cache_key = planner_fingerprint(PLANNER_SYSTEM_PROMPT, model_name or settings.MODEL_NAME, temperature)
+
+    async def create_plan(self,
+                          user_message: str,
+                          has_image: bool = False,
+                          context: Dict[str, Any] = None,
+                          on_step: Optional[Callable[[int, PlanStep], None]] = None) -> ExecutionPlan:
         """
         Generate a comprehensive plan for the user's request
         
@@ -103,29 +468,36 @@ class Planner:
             user_message: The user's input message
             has_image: Whether an image was uploaded
             context: Additional context for planning
+            on_step: Optional callback; when given, the plan is streamed and it is
+                called with the index and step as soon as each step has arrived.
+                Those same step objects end up in the returned plan.
             
         Returns:
             ExecutionPlan: A complete execution plan
         """
+        if not has_image and _TRIVIAL_REQUEST_RE.match(user_message):
+            return self._create_direct_plan(user_message, context)
+
         planning_prompt = self._build_planning_prompt(user_message, has_image, context)
         
         messages = [
-            SystemMessage(content=self._get_planner_system_prompt()),
+            PLANNER_SYSTEM_MESSAGE,
             HumanMessage(content=planning_prompt)
         ]
+        streamed: List[PlanStep] = []
 
         try:
-            response = self.llm.invoke(messages)
-            plan_data = self._parse_plan_response(response.content)
+            async with self._llm_semaphore:
+                if on_step is None:
+                    content = (await self.llm.ainvoke(messages)).content
+                else:
+                    content = await self._stream_plan_response(messages, streamed, on_step)
+            plan_data = self._parse_plan_response(content)
             
-            # Convert to ExecutionPlan object
-            steps = [
-                PlanStep(
-                    action=step.get("action", ""),
-                    reasoning=step.get("reasoning", ""),
-                    tool_needed=step.get("tool_needed")
-                )
-                for step in plan_data.get("steps", [])
+            # Convert to ExecutionPlan object; streamed steps are already handed out
+            steps = streamed + [
+                PlanStep.from_dict(step)
+                for step in plan_data.get("steps", [])[len(streamed):]
             ]
             
             return ExecutionPlan(
@@ -135,9 +507,25 @@ class Planner:
             )
 
         except Exception as e:
+            if streamed:
+                # Steps handed out before the failure may already be running, so keep them
+                return ExecutionPlan(objective="Process user request", steps=streamed, context=context or {})
             # Fallback plan if LLM fails
             return self._create_fallback_plan(user_message, has_image)
 
+    async def _stream_plan_response(self,
+                                    messages: List,
+                                    streamed: List[PlanStep],
+                                    on_step: Callable[[int, PlanStep], None]) -> str:
+        """Stream the planning response, appending and announcing each step as it completes"""
+        parser = _StepStreamParser()
+        async for chunk in self.llm.astream(messages):
+            for step_data in parser.feed(chunk.content):
+                step = PlanStep.from_dict(step_data)
+                on_step(len(streamed), step)
+                streamed.append(step)
+        return parser.text
+
     async def replan(self, current_plan: ExecutionPlan, execution_results: List[Dict], user_feedback: str = None) -> ExecutionPlan:
         """
         Re-plan based on execution results and potential user feedback
@@ -153,12 +541,13 @@ class Planner:
         replanning_prompt = self._build_replanning_prompt(current_plan, execution_results, user_feedback)
         
         messages = [
-            SystemMessage(content=self._get_replanner_system_prompt()),
+            REPLANNER_SYSTEM_MESSAGE,
             HumanMessage(content=replanning_prompt)
         ]
 
         try:
-            response = self.llm.invoke(messages)
+            async with self._llm_semaphore:
+                response = await self.llm.ainvoke(messages)
             plan_data = self._parse_plan_response(response.content)
             
             # Create new plan with updated steps
@@ -172,7 +561,7 @@ class Planner:
             ]
             
             # Update the existing plan
-            current_plan.steps.extend(new_steps)
+            current_plan.add_steps(new_steps)
             current_plan.status = "executing"
             
             return current_plan
@@ -182,57 +571,33 @@ class Planner:
             current_plan.status = "needs_replanning"
             return current_plan
 
+    async def replan_many(self, requests: List[Tuple[ExecutionPlan, List[Dict], Optional[str]]]) -> List[ExecutionPlan]:
+        """
+        Re-plan several plans at once
+        
+        The replanning calls run concurrently, bounded by the planner's
+        concurrency limit, so N replans cost about one round-trip instead of N.
+        
+        Args:
+            requests: (current_plan, execution_results, user_feedback) per plan
+            
+        Returns:
+            Updated plans, in request order
+        """
+        return list(await asyncio.gather(
+            *(self.replan(plan, results, feedback) for plan, results, feedback in requests)
+        ))
+
     def _get_planner_system_prompt(self) -> str:
         """System prompt for the RAG-focused planning LLM"""
-        return """You are a RAG (Retrieval-Augmented Generation) planning agent. Your ONLY purpose is to create plans for answering questions using document search and information synthesis.
-
-You can ONLY create plans with these two types of steps:
-1. SEARCH: Use "search_documents" tool to find relevant information
-2. SYNTHESIZE: Combine retrieved information to answer the user's question
-
-Available tool: "search_documents" - searches through uploaded documents
-
-For each user question, create a plan following this pattern:
-- Step 1: Search for relevant information using specific search queries
-- Step 2: (Optional) Search for additional information if the question has multiple aspects  
-- Final Step: Synthesize the retrieved information to provide a comprehensive answer
-
-Output your plan as a JSON object with this structure:
-{
-    "objective": "Answer the user's question using document search and synthesis",
-    "complexity": "low|medium|high",
-    "steps": [
-        {
-            "action": "Search documents for [specific search query]",
-            "reasoning": "Why this search is needed to answer the question",
-            "tool_needed": "search_documents",
-            "expected_outcome": "What information should be found"
-        },
-        {
-            "action": "Synthesize retrieved information to answer: [user's question]",
-            "reasoning": "Combine findings to provide comprehensive answer",
-            "tool_needed": null,
-            "expected_outcome": "Clear, well-supported answer to the user's question"
-        }
-    ]
-}
-
-Keep plans simple and focused on document-based information retrieval and synthesis only."""
+        return PLANNER_SYSTEM_PROMPT
 
     def _get_replanner_system_prompt(self) -> str:
         """System prompt for replanning"""
-        return """You are a replanning agent. Based on the execution results of a previous plan, you need to determine what additional steps are needed to complete the user's objective.
-
-Analyze:
-1. What was accomplished successfully
-2. What failed or was incomplete
-3. What new information was discovered
-4. What the user actually needs now
-
-Create additional steps to complete the objective, or modify the approach based on new findings."""
+        return REPLANNER_SYSTEM_PROMPT
 
     def _build_planning_prompt(self, user_message: str, has_image: bool, context: Dict[str, Any]) -> str:
-        """Build the planning prompt"""
+        """Build the planning prompt (request-specific content only; instructions live in the system prompt)"""
         prompt = f"""Please create a detailed plan for this user request:
 
 USER REQUEST: "{user_message}"
@@ -240,21 +605,18 @@ HAS IMAGE: {has_image}
 """
         
         if context:
-            prompt += f"ADDITIONAL CONTEXT: {json.dumps(context, indent=2)}\n"
-        
-        prompt += """
-Analyze the request carefully and create a step-by-step plan. Consider:
-- What is the user really asking for?
-- What information or resources might be needed?
-- What are the logical steps to accomplish this?
-- What could go wrong and how to handle it?
-
-Create a comprehensive plan that will lead to a successful outcome."""
+            # Sorted keys keep identical contexts byte-identical across calls
+            context_json = orjson.dumps(
+                context,
+                option=orjson.OPT_INDENT_2 | orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS,
+                default=str
+            ).decode()
+            prompt += f"ADDITIONAL CONTEXT: {context_json}\n"
 
         return prompt
 
     def _build_replanning_prompt(self, current_plan: ExecutionPlan, execution_results: List[Dict], user_feedback: str = None) -> str:
-        """Build the replanning prompt"""
+        """Build the replanning prompt (request-specific content only; instructions live in the system prompt)"""
         prompt = f"""The previous plan execution has completed with the following results:
 
 ORIGINAL OBJECTIVE: {current_plan.objective}
@@ -267,38 +629,39 @@ EXECUTION RESULTS:
         if user_feedback:
             prompt += f"\nUSER FEEDBACK: {user_feedback}\n"
 
-        prompt += """
-Based on these results, determine what additional steps are needed to fully accomplish the objective. Create new steps that:
-1. Build on what was already accomplished
-2. Address any failures or incomplete results
-3. Incorporate any new information discovered
-4. Respond to user feedback if provided
-
-Output only the additional steps needed as a JSON plan."""
-
         return prompt
 
     def _parse_plan_response(self, response_content: str) -> Dict[str, Any]:
         """Parse the LLM response to extract the plan JSON"""
+        # Most responses are the bare JSON object
         try:
-            # Try to find JSON in the response
-            json_match = re.search(r'\{.*\}', response_content, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group())
-        except json.JSONDecodeError:
+            plan_data = orjson.loads(response_content)
+            if isinstance(plan_data, dict):
+                return plan_data
+        except orjson.JSONDecodeError:
             pass
 
+        # Otherwise decode the first complete JSON object in the response, ignoring any
+        # prose around it; each candidate "{" costs one linear decode attempt
+        start = response_content.find("{")
+        while start != -1:
+            try:
+                return _JSON_DECODER.raw_decode(response_content, start)[0]
+            except json.JSONDecodeError:
+                start = response_content.find("{", start + 1)
+
         # If JSON parsing fails, try to extract key information manually
         lines = response_content.split('\n')
         objective = "Process user request"
         steps = []
 
         for line in lines:
-            if 'objective' in line.lower():
+            if 'objective' in line.lower() and ':' in line:
                 objective = line.split(':', 1)[1].strip().strip('"')
-            elif line.strip().startswith(('-', '*', '1.', '2.', '3.')):
-                # Extract step information
-                step_text = line.strip().lstrip('-*123456789. ')
+                continue
+            # Extract step information
+            step_text = _extract_bullet(line)
+            if step_text:
                 steps.append({
                     "action": step_text,
                     "reasoning": "Extracted from plan description"
@@ -309,26 +672,27 @@ Output only the additional steps needed as a JSON plan."""
             "steps": steps
         }
 
+    def _create_direct_plan(self, user_message: str, context: Dict[str, Any] = None) -> ExecutionPlan:
+        """Create a single-step plan for requests that need no document search"""
+        # The executor only sees the step, so the message itself goes into the action
+        return ExecutionPlan(
+            objective="Respond to the user",
+            steps=[
+                PlanStep(
+                    action=f"Respond directly to the user's message: {user_message.strip()}",
+                    reasoning="Greeting or acknowledgement; no document search needed"
+                )
+            ],
+            context=context or {}
+        )
+
     def _create_fallback_plan(self, user_message: str, has_image: bool) -> ExecutionPlan:
         """Create a basic RAG-focused fallback plan when LLM planning fails"""
-        steps = [
-            PlanStep(
-                action=f"Search documents for information related to: {user_message}",
-                reasoning="Find relevant documents to answer the user's question",
-                tool_needed="search_documents"
-            ),
-            PlanStep(
-                action=f"Synthesize retrieved information to answer: {user_message}",
-                reasoning="Combine document findings to provide comprehensive answer"
-            )
-        ]
-
-        steps.append(PlanStep(
-            action="Formulate comprehensive response",
-            reasoning="Provide a complete and helpful answer to the user"
-        ))
-
+        # Steps are mutated during execution, so each plan gets fresh ones
         return ExecutionPlan(
             objective="Understand and respond to user request",
-            steps=steps
+            steps=[
+                PlanStep(action_template.format(user_message=user_message), reasoning, tool_needed)
+                for action_template, reasoning, tool_needed in _FALLBACK_STEP_TEMPLATES
+            ]
         )
\ No newline at end of file
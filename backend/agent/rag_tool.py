@@ -2,11 +2,13 @@
 RAG Tool - Document Retrieval for Heavy Agent
 """
 
+import asyncio
 import logging
 from typing import Dict, Any, Optional, List
 from .tools import Tool
 from services.interfaces import SearchService
 from services.service_container import get_search_service
+from .search_cache import search_cache
 
 logger = logging.getLogger(__name__)
 
@@ -46,6 +48,12 @@ Returns relevant document excerpts with source information."""
         Raises:
             Exception: If document search fails or no documents found
         """
+        # Semantic lookups embed the query, which blocks, so keep them off the loop
+        cached = await asyncio.to_thread(search_cache.get, query, document_id)
+        if cached is not None:
+            logger.info(f"Reusing cached search for: {query[:100]}...")
+            return cached
+        
         logger.info(f"Searching documents for: {query[:100]}...")
         
         # Use the search service
@@ -57,7 +65,7 @@ Returns relevant document excerpts with source information."""
         # Create summary of what was found
         doc_summary = f"Found relevant information in {search_result.documents_found} document(s) with {search_result.total_snippets} sections"
         
-        return {
+        result = {
             "success": True,
             "result": doc_summary,
             "context": search_result.context_text,
@@ -65,4 +73,6 @@ Returns relevant document excerpts with source information."""
             "total_snippets": search_result.total_snippets,
             "search_query": query,
             "citations": search_result.citations
-        }
\ No newline at end of file
+        }
+        await asyncio.to_thread(search_cache.set, query, document_id, result)
+        return result
\ No newline at end of file
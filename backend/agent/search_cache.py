@@ -0,0 +1,253 @@
+"""
+Search Cache - Reuses document search results and SHORT path answers for repeated queries
+
+Two caches share the implementation: search tool results, and final SHORT
+path answers (served without retrieving or calling the LLM).
+Lookups go through two tiers, both scoped to the document the search was
+restricted to (results are never served across document scopes):
+- exact: keyed by the normalized query
+- semantic: the closest cached query in the same scope is served if its
+  cosine similarity clears the threshold, so planner paraphrases of a search
+  reuse its results. get() embeds the query itself on an exact miss; callers
+  that already hold an embedding use get_exact() and get_similar() instead.
+  Embeddings barely tell "section 3" from "section 4", so a near match is only
+  served when both queries name the same entities (query_entities).
+
+Entries are LRU-bounded and expire after a TTL. Ingesting or deleting a
+document evicts every entry whose results may have changed (evict_document).
+"""
+
+import copy
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config import settings
+from utils.logging_config import get_logger
+from .orchestrator_cache import message_embedding
+from .plan_cache import normalize_message
+
+logger = get_logger(__name__)
+
+SearchKey = Tuple[str, Optional[int]]
+
+# Scope value of searches across all documents, and of unused matrix rows
+_UNSCOPED = -1
+_UNUSED = -2
+
+# Quoted strings, anything with a digit, compound identifiers (snake_case,
+# dotted, hyphenated or slashed), camelCase words and acronyms
+_ENTITY_RE = re.compile(
+    r'"[^"]+"|“[^”]+”|`[^`]+`'
+    r"|\b\w*\d\w*\b"
+    r"|\b\w+(?:[_./:-]\w+)+\b"
+    r"|\b[a-z]+[A-Z]\w*\b"
+    r"|\b[A-Z]{2,}\b"
+)
+
+
+def query_entities(query: str) -> FrozenSet[str]:
+    """Get the (case-insensitive) entities a query names; results only carry over between queries with equal sets"""
+    return frozenset(match.casefold() for match in _ENTITY_RE.findall(query))
+
+
+class SearchCache:
+    """Two-tier (exact + semantic) LRU cache with a TTL for document-scoped results"""
+
+    def __init__(self,
+                 max_entries: int = 256,
+                 ttl_sec: float = 300,
+                 threshold: float = 0.93,
+                 semantic: bool = True):
+        """
+        Initialize the cache
+
+        Args:
+            max_entries: Maximum number of cached results
+            ttl_sec: Age after which a result expires
+            threshold: Minimum cosine similarity for a semantic hit
+            semantic: Whether to fall back to embedding similarity on exact misses
+        """
+        self.max_entries = max_entries
+        self.ttl_sec = ttl_sec
+        self.threshold = threshold
+        self.semantic = semantic
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[SearchKey, Tuple[Any, float]]" = OrderedDict()
+        # Semantic tier: one matrix row per cached query, with its document scope and entities
+        self._slots: Dict[SearchKey, int] = {}
+        self._slot_keys: list = []
+        self._slot_entities: list = []
+        self._free_slots: list = []
+        self._vectors: Optional[np.ndarray] = None
+        self._scopes = np.full(max_entries, _UNUSED, dtype=np.int64)
+
+    @staticmethod
+    def _scope(document_id: Optional[int]) -> int:
+        return _UNSCOPED if document_id is None else document_id
+
+    def get(self, query: str, document_id: Optional[int] = None) -> Optional[Any]:
+        """Return a copy of the cached result for query (or a near-identical one), if any"""
+        result = self.get_exact(query, document_id)
+        if result is not None or not self.semantic or not self._slots:
+            return result
+
+        embedding = message_embedding(normalize_message(query))
+        if embedding is None:
+            return None
+        return self.get_similar(embedding, document_id, query)
+
+    def get_exact(self, query: str, document_id: Optional[int] = None) -> Optional[Any]:
+        """Return a copy of the result cached for exactly this (normalized) query, if any"""
+        key = (normalize_message(query), document_id)
+
+        with self._lock:
+            result = self._get_entry(key, time.time())
+            if result is None:
+                return None
+        logger.debug("Search cache hit (exact)")
+        # Callers may mutate the result, so the cached one is never handed out
+        return copy.deepcopy(result)
+
+    def get_similar(self,
+                    embedding: Sequence[float],
+                    document_id: Optional[int] = None,
+                    query: Optional[str] = None) -> Optional[Any]:
+        """
+        Return a copy of the result cached for the query most similar to embedding, if close enough
+
+        Args:
+            embedding: Embedding of the query
+            document_id: Document scope of the query
+            query: The query itself; when given, only cached queries naming the
+                same entities (see query_entities) are considered
+
+        Returns:
+            A copy of the cached result, or None
+        """
+        entities = query_entities(query) if query is not None else None
+
+        with self._lock:
+            count = len(self._slot_keys)
+            if self._vectors is None or not count:
+                return None
+            similarities = self._vectors[:count] @ np.asarray(embedding, dtype=np.float32)
+            similarities[self._scopes[:count] != self._scope(document_id)] = -np.inf
+            if entities is not None:
+                mismatched = [slot_entities != entities for slot_entities in self._slot_entities]
+                similarities[np.asarray(mismatched, dtype=bool)] = -np.inf
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold or self._slot_keys[best] is None:
+                return None
+            result = self._get_entry(self._slot_keys[best], time.time())
+            if result is None:
+                return None
+            logger.debug(f"Search cache hit (semantic, similarity={float(similarities[best]):.3f})")
+        return copy.deepcopy(result)
+
+    def set(self, query: str, document_id: Optional[int], result: Any, embedding: Optional[Sequence[float]] = None):
+        """Cache a copy of result for query, embedding the query unless its embedding is given"""
+        normalized = normalize_message(query)
+        key = (normalized, document_id)
+        result = copy.deepcopy(result)
+        if self.semantic and embedding is None:
+            embedding = message_embedding(normalized)
+
+        with self._lock:
+            self._entries[key] = (result, time.time())
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                self._drop_slot(evicted)
+            if self.semantic and embedding is not None:
+                self._store_vector(key, embedding, query_entities(query))
+
+    def evict_document(self, document_id: int):
+        """Drop results scoped to document_id and unscoped results, which may include it"""
+        with self._lock:
+            stale = [key for key in self._entries if key[1] is None or key[1] == document_id]
+            for key in stale:
+                del self._entries[key]
+                self._drop_slot(key)
+        if stale:
+            logger.info(f"Evicted {len(stale)} cached searches for document {document_id}")
+
+    def clear(self):
+        """Remove every cached result"""
+        with self._lock:
+            self._entries.clear()
+            self._slots.clear()
+            self._slot_keys = []
+            self._slot_entities = []
+            self._free_slots = []
+            self._vectors = None
+            self._scopes.fill(_UNUSED)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _get_entry(self, key: SearchKey, now: float) -> Optional[Any]:
+        """Exact lookup with TTL and LRU bookkeeping (lock held)"""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        result, created_at = entry
+        if now - created_at > self.ttl_sec:
+            del self._entries[key]
+            self._drop_slot(key)
+            return None
+        self._entries.move_to_end(key)
+        return result
+
+    def _store_vector(self, key: SearchKey, embedding: Sequence[float], entities: FrozenSet[str]):
+        """Place the embedding of key in the similarity matrix (lock held)"""
+        if self._vectors is None:
+            self._vectors = np.zeros((self.max_entries, len(embedding)), dtype=np.float32)
+
+        slot = self._slots.get(key)
+        if slot is None:
+            # Every cached entry owns at most one row, so a row is always available
+            if self._free_slots:
+                slot = self._free_slots.pop()
+            else:
+                slot = len(self._slot_keys)
+                self._slot_keys.append(None)
+                self._slot_entities.append(None)
+            self._slots[key] = slot
+        self._slot_keys[slot] = key
+        self._slot_entities[slot] = entities
+        self._vectors[slot] = embedding
+        self._scopes[slot] = self._scope(key[1])
+
+    def _drop_slot(self, key: SearchKey):
+        """Remove key from the semantic tier (lock held)"""
+        slot = self._slots.pop(key, None)
+        if slot is not None:
+            self._slot_keys[slot] = None
+            self._slot_entities[slot] = None
+            self._vectors[slot] = 0.0
+            self._scopes[slot] = _UNUSED
+            self._free_slots.append(slot)
+
+
+search_cache = SearchCache(
+    max_entries=settings.agent.search_cache_max_entries,
+    ttl_sec=settings.agent.search_cache_ttl_sec,
+    threshold=settings.agent.search_cache_threshold
+)
+
+answer_cache = SearchCache(
+    max_entries=settings.agent.answer_cache_max_entries,
+    ttl_sec=settings.agent.answer_cache_ttl_sec,
+    threshold=settings.agent.answer_cache_threshold
+)
+
+
+def evict_document(document_id: int):
+    """Drop cached searches and answers that may depend on document_id"""
+    search_cache.evict_document(document_id)
+    answer_cache.evict_document(document_id)
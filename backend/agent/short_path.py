@@ -4,24 +4,42 @@ SHORT Path - Optimized single-pass RAG for simple queries
 
 import logging
 import asyncio
-from typing import Dict, Any, Optional
+from typing import Dict, Any, AsyncIterator, List, NamedTuple, Optional
 from dataclasses import dataclass
 
-from langchain_openai import ChatOpenAI
 from langchain.schema import SystemMessage, HumanMessage
 from config import settings
 
-from search.multi_document_search import ContextBundle, ContextBlock
+from search.multi_document_search import ContextBundle, ContextBlock, format_context_text
 from search.single_document_search import map_reduce_single_document
-from database.postgres_client import postgres_client
-from services.embedding_service import embedding_service
+from database.postgres_client import postgres_client, vector_literal
 from .smart_routing_config import SmartRoutingConfig
-from .smart_probe import ProbeSignals
+from .smart_probe import ProbeSignals, query_embedding_cache
+from .llm_clients import get_chat_model, start_http_warmup
+from .search_cache import answer_cache
 
 logger = logging.getLogger(__name__)
 
+SHORT_PROMPT_CACHE_KEY = "short-path"
 
-@dataclass
+# Kept byte-identical across calls (the token limit is appended after it) so
+# OpenAI prompt caching can skip prefill of the shared prefix
+_SHORT_SYSTEM_PROMPT = """You are a precise document-based Q&A assistant. Provide direct, well-cited answers using ONLY the retrieved document context.
+
+MANDATORY CITATION RULES:
+- For every fact, use citation tokens: [[doc:X, seg:Y]] where X is document ID and Y is segment ordinal
+- The context shows documents in format: {Document Title} [Document ID: X]
+- Each snippet shows [§ordinal] followed by text
+- Use the EXACT Document ID shown in brackets and the EXACT segment ordinal from [§ordinal]
+- Example: If you see "{Document ABC} [Document ID: 456]" and "[§7] Some text", cite as [[doc:456, seg:7]]
+- Never provide information not explicitly in the context
+- If context is insufficient, clearly state limitations
+- Always include citation tokens for verifiable facts
+
+Be concise, accurate, and always cite your sources with the exact token format using real IDs from the context."""
+
+
+@dataclass(slots=True)
 class ShortPathResult:
     """Result from SHORT path execution"""
     answer: str
@@ -31,17 +49,49 @@ class ShortPathResult:
     error: Optional[str] = None
 
 
-def _vector_search_segments_optimized(query_embedding: list, config: SmartRoutingConfig, document_id: Optional[int] = None) -> list:
+class _SegmentHit(NamedTuple):
+    """A segment returned by one retriever; score is its distance or text rank"""
+    id: int
+    document_id: int
+    segment_ordinal: int
+    text: Optional[str]
+    title: Optional[str]
+    score: float
+
+
+def _decode_segment_hits(response: Dict[str, Any], default_score: float) -> List[_SegmentHit]:
+    """Decode (id, document_id, segment_ordinal, text, title, score) records in one pass"""
+    return [
+        _SegmentHit(
+            record[0]['longValue'],
+            record[1]['longValue'],
+            record[2]['longValue'],
+            record[3].get('stringValue'),
+            record[4].get('stringValue'),
+            record[5].get('doubleValue', default_score)
+        )
+        for record in response.get('records', ())
+    ]
+
+
+def _vector_search_segments_optimized(query_embedding: list, config: SmartRoutingConfig, document_id: Optional[int] = None) -> List[_SegmentHit]:
     """Optimized vector search with configurable parameters"""
-    embedding_str = '[' + ','.join(map(str, query_embedding)) + ']'
+    embedding_str = vector_literal(query_embedding)
     
     if document_id:
+        # Materializing the document's segments first keeps this an exact search; through
+        # the HNSW index the filter would apply after the ANN scan and could return
+        # fewer than :limit rows
         sql = """
+        WITH candidates AS MATERIALIZED (
+            SELECT id, document_id, segment_ordinal, text, embedding
+            FROM document_segments
+            WHERE document_id = :document_id
+        )
         SELECT ds.id, ds.document_id, ds.segment_ordinal, ds.text, d.title,
                (ds.embedding <=> :query_embedding::vector) as similarity_score
-        FROM document_segments ds
+        FROM candidates ds
         JOIN documents d ON ds.document_id = d.id
-        WHERE ds.document_id = :document_id
         ORDER BY ds.embedding <=> :query_embedding::vector
         LIMIT :limit
         """
@@ -65,22 +115,10 @@ def _vector_search_segments_optimized(query_embedding: list, config: SmartRoutin
         ]
     
     response = postgres_client.execute_statement(sql, parameters)
-    
-    results = []
-    for record in response.get('records', []):
-        results.append({
-            'id': record[0].get('longValue'),
-            'document_id': record[1].get('longValue'),
-            'segment_ordinal': record[2].get('longValue'),
-            'text': record[3].get('stringValue'),
-            'title': record[4].get('stringValue'),
-            'similarity_score': record[5].get('doubleValue', 1.0)
-        })
-    
-    return results
+    return _decode_segment_hits(response, 1.0)
 
 
-def _text_search_segments_optimized(query: str, config: SmartRoutingConfig, document_id: Optional[int] = None) -> list:
+def _text_search_segments_optimized(query: str, config: SmartRoutingConfig, document_id: Optional[int] = None) -> List[_SegmentHit]:
     """Optimized text search with configurable parameters"""
     if document_id:
         sql = """
@@ -114,50 +152,41 @@ def _text_search_segments_optimized(query: str, config: SmartRoutingConfig, docu
         ]
     
     response = postgres_client.execute_statement(sql, parameters)
-    
-    results = []
-    for record in response.get('records', []):
-        results.append({
-            'id': record[0].get('longValue'),
-            'document_id': record[1].get('longValue'),
-            'segment_ordinal': record[2].get('longValue'),
-            'text': record[3].get('stringValue'),
-            'title': record[4].get('stringValue'),
-            'text_score': record[5].get('doubleValue', 0.0)
-        })
-    
-    return results
+    return _decode_segment_hits(response, 0.0)
 
 
-def _hybrid_rerank_optimized(vector_results: list, text_results: list, alpha: float = 0.6) -> list:
+def _hybrid_rerank_optimized(vector_results: List[_SegmentHit], text_results: List[_SegmentHit], alpha: float = 0.6) -> list:
     """Optimized hybrid reranking with configurable alpha"""
-    # Create maps for quick lookup
-    vector_map = {r['id']: (i + 1, r) for i, r in enumerate(vector_results)}
-    text_map = {r['id']: (i + 1, r) for i, r in enumerate(text_results)}
+    # Ranks are 1-based; a segment missing from a list ranks just past its end
+    vector_ranks = {hit.id: rank for rank, hit in enumerate(vector_results, 1)}
+    text_ranks = {hit.id: rank for rank, hit in enumerate(text_results, 1)}
+    missing_vector_rank = len(vector_results) + 1
+    missing_text_rank = len(text_results) + 1
     
-    # Get all unique segment IDs
-    all_ids = set(vector_map.keys()) | set(text_map.keys())
+    # One hit per segment, preferring the vector result if available
+    hits = {hit.id: hit for hit in text_results}
+    hits.update((hit.id, hit) for hit in vector_results)
     
     combined_results = []
     k = 60  # RRF parameter
     
-    for seg_id in all_ids:
-        # Get ranks (default to len + 1 if not found)
-        vector_rank = vector_map.get(seg_id, (len(vector_results) + 1, None))[0]
-        text_rank = text_map.get(seg_id, (len(text_results) + 1, None))[0]
-        
-        # Calculate RRF score with configurable alpha
-        rrf_score = (alpha / (k + vector_rank)) + ((1 - alpha) / (k + text_rank))
-        
-        # Get the result object (prefer vector result if available)
-        result = vector_map.get(seg_id, (None, None))[1] or text_map.get(seg_id, (None, None))[1]
+    for seg_id, hit in hits.items():
+        vector_rank = vector_ranks.get(seg_id, missing_vector_rank)
+        text_rank = text_ranks.get(seg_id, missing_text_rank)
         
-        if result:
-            result = result.copy()
-            result['rrf_score'] = rrf_score
-            result['vector_rank'] = vector_rank
-            result['text_rank'] = text_rank
-            combined_results.append(result)
+        combined_results.append({
+            'id': seg_id,
+            'document_id': hit.document_id,
+            'segment_ordinal': hit.segment_ordinal,
+            'text': hit.text,
+            'title': hit.title,
+            'similarity_score': vector_results[vector_rank - 1].score if seg_id in vector_ranks else None,
+            'text_score': text_results[text_rank - 1].score if seg_id in text_ranks else None,
+            # RRF score with configurable alpha
+            'rrf_score': (alpha / (k + vector_rank)) + ((1 - alpha) / (k + text_rank)),
+            'vector_rank': vector_rank,
+            'text_rank': text_rank
+        })
     
     # Sort by RRF score descending
     combined_results.sort(key=lambda x: x['rrf_score'], reverse=True)
@@ -165,6 +194,112 @@ def _hybrid_rerank_optimized(vector_results: list, text_results: list, alpha: fl
     return combined_results
 
 
+def _hybrid_search_segments_fused(query: str, query_embedding: list, config: SmartRoutingConfig) -> list:
+    """
+    Vector search, text search and RRF fusion in a single statement
+    
+    Equivalent to running _vector_search_segments_optimized and
+    _text_search_segments_optimized across all documents and merging them with
+    _hybrid_rerank_optimized, but costs one database round trip instead of two
+    and ranks on the server. A segment missing from one result list gets that
+    list's length + 1 as its rank, as in _hybrid_rerank_optimized.
+    
+    Only segments that _group_results_optimized would keep (the best
+    short_per_doc of each of the best short_top_docs documents) are returned,
+    so text and titles are only read and shipped for segments in the context.
+    """
+    embedding_str = vector_literal(query_embedding)
+    
+    # Each retriever orders and limits before numbering its rows, so the vector
+    # search can still use the HNSW index. Ranking and selection only carry ids
+    # and scores; text and title are joined for the selected rows at the end
+    sql = """
+    WITH vec AS (
+        SELECT id, distance, ROW_NUMBER() OVER (ORDER BY distance) AS rnk
+        FROM (
+            SELECT ds.id, (ds.embedding <=> :query_embedding::vector) AS distance
+            FROM document_segments ds
+            ORDER BY ds.embedding <=> :query_embedding::vector
+            LIMIT :vector_limit
+        ) v
+    ),
+    fts AS (
+        SELECT id, text_score, ROW_NUMBER() OVER (ORDER BY text_score DESC) AS rnk
+        FROM (
+            SELECT ds.id, ts_rank(ds.ts, plainto_tsquery('english', :query)) AS text_score
+            FROM document_segments ds
+            WHERE ds.ts @@ plainto_tsquery('english', :query)
+            ORDER BY ts_rank(ds.ts, plainto_tsquery('english', :query)) DESC
+            LIMIT :text_limit
+        ) t
+    ),
+    ranked AS (
+        SELECT COALESCE(vec.id, fts.id) AS id,
+               vec.distance AS similarity_score,
+               fts.text_score,
+               COALESCE(vec.rnk, (SELECT COUNT(*) FROM vec) + 1) AS vector_rank,
+               COALESCE(fts.rnk, (SELECT COUNT(*) FROM fts) + 1) AS text_rank
+        FROM vec
+        FULL OUTER JOIN fts ON vec.id = fts.id
+    ),
+    scored AS (
+        SELECT r.id, ds.document_id, ds.segment_ordinal,
+               r.similarity_score, r.text_score, r.vector_rank, r.text_rank,
+               :alpha::float8 / (60 + r.vector_rank) + (1 - :alpha::float8) / (60 + r.text_rank) AS rrf_score
+        FROM ranked r
+        JOIN document_segments ds ON ds.id = r.id
+    ),
+    per_doc AS (
+        SELECT s.*,
+               ROW_NUMBER() OVER (PARTITION BY s.document_id ORDER BY s.rrf_score DESC) AS doc_rank,
+               MAX(s.rrf_score) OVER (PARTITION BY s.document_id) AS doc_score
+        FROM scored s
+    ),
+    top_docs AS (
+        SELECT DISTINCT document_id, doc_score
+        FROM per_doc
+        ORDER BY doc_score DESC
+        LIMIT :top_docs
+    )
+    SELECT p.id, p.document_id, p.segment_ordinal, ds.text, d.title,
+           p.similarity_score, p.text_score, p.vector_rank, p.text_rank, p.rrf_score
+    FROM per_doc p
+    JOIN top_docs t ON t.document_id = p.document_id
+    JOIN document_segments ds ON ds.id = p.id
+    JOIN documents d ON d.id = p.document_id
+    WHERE p.doc_rank <= :per_doc
+    ORDER BY p.rrf_score DESC
+    """
+    parameters = [
+        {'name': 'query_embedding', 'value': {'stringValue': embedding_str}},
+        {'name': 'query', 'value': {'stringValue': query}},
+        {'name': 'vector_limit', 'value': {'longValue': config.short_vector_limit}},
+        {'name': 'text_limit', 'value': {'longValue': config.short_text_limit}},
+        {'name': 'alpha', 'value': {'doubleValue': config.short_alpha}},
+        {'name': 'top_docs', 'value': {'longValue': config.short_top_docs}},
+        {'name': 'per_doc', 'value': {'longValue': config.short_per_doc}}
+    ]
+    
+    response = postgres_client.execute_statement(sql, parameters)
+    
+    results = []
+    for record in response.get('records', []):
+        results.append({
+            'id': record[0].get('longValue'),
+            'document_id': record[1].get('longValue'),
+            'segment_ordinal': record[2].get('longValue'),
+            'text': record[3].get('stringValue'),
+            'title': record[4].get('stringValue'),
+            'similarity_score': record[5].get('doubleValue'),
+            'text_score': record[6].get('doubleValue'),
+            'vector_rank': record[7].get('longValue'),
+            'text_rank': record[8].get('longValue'),
+            'rrf_score': record[9].get('doubleValue')
+        })
+    
+    return results
+
+
 def _group_results_optimized(results: list, config: SmartRoutingConfig) -> list:
     """Group search results by document with configurable limits"""
     doc_groups = {}
@@ -195,7 +330,8 @@ def _group_results_optimized(results: list, config: SmartRoutingConfig) -> list:
     return blocks
 
 
-async def build_context_short_path(query: str, config: SmartRoutingConfig, document_id: Optional[int] = None) -> ContextBundle:
+async def build_context_short_path(query: str, config: SmartRoutingConfig, document_id: Optional[int] = None,
+                                   query_embedding: Optional[List[float]] = None) -> ContextBundle:
     """
     Build context using optimized SHORT path parameters
     
@@ -203,6 +339,7 @@ async def build_context_short_path(query: str, config: SmartRoutingConfig, docum
         query: User query
         config: Smart routing configuration
         document_id: Optional specific document to search
+        query_embedding: Embedding of query if already computed (e.g. by the probe)
         
     Returns:
         ContextBundle with retrieved information
@@ -239,36 +376,35 @@ async def build_context_short_path(query: str, config: SmartRoutingConfig, docum
         # Use multi-document search for general queries
         logger.info("Using multi-document search")
         
-        # Step 1: Generate query embedding
-        query_embedding = embedding_service.generate_embedding(query)
+        # Step 1: Generate query embedding unless the probe already did
+        if query_embedding is None:
+            query_embedding = query_embedding_cache.get(query)
         
-        # Step 2: Run parallel search with optimized parameters
-        vector_task = asyncio.create_task(
-            asyncio.to_thread(_vector_search_segments_optimized, query_embedding, config, document_id)
-        )
-        text_task = asyncio.create_task(
-            asyncio.to_thread(_text_search_segments_optimized, query, config, document_id)
-        )
-        
-        vector_results, text_results = await asyncio.gather(vector_task, text_task)
-        
-        logger.info(f"Found {len(vector_results)} vector + {len(text_results)} text results")
-        
-        # Step 3: Hybrid rerank with configurable alpha
-        final_results = _hybrid_rerank_optimized(vector_results, text_results, config.short_alpha)
+        if config.short_fused_search:
+            # Steps 2-3: Search and rerank in a single round trip
+            final_results = await asyncio.to_thread(_hybrid_search_segments_fused, query, query_embedding, config)
+            logger.info(f"Selected {len(final_results)} fused vector + text results")
+        else:
+            # Step 2: Run parallel search with optimized parameters
+            vector_task = asyncio.create_task(
+                asyncio.to_thread(_vector_search_segments_optimized, query_embedding, config, document_id)
+            )
+            text_task = asyncio.create_task(
+                asyncio.to_thread(_text_search_segments_optimized, query, config, document_id)
+            )
+            
+            vector_results, text_results = await asyncio.gather(vector_task, text_task)
+            
+            logger.info(f"Found {len(vector_results)} vector + {len(text_results)} text results")
+            
+            # Step 3: Hybrid rerank with configurable alpha
+            final_results = _hybrid_rerank_optimized(vector_results, text_results, config.short_alpha)
         
         # Step 4: Group by document with SHORT path limits
         blocks = _group_results_optimized(final_results, config)
         
         # Step 5: Format context text
-        context_parts = []
-        for block in blocks:
-            context_parts.append(f"{{{block.title}}} [Document ID: {block.document_id}]")
-            for snippet in block.snippets:
-                context_parts.append(snippet)
-            context_parts.append("")  # Empty line between documents
-        
-        context_text = "\n".join(context_parts).strip()
+        context_text = format_context_text(blocks)
         
         logger.info(f"SHORT path context: {len(blocks)} docs, {len(final_results)} total segments")
         
@@ -279,49 +415,15 @@ async def build_context_short_path(query: str, config: SmartRoutingConfig, docum
         )
 
 
-async def synthesize_answer_short(query: str, context: ContextBundle, config: SmartRoutingConfig = None) -> str:
-    """
-    Synthesize answer using SHORT path - single LLM call with mandatory citations
-    
-    Args:
-        query: User query
-        context: Retrieved context bundle
-        config: Smart routing configuration for token limits
-        
-    Returns:
-        Synthesized answer with citations
-    """
-    from .token_manager import truncate_context_by_tokens, add_response_token_limit, validate_response_length
-    from .smart_routing_config import DEFAULT_CONFIG
-    
-    config = config or DEFAULT_CONFIG
+def _short_path_messages(query: str, context: ContextBundle, config: SmartRoutingConfig) -> list:
+    """Build the SHORT path synthesis prompt, truncating context to the token budget"""
+    from .token_manager import truncate_context_by_tokens, add_response_token_limit
     
     # Truncate context if needed
     context = truncate_context_by_tokens(context, config)
     
-    llm = ChatOpenAI(
-        model=settings.MODEL_NAME,
-        temperature=0.3,  # Lower temperature for consistent citations
-        openai_api_key=settings.OPENAI_API_KEY,
-        max_tokens=config.max_response_tokens  # Set response token limit
-    )
-    
-    system_prompt = """You are a precise document-based Q&A assistant. Provide direct, well-cited answers using ONLY the retrieved document context.
-
-MANDATORY CITATION RULES:
-- For every fact, use citation tokens: [[doc:X, seg:Y]] where X is document ID and Y is segment ordinal
-- The context shows documents in format: {Document Title} [Document ID: X]
-- Each snippet shows [§ordinal] followed by text
-- Use the EXACT Document ID shown in brackets and the EXACT segment ordinal from [§ordinal]
-- Example: If you see "{Document ABC} [Document ID: 456]" and "[§7] Some text", cite as [[doc:456, seg:7]]
-- Never provide information not explicitly in the context
-- If context is insufficient, clearly state limitations
-- Always include citation tokens for verifiable facts
-
-Be concise, accurate, and always cite your sources with the exact token format using real IDs from the context."""
-    
     # Add token limit instructions
-    system_prompt = add_response_token_limit(system_prompt, config)
+    system_prompt = add_response_token_limit(_SHORT_SYSTEM_PROMPT, config)
 
     user_prompt = f"""Question: {query}
 
@@ -336,43 +438,96 @@ Provide a comprehensive answer based solely on the retrieved context. Use mandat
     for i, block in enumerate(context.blocks):
         logger.info(f"Block {i}: Doc ID {block.document_id}, Title: {block.title}")
 
-    messages = [
+    return [
         SystemMessage(content=system_prompt),
         HumanMessage(content=user_prompt)
     ]
 
-    try:
-        response = llm.invoke(messages)
-        # Validate and truncate response if needed
-        validated_response = validate_response_length(response.content, config)
-        return validated_response
-    except Exception as e:
-        logger.error(f"SHORT path synthesis failed: {e}")
-        return f"I apologize, but I encountered an error while synthesizing the answer: {str(e)}"
 
+async def stream_answer_short(query: str, context: ContextBundle, config: SmartRoutingConfig = None) -> AsyncIterator[str]:
+    """
+    Stream the SHORT path answer token by token as the LLM generates it
+    
+    Generation is capped at config.max_response_tokens, and closing the
+    iterator early aborts the underlying request. LLM errors propagate to the
+    caller.
+    
+    Args:
+        query: User query
+        context: Retrieved context bundle
+        config: Smart routing configuration for token limits
+        
+    Yields:
+        Answer text chunks with citations
+    """
+    from .smart_routing_config import DEFAULT_CONFIG
+    
+    config = config or DEFAULT_CONFIG
+    
+    # Lower temperature for consistent citations
+    llm = get_chat_model(
+        settings.MODEL_NAME,
+        0.3,
+        config.max_response_tokens,
+        prompt_cache_key=SHORT_PROMPT_CACHE_KEY
+    )
 
-async def run_short_path(query: str, config: SmartRoutingConfig, document_id: Optional[int] = None) -> ShortPathResult:
+    messages = _short_path_messages(query, context, config)
+    async for chunk in llm.astream(messages):
+        if chunk.content:
+            yield chunk.content
+
+
+async def synthesize_answer_short(query: str, context: ContextBundle, config: SmartRoutingConfig = None) -> str:
     """
-    Execute the complete SHORT path: retrieve + synthesize
+    Synthesize answer using SHORT path - single LLM call with mandatory citations
+    
+    Args:
+        query: User query
+        context: Retrieved context bundle
+        config: Smart routing configuration for token limits
+        
+    Returns:
+        Synthesized answer with citations
+    """
+    from .token_manager import validate_response_length
+    from .smart_routing_config import DEFAULT_CONFIG
+    
+    config = config or DEFAULT_CONFIG
+    
+    parts = [token async for token in stream_answer_short(query, context, config)]
+    # Validate and truncate response if needed
+    return validate_response_length("".join(parts), config)
+
+
+async def retrieve_short_path(query: str, config: SmartRoutingConfig, document_id: Optional[int] = None,
+                              query_embedding: Optional[List[float]] = None) -> ShortPathResult:
+    """
+    Execute the retrieval half of the SHORT path, leaving the answer empty
+    
+    Escalation only depends on the retrieved context, so callers can decide
+    whether to escalate before any tokens are generated and then stream the
+    answer with stream_answer_short.
     
     Args:
         query: User query
         config: Smart routing configuration  
         document_id: Optional specific document to search
+        query_embedding: Embedding of query if already computed (e.g. by the probe)
         
     Returns:
-        ShortPathResult with answer and debug info
+        ShortPathResult with context and debug info
     """
     try:
         logger.info(f"Executing SHORT path for: {query[:100]}...")
         
-        # Step 1: Build context with SHORT path parameters
-        context = await build_context_short_path(query, config, document_id)
+        # Synthesis follows right after retrieval; have its connection ready by then
+        start_http_warmup()
         
-        # Step 2: Synthesize answer with mandatory citations
-        answer = await synthesize_answer_short(query, context, config)
+        # Build context with SHORT path parameters
+        context = await build_context_short_path(query, config, document_id, query_embedding)
         
-        # Step 3: Prepare debug info for escalation decisions
+        # Prepare debug info for escalation decisions
         debug_info = {
             "total_docs": len(context.blocks),
             "total_segments": sum(len(block.snippets) for block in context.blocks),
@@ -380,10 +535,10 @@ async def run_short_path(query: str, config: SmartRoutingConfig, document_id: Op
             "context_length": len(context.context_text),
         }
         
-        logger.info(f"SHORT path completed: {debug_info['total_docs']} docs, {debug_info['total_segments']} segments")
+        logger.info(f"SHORT path retrieval completed: {debug_info['total_docs']} docs, {debug_info['total_segments']} segments")
         
         return ShortPathResult(
-            answer=answer,
+            answer="",
             context=context,
             debug_info=debug_info,
             success=True
@@ -397,4 +552,72 @@ async def run_short_path(query: str, config: SmartRoutingConfig, document_id: Op
             debug_info={"error": str(e)},
             success=False,
             error=str(e)
-        )
\ No newline at end of file
+        )
+
+
+async def run_short_path(query: str, config: SmartRoutingConfig, document_id: Optional[int] = None,
+                         query_embedding: Optional[List[float]] = None) -> ShortPathResult:
+    """
+    Execute the complete SHORT path: retrieve + synthesize
+    
+    Args:
+        query: User query
+        config: Smart routing configuration  
+        document_id: Optional specific document to search
+        query_embedding: Embedding of query if already computed (e.g. by the probe)
+        
+    Returns:
+        ShortPathResult with answer and debug info
+    """
+    result = await retrieve_short_path(query, config, document_id, query_embedding)
+    if not result.success:
+        return result
+    
+    # Synthesize answer with mandatory citations
+    try:
+        result.answer = await synthesize_answer_short(query, result.context, config)
+    except Exception as e:
+        logger.error(f"SHORT path synthesis failed: {e}")
+        result.answer = synthesis_error_message(e)
+        result.error = str(e)
+    return result
+
+
+def synthesis_error_message(error: Exception) -> str:
+    """Answer shown to the user when SHORT path synthesis fails"""
+    return f"I apologize, but I encountered an error while synthesizing the answer: {str(error)}"
+
+
+def get_cached_answer(query: str, document_id: Optional[int] = None) -> Optional[str]:
+    """Get the SHORT path answer cached for exactly this query (no embedding needed)"""
+    if not settings.agent.answer_cache_enabled:
+        return None
+    return answer_cache.get_exact(query, document_id)
+
+
+def get_similar_cached_answer(query: str,
+                              query_embedding: Optional[List[float]],
+                              document_id: Optional[int] = None) -> Optional[str]:
+    """
+    Get the SHORT path answer cached for a near-identical query, given the probe's embedding
+
+    The answer goes to the user unchecked, so it is only reused for a query
+    naming exactly the same entities (numbers, quoted strings, identifiers).
+    """
+    if not settings.agent.answer_cache_enabled or query_embedding is None:
+        return None
+    return answer_cache.get_similar(query_embedding, document_id, query)
+
+
+async def cache_answer(query: str,
+                       document_id: Optional[int],
+                       answer: str,
+                       query_embedding: Optional[List[float]] = None):
+    """Remember a successfully synthesized SHORT path answer"""
+    if not settings.agent.answer_cache_enabled:
+        return
+    if query_embedding is None:
+        # The cache embeds the query itself, so keep it off the event loop
+        await asyncio.to_thread(answer_cache.set, query, document_id, answer)
+    else:
+        answer_cache.set(query, document_id, answer, query_embedding)
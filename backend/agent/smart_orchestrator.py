@@ -2,16 +2,22 @@
 Smart Orchestrator - Tiny orchestrator with escalation logic
 """
 
+import asyncio
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
 
 from .smart_routing_config import SmartRoutingConfig, DEFAULT_CONFIG
 from .smart_probe import compute_probe_signals, compute_routing_score, ProbeSignals
-from .short_path import run_short_path, ShortPathResult
+from .short_path import run_short_path, get_cached_answer, get_similar_cached_answer, cache_answer, ShortPathResult
 from .long_path import run_long_path, LongPathResult
+from .plan_cache import normalize_message
 
 logger = logging.getLogger(__name__)
 
+# Pipeline runs in flight per (normalized query, document_id, config identity);
+# resolved with the answer, or None if the run was cancelled
+_inflight: Dict[Tuple[str, Optional[int], int], "asyncio.Future[Optional[str]]"] = {}
+
 
 def should_escalate_from_short(
     short_result: ShortPathResult, 
@@ -81,6 +87,10 @@ async def smart_handle_message(
     """
     Main entrypoint for smart orchestrated message handling
     
+    Concurrent requests for the same query, document and configuration share
+    one pipeline run (single-flight), so a burst of duplicates costs one set
+    of embedding, database and LLM calls.
+    
     Args:
         query: User query string
         config: Smart routing configuration (uses default if None)
@@ -90,13 +100,50 @@ async def smart_handle_message(
         Response string from either SHORT or LONG path
     """
     config = config or DEFAULT_CONFIG
+    key = (normalize_message(query), document_id, id(config))
     
+    while True:
+        pending = _inflight.get(key)
+        if pending is None:
+            break
+        logger.info("Joining in-flight request for the same query")
+        # Shielded so a cancelled duplicate does not cancel the shared run
+        answer = await asyncio.shield(pending)
+        if answer is not None:
+            return answer
+        # The run was cancelled before it produced an answer; run it here instead
+    
+    future = asyncio.get_running_loop().create_future()
+    _inflight[key] = future
+    answer = None
+    try:
+        answer = await _handle_message(query, config, document_id)
+        return answer
+    finally:
+        del _inflight[key]
+        future.set_result(answer)
+
+
+async def _handle_message(query: str, config: SmartRoutingConfig, document_id: Optional[int]) -> str:
+    """Probe, route and answer one query (see smart_handle_message)"""
     try:
         logger.info(f"Smart orchestrator processing: {query[:100]}...")
         
+        # Step 0: Repeated questions reuse their SHORT path answer
+        cached_answer = get_cached_answer(query, document_id)
+        if cached_answer is not None:
+            logger.info("FINAL ROUTE: SHORT (cached answer)")
+            return cached_answer
+        
         # Step 1: Cheap probe to compute signals
         signals = compute_probe_signals(query, config)
         
+        # Near-identical questions are matched with the embedding the probe just computed
+        cached_answer = get_similar_cached_answer(query, signals.query_embedding, document_id)
+        if cached_answer is not None:
+            logger.info("FINAL ROUTE: SHORT (cached answer, similar query)")
+            return cached_answer
+        
         # Step 2: Compute routing score
         score = compute_routing_score(signals, config)
         
@@ -108,7 +155,7 @@ async def smart_handle_message(
             logger.info(f"   Signals: vec_sim={signals.avg_vec_sim:.2f}, fts_rate={signals.fts_hit_rate:.2f}, docs={signals.unique_docs}")
             
             # Execute SHORT path
-            short_result = await run_short_path(query, config, document_id)
+            short_result = await run_short_path(query, config, document_id, signals.query_embedding)
             
             # Check for escalation
             if should_escalate_from_short(short_result, signals, config):
@@ -118,6 +165,8 @@ async def smart_handle_message(
                 logger.info("FINAL ROUTE: SHORT->LONG (escalated)")
                 return long_result.answer
             else:
+                if short_result.error is None:
+                    await cache_answer(query, document_id, short_result.answer, signals.query_embedding)
                 logger.info("FINAL ROUTE: SHORT (completed)")
                 return short_result.answer
                 
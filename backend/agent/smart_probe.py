@@ -4,13 +4,17 @@ Smart Probe - Cheap signal computation for routing decisions
 
 import re
 import logging
+import threading
 from dataclasses import dataclass
 from typing import List, Dict, Any, Optional, Tuple
-from collections import Counter
+from collections import Counter, OrderedDict
 
-from database.postgres_client import postgres_client
+import numpy as np
+
+from database.postgres_client import postgres_client, vector_literal
 from services.embedding_service import embedding_service
 from .smart_routing_config import SmartRoutingConfig
+from .plan_cache import normalize_message
 
 logger = logging.getLogger(__name__)
 
@@ -30,11 +34,70 @@ class ProbeSignals:
     total_candidates: int
     vector_candidates: int
     fts_candidates: int
+    
+    # Embedding of the probed query, reused by the SHORT path instead of embedding it again
+    query_embedding: Optional[List[float]] = None
+
+
+class _QueryEmbeddingCache:
+    """
+    LRU cache of query embeddings keyed by the normalized query
+    
+    Queries that only differ in case or whitespace share an embedding, so
+    repeated questions skip the embedding API call. Embeddings are stored as
+    float32 arrays to keep the cache small.
+    """
+    
+    MAX_ENTRIES = 1024
+    
+    def __init__(self, max_entries: int = MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+    
+    def get(self, query: str) -> List[float]:
+        """Get the embedding of query, generating it on a miss"""
+        key = normalize_message(query)
+        with self._lock:
+            embedding = self._entries.get(key)
+            if embedding is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return embedding.tolist()
+            self.misses += 1
+        
+        embedding = np.asarray(embedding_service.generate_embedding(query), dtype=np.float32)
+        with self._lock:
+            self._entries[key] = embedding
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return embedding.tolist()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Cache size and hit rate"""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+
+query_embedding_cache = _QueryEmbeddingCache()
+
+
+def get_query_embedding_cache_stats() -> Dict[str, Any]:
+    """Get hit statistics of the query embedding cache shared by the probe and SHORT path"""
+    return query_embedding_cache.stats()
 
 
 def _prefilter_documents(query_embedding: List[float], limit: int = 10) -> List[Dict]:
     """Fast document-level prefiltering using document embeddings"""
-    embedding_str = '[' + ','.join(map(str, query_embedding)) + ']'
+    embedding_str = vector_literal(query_embedding)
     
     sql = """
     SELECT id, title, (embedding <=> :query_embedding::vector) as similarity_score
@@ -66,15 +129,21 @@ def _sample_candidates_vector(query_embedding: List[float], doc_ids: List[int],
     if not doc_ids:
         return []
     
-    embedding_str = '[' + ','.join(map(str, query_embedding)) + ']'
+    embedding_str = vector_literal(query_embedding)
     doc_ids_str = ','.join(map(str, doc_ids))
     
+    # Materializing the prefiltered segments first keeps this an exact search (see
+    # multi_document_search._vector_search_segments)
     sql = f"""
+    WITH candidates AS MATERIALIZED (
+        SELECT id, document_id, segment_ordinal, text, embedding
+        FROM document_segments
+        WHERE document_id IN ({doc_ids_str})
+    )
     SELECT ds.id, ds.document_id, ds.segment_ordinal, ds.text, d.title,
            (ds.embedding <=> :query_embedding::vector) as similarity_score
-    FROM document_segments ds
+    FROM candidates ds
     JOIN documents d ON ds.document_id = d.id
-    WHERE ds.document_id IN ({doc_ids_str})
     ORDER BY ds.embedding <=> :query_embedding::vector
     LIMIT :limit
     """
@@ -182,8 +251,8 @@ def compute_probe_signals(query: str, config: SmartRoutingConfig) -> ProbeSignal
     """
     logger.info(f"Computing probe signals for query: {query[:100]}...")
     
-    # Step 1: Embed query once
-    query_embedding = embedding_service.generate_embedding(query)
+    # Step 1: Embed query once (shared with the SHORT path)
+    query_embedding = query_embedding_cache.get(query)
     
     # Step 2: Document prefilter
     top_docs = _prefilter_documents(query_embedding, config.probe_doc_limit)
@@ -203,7 +272,8 @@ def compute_probe_signals(query: str, config: SmartRoutingConfig) -> ProbeSignal
             doc_counts={},
             total_candidates=0,
             vector_candidates=0,
-            fts_candidates=0
+            fts_candidates=0,
+            query_embedding=query_embedding
         )
     
     # Step 3: Sample candidates
@@ -256,7 +326,8 @@ def compute_probe_signals(query: str, config: SmartRoutingConfig) -> ProbeSignal
         doc_counts=dict(doc_counts),
         total_candidates=len(all_candidates),
         vector_candidates=len(vector_candidates),
-        fts_candidates=len(fts_candidates)
+        fts_candidates=len(fts_candidates),
+        query_embedding=query_embedding
     )
 
 
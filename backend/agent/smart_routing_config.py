@@ -48,6 +48,7 @@ class SmartRoutingConfig:
     short_vector_limit: int = 20
     short_text_limit: int = 20
     short_alpha: float = 0.6  # vector weight in hybrid
+    short_fused_search: bool = True  # search + rerank in one SQL statement
     
     # LONG path parameters
     long_max_subqueries: int = 3
@@ -84,6 +85,7 @@ def _create_default_config() -> SmartRoutingConfig:
             short_vector_limit=agent_config.short_vector_limit,
             short_text_limit=agent_config.short_text_limit,
             short_alpha=agent_config.short_alpha,
+            short_fused_search=agent_config.short_fused_search,
             long_max_subqueries=agent_config.long_max_subqueries,
             long_max_steps=agent_config.long_max_steps,
             long_budget_tokens=agent_config.long_budget_tokens,
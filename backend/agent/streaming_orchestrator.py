@@ -8,7 +8,10 @@ from typing import AsyncGenerator, Optional, Dict, Any
 
 from .smart_routing_config import SmartRoutingConfig, DEFAULT_CONFIG
 from .smart_probe import compute_probe_signals, compute_routing_score, ProbeSignals
-from .short_path import run_short_path, ShortPathResult
+from .short_path import (
+    retrieve_short_path, stream_answer_short, synthesis_error_message,
+    get_cached_answer, get_similar_cached_answer, cache_answer, ShortPathResult
+)
 from .long_path import run_long_path, LongPathResult
 from .token_manager import validate_response_length, validate_json_response_length
 
@@ -42,9 +45,9 @@ async def stream_smart_orchestration(
         if file_context:
             from .file_context import document_analysis_detector
             
-            should_analyze = document_analysis_detector.should_analyze_document(query, file_context)
+            should_analyze, confidence = document_analysis_detector.analyze(query, file_context)
             if should_analyze:
-                logger.info("Document analysis intent detected, routing to analysis workflow")
+                logger.info(f"Document analysis intent detected (confidence {confidence:.2f}), routing to analysis workflow")
                 async for event in _stream_document_analysis(query, file_context):
                     yield event
                 return
@@ -78,11 +81,24 @@ async def stream_smart_orchestration(
             logger.info("FINAL ROUTE: MAP-REDUCE (completed)")
             return
         
+        # Repeated questions reuse their SHORT path answer
+        cached_answer = get_cached_answer(query, document_id)
+        if cached_answer is not None:
+            yield f"data: {json.dumps({'type': 'response_complete', 'content': cached_answer})}\n\n"
+            logger.info("FINAL ROUTE: SHORT (cached answer)")
+            return
+        
         # Step 1: Probe analysis for regular chat
         yield f"data: {json.dumps({'type': 'thinking_step', 'content': 'Analyzing question...', 'step': 1})}\n\n"
         
         signals = compute_probe_signals(query, config)
         
+        # Near-identical questions are matched with the embedding the probe just computed
+        cached_answer = get_similar_cached_answer(query, signals.query_embedding, document_id)
+        if cached_answer is not None:
+            yield f"data: {json.dumps({'type': 'response_complete', 'content': cached_answer})}\n\n"
+            logger.info("FINAL ROUTE: SHORT (cached answer, similar query)")
+            return
         
         score = compute_routing_score(signals, config)
         
@@ -94,14 +110,11 @@ async def stream_smart_orchestration(
             logger.info(f"   Score: {score:.3f} >= threshold {config.router.threshold}")
             logger.info(f"   Signals: vec_sim={signals.avg_vec_sim:.2f}, fts_rate={signals.fts_hit_rate:.2f}, docs={signals.unique_docs}")
             
-            # Execute SHORT path with progress streaming
+            # Retrieve SHORT path context; escalation only depends on what was found
+            search_desc = f"Searching for: {query[:60]}..."
+            yield f"data: {json.dumps({'type': 'thinking_step', 'content': search_desc, 'step': 2})}\n\n"
             
-            # Stream the SHORT path execution with more granular steps
-            async for step_event in _stream_short_path_execution(query, config, document_id):
-                yield step_event
-            
-            # Get the final result
-            short_result = await run_short_path(query, config, document_id)
+            short_result = await retrieve_short_path(query, config, document_id, signals.query_embedding)
             
             # Check for escalation
             if _should_escalate_from_short(short_result, signals, config):
@@ -115,9 +128,23 @@ async def stream_smart_orchestration(
                 return
             else:
                 yield f"data: {json.dumps({'type': 'thinking_step', 'content': 'Synthesizing answer...', 'step': 8})}\n\n"
+                
+                # Stream the answer as it is generated, then send the validated full text
+                answer_parts = []
+                synthesized = False
+                try:
+                    async for token in stream_answer_short(query, short_result.context, config):
+                        answer_parts.append(token)
+                        yield f"data: {json.dumps({'type': 'response_chunk', 'content': token})}\n\n"
+                    synthesized = True
+                except Exception as e:
+                    logger.error(f"SHORT path synthesis failed: {e}")
+                    answer_parts = [synthesis_error_message(e)]
                                 
                 # Ensure SHORT path response is also JSON-safe
-                validated_answer = validate_response_length(short_result.answer, config)
+                validated_answer = validate_response_length("".join(answer_parts), config)
+                if synthesized:
+                    await cache_answer(query, document_id, validated_answer, signals.query_embedding)
                 try:
                     response_data = {'type': 'response_complete', 'content': validated_answer}
                     response_event = json.dumps(response_data)
@@ -152,30 +179,6 @@ async def stream_smart_orchestration(
         yield f"data: {json.dumps({'type': 'error', 'content': f'Error in smart orchestration: {str(e)}'})}\n\n"
 
 
-async def _stream_short_path_execution(query: str, config: SmartRoutingConfig, document_id: Optional[int] = None) -> AsyncGenerator[str, None]:
-    """Stream SHORT path execution with granular progress"""
-    
-    try:
-        # Import here to avoid circular imports
-        from .short_path import build_context_short_path
-        
-        
-        # Show what we're doing based on whether we have a document_id
-        search_desc = f"Searching for: {query[:60]}..."
-        yield f"data: {json.dumps({'type': 'thinking_step', 'content': search_desc, 'step': 2})}\n\n"
-        
-        # Build context (this is where the RAG tool logging happens)
-        context = await build_context_short_path(query, config, document_id)
-        
-        # Report search results
-        docs_found = len(context.blocks)
-        segments_found = sum(len(block.snippets) for block in context.blocks)
-        
-    except Exception as e:
-        logger.error(f"Error in SHORT path streaming: {e}")
-        yield f"data: {json.dumps({'type': 'thinking_step', 'content': f'Search error: {str(e)}', 'step': 5})}\n\n"
-
-
 async def _stream_long_path_execution(query: str, signals: ProbeSignals, config: SmartRoutingConfig, document_id: Optional[int] = None) -> AsyncGenerator[str, None]:
     """Stream LONG path execution with detailed progress"""
     
@@ -358,7 +361,12 @@ async def _stream_document_analysis(query: str, file_context: Dict[str, Any]) ->
             'framework_ids': file_context.get('framework_ids')
         }
         
-        result = await analysis_tool.execute(analysis_parameters)
+        # Forward each framework section as soon as it has been evaluated
+        sections = []
+        async for section in analysis_tool.execute_streaming(analysis_parameters):
+            sections.append(section)
+            yield f"data: {json.dumps({'type': 'response_chunk', 'content': section})}\n\n"
+        result = "".join(sections)
         
         # Step 5: Complete
         yield f"data: {json.dumps({'type': 'thinking_complete', 'content': 'Document analysis complete', 'execution_summary': {'path': 'DOCUMENT_ANALYSIS', 'filename': file_context.get('filename')}})}\n\n"
@@ -33,13 +33,16 @@ class DatabaseConfig:
     cluster_arn: str
     secret_arn: str
     database_name: str = "postgres"
+    # Concurrent Data API calls: pooled HTTPS connections and blocking I/O threads
+    max_connections: int = 64
     
     @classmethod
     def from_env(cls) -> "DatabaseConfig":
         return cls(
             cluster_arn=os.getenv("RDS_CLUSTER_ARN", ""),
             secret_arn=os.getenv("RDS_SECRET_ARN", ""),
-            database_name=os.getenv("RDS_DATABASE_NAME", "postgres")
+            database_name=os.getenv("RDS_DATABASE_NAME", "postgres"),
+            max_connections=int(os.getenv("RDS_MAX_CONNECTIONS", "64"))
         )
 
 
@@ -68,6 +71,10 @@ class OpenAIConfig:
     model_name: str = "gpt-4o"
     temperature: float = 0.7
     max_tokens: int = 4000
+    timeout_sec: float = 120.0
+    http2: bool = True
+    max_connections: int = 100
+    max_keepalive_connections: int = 50
     
     @property
     def is_configured(self) -> bool:
@@ -79,7 +86,11 @@ class OpenAIConfig:
             api_key=os.getenv("OPENAI_API_KEY", ""),
             model_name=os.getenv("OPENAI_MODEL_NAME", "gpt-4o"),
             temperature=float(os.getenv("OPENAI_TEMPERATURE", "0.7")),
-            max_tokens=int(os.getenv("OPENAI_MAX_TOKENS", "4000"))
+            max_tokens=int(os.getenv("OPENAI_MAX_TOKENS", "4000")),
+            timeout_sec=float(os.getenv("OPENAI_TIMEOUT_SEC", "120")),
+            http2=os.getenv("OPENAI_HTTP2", "true").lower() == "true",
+            max_connections=int(os.getenv("OPENAI_MAX_CONNECTIONS", "100")),
+            max_keepalive_connections=int(os.getenv("OPENAI_MAX_KEEPALIVE_CONNECTIONS", "50"))
         )
 
 
@@ -156,6 +167,7 @@ class AgentConfig:
     short_vector_limit: int = 20
     short_text_limit: int = 20
     short_alpha: float = 0.6
+    short_fused_search: bool = True
     
     # LONG path parameters
     long_max_subqueries: int = 3
@@ -168,6 +180,40 @@ class AgentConfig:
     max_context_tokens: int = 12000
     max_context_chars: int = 48000
     
+    # Plan cache parameters
+    plan_cache_path: str = ":memory:"
+    plan_cache_max_entries: int = 256
+    plan_cache_ttl_sec: int = 7 * 24 * 3600
+    
+    # Session history parameters
+    history_max_entries: int = 100
+    
+    # Orchestrator routing / light response cache parameters
+    orchestrator_cache_max_entries: int = 10000
+    orchestrator_cache_ttl_sec: int = 3600
+    orchestrator_cache_threshold: float = 0.95
+    
+    # Orchestrator routing micro-batch parameters (window 0 disables batching)
+    route_batch_window_ms: float = 20
+    route_batch_max_size: int = 32
+    
+    # Maximum number of planner LLM calls in flight per planner
+    planner_max_concurrency: int = 8
+    
+    # Stream plans and start steps without prerequisites before planning finishes
+    planner_streaming: bool = True
+    
+    # Search tool result cache parameters
+    search_cache_max_entries: int = 256
+    search_cache_ttl_sec: int = 300
+    search_cache_threshold: float = 0.93
+    
+    # SHORT path answer cache parameters
+    answer_cache_enabled: bool = True
+    answer_cache_max_entries: int = 1000
+    answer_cache_ttl_sec: int = 3600
+    answer_cache_threshold: float = 0.98
+    
     @classmethod
     def default(cls) -> "AgentConfig":
         return cls(
@@ -180,13 +226,32 @@ class AgentConfig:
             short_vector_limit=int(os.getenv("AGENT_SHORT_VECTOR_LIMIT", "20")),
             short_text_limit=int(os.getenv("AGENT_SHORT_TEXT_LIMIT", "20")),
             short_alpha=float(os.getenv("AGENT_SHORT_ALPHA", "0.6")),
+            short_fused_search=os.getenv("AGENT_SHORT_FUSED_SEARCH", "true").lower() == "true",
             long_max_subqueries=int(os.getenv("AGENT_LONG_MAX_SUBQUERIES", "3")),
             long_max_steps=int(os.getenv("AGENT_LONG_MAX_STEPS", "5")),
             long_budget_tokens=int(os.getenv("AGENT_LONG_BUDGET_TOKENS", "8000")),
             long_budget_time_sec=int(os.getenv("AGENT_LONG_BUDGET_TIME_SEC", "30")),
             max_response_tokens=int(os.getenv("AGENT_MAX_RESPONSE_TOKENS", "4000")),
             max_context_tokens=int(os.getenv("AGENT_MAX_CONTEXT_TOKENS", "12000")),
-            max_context_chars=int(os.getenv("AGENT_MAX_CONTEXT_CHARS", "48000"))
+            max_context_chars=int(os.getenv("AGENT_MAX_CONTEXT_CHARS", "48000")),
+            plan_cache_path=os.getenv("AGENT_PLAN_CACHE_PATH", ":memory:"),
+            plan_cache_max_entries=int(os.getenv("AGENT_PLAN_CACHE_MAX_ENTRIES", "256")),
+            plan_cache_ttl_sec=int(os.getenv("AGENT_PLAN_CACHE_TTL_SEC", str(7 * 24 * 3600))),
+            history_max_entries=int(os.getenv("AGENT_HISTORY_MAX_ENTRIES", "100")),
+            orchestrator_cache_max_entries=int(os.getenv("AGENT_ORCHESTRATOR_CACHE_MAX_ENTRIES", "10000")),
+            orchestrator_cache_ttl_sec=int(os.getenv("AGENT_ORCHESTRATOR_CACHE_TTL_SEC", "3600")),
+            orchestrator_cache_threshold=float(os.getenv("AGENT_ORCHESTRATOR_CACHE_THRESHOLD", "0.95")),
+            route_batch_window_ms=float(os.getenv("AGENT_ROUTE_BATCH_WINDOW_MS", "20")),
+            route_batch_max_size=int(os.getenv("AGENT_ROUTE_BATCH_MAX_SIZE", "32")),
+            planner_max_concurrency=int(os.getenv("AGENT_PLANNER_MAX_CONCURRENCY", "8")),
+            planner_streaming=os.getenv("AGENT_PLANNER_STREAMING", "true").lower() == "true",
+            search_cache_max_entries=int(os.getenv("AGENT_SEARCH_CACHE_MAX_ENTRIES", "256")),
+            search_cache_ttl_sec=int(os.getenv("AGENT_SEARCH_CACHE_TTL_SEC", "300")),
+            search_cache_threshold=float(os.getenv("AGENT_SEARCH_CACHE_THRESHOLD", "0.93")),
+            answer_cache_enabled=os.getenv("AGENT_ANSWER_CACHE_ENABLED", "true").lower() == "true",
+            answer_cache_max_entries=int(os.getenv("AGENT_ANSWER_CACHE_MAX_ENTRIES", "1000")),
+            answer_cache_ttl_sec=int(os.getenv("AGENT_ANSWER_CACHE_TTL_SEC", "3600")),
+            answer_cache_threshold=float(os.getenv("AGENT_ANSWER_CACHE_THRESHOLD", "0.98"))
         )
 
 
@@ -0,0 +1,23 @@
+-- HNSW index for cosine-distance search over document segments
+--
+-- Every segment search orders by `embedding <=> query` (cosine distance), which
+-- only an index built with vector_cosine_ops can serve; without it each query
+-- walks the whole table. Searches scoped to specific documents materialize those
+-- segments first and stay exact, so only unscoped searches go through the index.
+--
+-- Run each statement on its own (CREATE INDEX CONCURRENTLY cannot run inside a
+-- transaction block), e.g. with psql or one RDS Data API call per statement.
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS document_segments_embedding_hnsw
+    ON document_segments
+    USING hnsw (embedding vector_cosine_ops)
+    WITH (m = 16, ef_construction = 64);
+
+-- Candidate list size for HNSW scans (pgvector's default is 40). Every RDS Data
+-- API call runs in its own session and transaction, so a per-query SET LOCAL
+-- would cost extra round trips; set it as the database default instead.
+DO $$
+BEGIN
+    EXECUTE format('ALTER DATABASE %I SET hnsw.ef_search = 100', current_database());
+END
+$$;
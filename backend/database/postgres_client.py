@@ -1,6 +1,9 @@
 import boto3
+import threading
 import time
-from typing import List, Optional, Dict, Any
+import numpy as np
+from botocore.config import Config as BotoConfig
+from typing import List, Optional, Dict, Any, Tuple
 from database.models import DocumentModel, DocumentSegmentModel, ComplianceGroupModel
 from services.embedding_service import embedding_service
 from utils.logging_config import get_logger, log_database_operation
@@ -10,17 +13,41 @@ from config import settings
 
 logger = get_logger(__name__)
 
+
+def vector_literal(embedding) -> str:
+    """
+    Encode an embedding as a pgvector text literal for RDS Data API parameters
+    
+    pgvector stores float4, so components are rounded to float32 and written with
+    9 significant digits (enough to round-trip any float32). The literal is about
+    a third shorter than one built from Python's float64 repr, and cheaper to build.
+    """
+    return '[' + ','.join(map('{:.9g}'.format, np.asarray(embedding, dtype=np.float32).tolist())) + ']'
+
+
 class PostgresClient:
+    # Compliance group names are read on every analysis report but rarely change
+    GROUP_NAME_CACHE_TTL_SEC = 300
+    GROUP_NAME_CACHE_SIZE = 512
+    
     def __init__(self):
+        # Calls run on worker threads (asyncio.to_thread); botocore keeps only 10
+        # pooled connections by default, so size the pool for that concurrency
         self.rds_client = boto3.client(
             'rds-data',
             aws_access_key_id=settings.aws.access_key_id,
             aws_secret_access_key=settings.aws.secret_access_key,
-            region_name=settings.aws.region
+            region_name=settings.aws.region,
+            config=BotoConfig(
+                max_pool_connections=settings.database.max_connections,
+                tcp_keepalive=True
+            )
         )
         self.database_arn = settings.database.cluster_arn
         self.secret_arn = settings.database.secret_arn
         self.database_name = settings.database.database_name
+        self._group_name_cache: Dict[str, Tuple[float, Optional[str]]] = {}
+        self._group_name_lock = threading.Lock()
     
     @retry_database_operation("execute_statement")
     def execute_statement(self, sql: str, parameters: List = None):
@@ -118,7 +145,7 @@ class PostgresClient:
         logger = get_logger(__name__)
         
         # Convert embedding list to string format for vector type
-        embedding_str = '[' + ','.join(map(str, embedding)) + ']'
+        embedding_str = vector_literal(embedding)
         logger.info(
             "Inserting document segment",
             extra_fields={
@@ -172,7 +199,7 @@ class PostgresClient:
     
     def update_document_embedding(self, document_id: int, embedding: List[float]):
         """Update the document's mean-pooled embedding."""
-        embedding_str = '[' + ','.join(map(str, embedding)) + ']'
+        embedding_str = vector_literal(embedding)
         logger.info(f"Updating document {document_id} embedding with length: {len(embedding)}")
         
         parameters = [
@@ -452,7 +479,7 @@ class PostgresClient:
         """Create a new compliance group and return its ID."""
         # Generate embedding for the compliance group
         embedding = self._generate_compliance_group_embedding(name, description)
-        embedding_str = '[' + ','.join(map(str, embedding)) + ']'
+        embedding_str = vector_literal(embedding)
         
         parameters = [
             {'name': 'name', 'value': {'stringValue': name}},
@@ -473,6 +500,46 @@ class PostgresClient:
         logger.info(f"Created compliance group {group_id} with name: {name} and embedding")
         return group_id
     
+    def get_compliance_group_name(self, group_id: str) -> Optional[str]:
+        """Get the name of a compliance group, cached for GROUP_NAME_CACHE_TTL_SEC."""
+        return self.get_compliance_group_names([group_id]).get(group_id)
+    
+    def get_compliance_group_names(self, group_ids: List[str]) -> Dict[str, Optional[str]]:
+        """Get names for several compliance groups with at most one query; unknown ids map to None."""
+        now = time.monotonic()
+        names: Dict[str, Optional[str]] = {}
+        missing = []
+        with self._group_name_lock:
+            for group_id in dict.fromkeys(group_ids):
+                cached = self._group_name_cache.get(group_id)
+                if cached and now - cached[0] < self.GROUP_NAME_CACHE_TTL_SEC:
+                    names[group_id] = cached[1]
+                else:
+                    missing.append(group_id)
+        
+        if not missing:
+            return names
+        
+        placeholders = ", ".join(f":group_id_{i}::uuid" for i in range(len(missing)))
+        response = self.execute_statement(
+            f"SELECT id, name FROM compliance_frameworks WHERE id IN ({placeholders})",
+            [{'name': f'group_id_{i}', 'value': {'stringValue': group_id}} for i, group_id in enumerate(missing)]
+        )
+        fetched = {record[0].get('stringValue'): record[1].get('stringValue') for record in response['records']}
+        
+        with self._group_name_lock:
+            if len(self._group_name_cache) + len(missing) > self.GROUP_NAME_CACHE_SIZE:
+                self._group_name_cache.clear()
+            for group_id in missing:
+                names[group_id] = fetched.get(group_id)
+                self._group_name_cache[group_id] = (now, names[group_id])
+        return names
+    
+    def clear_compliance_group_name_cache(self):
+        """Drop cached compliance group names."""
+        with self._group_name_lock:
+            self._group_name_cache.clear()
+    
     def update_compliance_group(self, group_id: str, name: Optional[str] = None, description: Optional[str] = None) -> bool:
         """Update a compliance group. Returns True if updated successfully."""
         # If name or description is being updated, we need to regenerate the embedding
@@ -487,7 +554,7 @@ class PostgresClient:
             
             # Generate new embedding
             embedding = self._generate_compliance_group_embedding(final_name, final_description)
-            embedding_str = '[' + ','.join(map(str, embedding)) + ']'
+            embedding_str = vector_literal(embedding)
         
         # Build dynamic update query based on provided fields
         update_fields = []
@@ -518,6 +585,8 @@ class PostgresClient:
         
         # Check if any rows were affected
         updated = response.get('numberOfRecordsUpdated', 0) > 0
+        if updated and name is not None:
+            self.clear_compliance_group_name_cache()
         if updated and (name is not None or description is not None):
             logger.info(f"Updated compliance group {group_id} with new embedding")
         
@@ -532,6 +601,7 @@ class PostgresClient:
             parameters
         )
         
+        self.clear_compliance_group_name_cache()
         logger.info(f"Deleted compliance group {group_id}")
         return response.get('numberOfRecordsUpdated', 0) > 0
     
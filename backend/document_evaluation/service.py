@@ -1,7 +1,10 @@
 import io
 import re
 import json
-from typing import List, Dict, Optional
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import List, Dict, Optional, Tuple, Union
 
 from services.document_parser import document_parser
 from services.text_chunker import text_chunker
@@ -98,22 +101,74 @@ class RuleRelevanceFilter:
 class DocumentEvaluationService:
     """Service for evaluating documents against compliance rules."""
     
+    # Number of parsed documents whose segments are kept for reuse
+    SEGMENT_CACHE_SIZE = 32
+    
     def __init__(self):
         self.relevance_filter = RuleRelevanceFilter()
         self.max_context_chars = 24000
+        self._segment_cache: "OrderedDict[Tuple[str, Union[str, bytes]], List[Tuple[int, str]]]" = OrderedDict()
+        self._segment_lock = threading.Lock()
     
-    def evaluate_document(self, file_stream: io.BytesIO, filename: str, framework_id: str) -> DocumentEvaluationResponse:
-        """Evaluate a document against framework rules without persisting it."""
-        logger.info(f"Starting evaluation of {filename} against framework {framework_id}")
+    def segment_document(self,
+                         file_stream: Optional[io.BytesIO],
+                         filename: str,
+                         document_text: Optional[str] = None) -> List[Tuple[int, str]]:
+        """
+        Parse and chunk a document, reusing the segments of identical content.
         
-        try:
-            # Parse document content
+        Args:
+            file_stream: Raw document, parsed unless document_text is given
+            filename: Name of the file (selects the parser)
+            document_text: Already-parsed document text (optional)
+            
+        Returns:
+            List of (segment_ordinal, segment_text) tuples
+        """
+        if document_text is not None:
+            # Keyed by the text itself: str hashes are cached on the object, so
+            # the document is never re-encoded to UTF-8 just to build a key
+            cache_key = ("", document_text)
+        else:
+            cache_key = (filename, hashlib.blake2b(file_stream.getvalue(), digest_size=16).digest())
+        
+        with self._segment_lock:
+            segments = self._segment_cache.get(cache_key)
+            if segments is not None:
+                self._segment_cache.move_to_end(cache_key)
+                logger.info(f"Reusing {len(segments)} parsed segments for {filename}")
+                return segments
+        
+        if document_text is None:
+            file_stream.seek(0)
             document_text = document_parser.parse_document(file_stream, filename)
             logger.info(f"Parsed document: {len(document_text)} characters")
-            
-            # Chunk into segments
-            segments = text_chunker.chunk_text(document_text)
-            logger.info(f"Created {len(segments)} segments")
+        
+        segments = text_chunker.chunk_text(document_text)
+        logger.info(f"Created {len(segments)} segments")
+        
+        with self._segment_lock:
+            self._segment_cache[cache_key] = segments
+            if len(self._segment_cache) > self.SEGMENT_CACHE_SIZE:
+                self._segment_cache.popitem(last=False)
+        
+        return segments
+    
+    def evaluate_document(self,
+                          file_stream: Optional[io.BytesIO],
+                          filename: str,
+                          framework_id: str,
+                          segments: Optional[List[Tuple[int, str]]] = None) -> DocumentEvaluationResponse:
+        """Evaluate a document against framework rules without persisting it.
+        
+        Pass segments from segment_document() to skip parsing when the same
+        document is evaluated against several frameworks.
+        """
+        logger.info(f"Starting evaluation of {filename} against framework {framework_id}")
+        
+        try:
+            if segments is None:
+                segments = self.segment_document(file_stream, filename)
             
             # Load framework rules
             rules = self._load_framework_rules(framework_id)
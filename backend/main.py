@@ -1,15 +1,34 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from config import settings
 from routes import router
+from agent.llm_clients import close_http_clients
 from utils.logging_config import get_logger
 from utils.error_handler import setup_error_handlers
 
 # Get logger for main application
 logger = get_logger(__name__)
 
-app = FastAPI(title="Chat Backend API", version="1.0.0")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Blocking database calls run via asyncio.to_thread; the default executor
+    # (min(32, cpus + 4) threads) would queue them well before the pool is busy
+    asyncio.get_running_loop().set_default_executor(ThreadPoolExecutor(
+        max_workers=settings.database.max_connections,
+        thread_name_prefix="blocking-io"
+    ))
+    yield
+    # Release pooled OpenAI connections
+    await close_http_clients()
+
+
+app = FastAPI(title="Chat Backend API", version="1.0.0", lifespan=lifespan)
 
 # Setup error handling and logging middleware
 setup_error_handlers(app)
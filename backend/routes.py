@@ -1,3 +1,4 @@
+import asyncio
 import json
 import time
 import io
@@ -105,7 +106,9 @@ async def send_message_stream(
         
         if document_file and document_file.filename:
             try:
-                document_content = await document_file.read()
+                # Bounded read: oversized or non-PDF uploads are rejected before they are fully buffered
+                from agent.file_context import file_context_builder
+                document_content = await file_context_builder.read_file_content(document_file)
                 logger.info(f"Read document file: {document_file.filename} ({len(document_content)} bytes)")
             except Exception as e:
                 logger.error(f"Failed to read document file: {str(e)}")
@@ -384,6 +387,9 @@ async def delete_document(document_id: int):
         # Delete the document and all related data
         postgres_client.delete_document_and_segments(document_id, include_s3_cleanup=True)
         
+        from agent.search_cache import evict_document
+        evict_document(document_id)
+        
         logger.info(
             "Document deleted successfully",
             extra_fields={"document_id": document_id}
@@ -611,6 +617,10 @@ async def create_compliance_group(request: ComplianceGroupCreateRequest):
                 # Re-raise other database errors
                 raise
         
+        # Cached document-to-framework matches predate the new group
+        from services.framework_matcher import framework_matcher
+        framework_matcher.cache_clear()
+        
         # Fetch the created group to return full details
         created_group = postgres_client.get_compliance_group_by_id(group_id)
         
@@ -671,6 +681,10 @@ async def update_compliance_group(group_id: str, request: ComplianceGroupUpdateR
         if not updated:
             raise ValidationError("No fields provided for update")
         
+        # The group embedding may have changed, so cached framework matches are stale
+        from services.framework_matcher import framework_matcher
+        framework_matcher.cache_clear()
+        
         # Fetch the updated group to return full details
         updated_group = postgres_client.get_compliance_group_by_id(group_id)
         
@@ -727,6 +741,10 @@ async def delete_compliance_group(group_id: str):
         if not deleted:
             raise ProcessingError("compliance_group_deletion", "database_operation", "Failed to delete compliance group")
         
+        # Cached framework matches may reference the deleted group
+        from services.framework_matcher import framework_matcher
+        framework_matcher.cache_clear()
+        
         logger.info(
             "Compliance group deleted successfully",
             extra_fields={"group_id": group_id}
@@ -946,7 +964,8 @@ async def evaluate_document(
         
         # Evaluate the document
         from document_evaluation.service import document_evaluation_service
-        result = document_evaluation_service.evaluate_document(
+        result = await asyncio.to_thread(
+            document_evaluation_service.evaluate_document,
             file_stream,
             file.filename,
             framework_id.strip()
@@ -1003,13 +1022,15 @@ async def debug_framework_matching(file: UploadFile = File(...)):
         
         # Read and parse file
         file_content = await file.read()
+        if not file_content or file_content.isspace():
+            raise ValidationError("Document appears to be empty or could not be parsed")
         
         # Parse document
         from services.document_parser import document_parser
         file_stream = io.BytesIO(file_content)
-        document_text = document_parser.parse_document(file_stream, file.filename)
+        document_text = await asyncio.to_thread(document_parser.parse_document, file_stream, file.filename)
         
-        if not document_text.strip():
+        if not document_text or document_text.isspace():
             raise ValidationError("Document appears to be empty or could not be parsed")
         
         # Run debug analysis
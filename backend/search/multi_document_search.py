@@ -1,18 +1,18 @@
 import logging
 from dataclasses import dataclass
 from typing import List, Optional, Dict, Tuple
-from database.postgres_client import postgres_client
+from database.postgres_client import postgres_client, vector_literal
 from services.embedding_service import embedding_service
 
 logger = logging.getLogger(__name__)
 
-@dataclass
+@dataclass(slots=True)
 class ContextBlock:
     document_id: int
     title: str
     snippets: List[str]        # a few chunk texts from the same doc (already ordered)
 
-@dataclass
+@dataclass(slots=True)
 class ContextBundle:
     query: str
     context_text: str          # "{title}\n{snippet}\n{snippet}\n\n{title}\n..."
@@ -20,16 +20,22 @@ class ContextBundle:
 
 def _vector_search_segments(query_embedding: List[float], limit: int = 50, document_id: Optional[int] = None) -> List[Dict]:
     """Perform vector similarity search on document segments."""
-    embedding_str = '[' + ','.join(map(str, query_embedding)) + ']'
+    embedding_str = vector_literal(query_embedding)
     
     if document_id:
-        # Single document search
+        # Single document search. Materializing the document's segments first keeps it
+        # exact; through the HNSW index the filter would apply after the ANN scan and
+        # could return fewer than :limit rows
         sql = """
+        WITH candidates AS MATERIALIZED (
+            SELECT id, document_id, segment_ordinal, text, embedding
+            FROM document_segments
+            WHERE document_id = :document_id
+        )
         SELECT ds.id, ds.document_id, ds.segment_ordinal, ds.text, d.title,
                (ds.embedding <=> :query_embedding::vector) as similarity_score
-        FROM document_segments ds
+        FROM candidates ds
         JOIN documents d ON ds.document_id = d.id
-        WHERE ds.document_id = :document_id
         ORDER BY ds.embedding <=> :query_embedding::vector
         LIMIT :limit
         """
@@ -183,16 +189,17 @@ def _group_results_by_document(results: List[Dict], max_docs: int = 5, max_snipp
     
     return blocks
 
-def _format_context_text(blocks: List[ContextBlock]) -> str:
-    """Format context blocks into a single text string."""
+def format_context_text(blocks: List[ContextBlock]) -> str:
+    """Format context blocks into a single text string (shared by the SHORT and LONG paths)."""
     context_parts = []
     
     for block in blocks:
         context_parts.append(f"{{{block.title}}} [Document ID: {block.document_id}]")
-        for snippet in block.snippets:
-            context_parts.append(snippet)
+        context_parts.extend(block.snippets)
         context_parts.append("")  # Empty line between documents
     
+    if context_parts:
+        context_parts.pop()  # No separator after the last document
     return "\n".join(context_parts).strip()
 
 async def build_grouped_context(
@@ -259,7 +266,7 @@ async def build_grouped_context(
     logger.info(f"Grouped results into {len(blocks)} document blocks")
     
     # Step 4: Format context text
-    context_text = _format_context_text(blocks)
+    context_text = format_context_text(blocks)
     
     return ContextBundle(
         query=query,
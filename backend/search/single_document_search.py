@@ -1,7 +1,7 @@
 import logging
 from dataclasses import dataclass
 from typing import List, Optional, Dict
-from database.postgres_client import postgres_client
+from database.postgres_client import postgres_client, vector_literal
 from services.embedding_service import embedding_service
 from langchain_openai import ChatOpenAI
 from langchain.schema import SystemMessage, HumanMessage
@@ -28,14 +28,20 @@ class SingleDocumentContext:
 
 def _vector_search_single_document(query_embedding: List[float], document_id: int, limit: int = 20) -> List[SingleDocumentResult]:
     """Perform vector similarity search on segments within a single document."""
-    embedding_str = '[' + ','.join(map(str, query_embedding)) + ']'
+    embedding_str = vector_literal(query_embedding)
     
+    # Materializing the document's segments first keeps this an exact search (see
+    # multi_document_search._vector_search_segments)
     sql = """
+    WITH candidates AS MATERIALIZED (
+        SELECT id, document_id, segment_ordinal, text, embedding
+        FROM document_segments
+        WHERE document_id = :document_id
+    )
     SELECT ds.id, ds.segment_ordinal, ds.text, d.title,
            (ds.embedding <=> :query_embedding::vector) as similarity_score
-    FROM document_segments ds
+    FROM candidates ds
     JOIN documents d ON ds.document_id = d.id
-    WHERE ds.document_id = :document_id
     ORDER BY ds.embedding <=> :query_embedding::vector
     LIMIT :limit
     """
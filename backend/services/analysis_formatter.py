@@ -1,5 +1,6 @@
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 from database.postgres_client import postgres_client
+from services.interfaces import FrameworkError
 from utils.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -12,7 +13,7 @@ class AnalysisFormatter:
         Format analysis results into readable chat response.
         
         Args:
-            results: List of DocumentEvaluationResponse objects or error dicts
+            results: List of DocumentEvaluationResponse objects or FrameworkError entries
             filename: Name of the analyzed file
             
         Returns:
@@ -23,12 +24,17 @@ class AnalysisFormatter:
         
         output = [f"## Compliance Analysis Results for {filename}\n"]
         
+        # Resolve every framework name with a single lookup
+        framework_names = self._get_framework_names(
+            [r.framework_id for r in results if type(r) is not FrameworkError]
+        )
+        
         for i, result in enumerate(results, 1):
-            if isinstance(result, dict) and "error" in result:
-                output.append(f"**Framework {i}**: Analysis failed - {result['error']}\n")
+            if type(result) is FrameworkError:
+                output.append(f"**Framework {i}**: Analysis failed - {result.message}\n")
                 continue
             
-            framework_section = self._format_framework_result(result, i)
+            framework_section = self._format_framework_result(result, i, framework_names)
             output.append(framework_section)
         
         # Add overall assessment
@@ -37,15 +43,19 @@ class AnalysisFormatter:
         
         return "\n".join(output)
     
-    def _format_framework_result(self, result: Any, framework_number: int) -> str:
-        """Format individual framework analysis result."""
+    def _get_framework_names(self, framework_ids: List[str]) -> Dict[str, Optional[str]]:
+        """Look up framework display names, falling back to ids if the lookup fails."""
+        if not framework_ids:
+            return {}
         try:
-            # Get framework name
-            framework = postgres_client.get_compliance_group_by_id(result.framework_id)
-            framework_name = framework.name if framework else f"Framework {result.framework_id}"
+            return postgres_client.get_compliance_group_names(framework_ids)
         except Exception as e:
-            logger.error(f"Failed to get framework name for {result.framework_id}: {str(e)}")
-            framework_name = f"Framework {result.framework_id}"
+            logger.error(f"Failed to get framework names for {framework_ids}: {str(e)}")
+            return {}
+    
+    def _format_framework_result(self, result: Any, framework_number: int, framework_names: Dict[str, Optional[str]]) -> str:
+        """Format individual framework analysis result."""
+        framework_name = framework_names.get(result.framework_id) or f"Framework {result.framework_id}"
         
         output = [f"### {framework_name}"]
         output.append(f"**Overall Compliance Score**: {result.overall_compliance_score:.1%}")
@@ -93,7 +103,7 @@ class AnalysisFormatter:
     
     def _generate_overall_assessment(self, results: List[Any]) -> str:
         """Generate overall assessment across all frameworks."""
-        valid_results = [r for r in results if hasattr(r, 'overall_compliance_score')]
+        valid_results = [r for r in results if type(r) is not FrameworkError]
         
         if not valid_results:
             return "**Overall Assessment**: Unable to determine compliance status"
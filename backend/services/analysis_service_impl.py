@@ -2,25 +2,65 @@
 Concrete implementation of AnalysisService.
 """
 
+import asyncio
+import bisect
 import io
-from typing import List, Dict, Any
-from services.interfaces import AnalysisService, AnalysisResult
+from typing import List, Dict, Any, Optional, AsyncGenerator, Tuple
+from services.interfaces import AnalysisService, AnalysisResult, FrameworkError
 from document_evaluation.service import document_evaluation_service
 from utils.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+# Report fragments, rendered with str.format_map
+_FRAMEWORK_HEADER_TEMPLATE = (
+    "## {status_emoji} {framework_name}\n"
+    "**Overall Compliance Score**: {compliance_percent}% ({segments_processed}/{total_segments} segments)\n"
+    "**📝 Summary**: {summary}\n\n"
+)
+_POLICY_FAILURE_TEMPLATE = (
+    "**{index}. {rule_code}**\n"
+    "   - **Issue Type**: {issue_type}\n"
+    "   - **Description**: {description}\n"
+    "   - **Segment**: {segment_info}\n\n"
+)
+_KEY_FAILURE_TEMPLATE = "**{index}. {rule_code}**\n   {description}\n"
+_OVERALL_ASSESSMENT_TEMPLATE = (
+    "## {status_emoji} Overall Assessment: {status_text}\n\n"
+    "**📊 Summary Statistics:**\n"
+    "- Overall Compliance Score: **{avg_score:.1%}**\n"
+    "- Segments Analyzed: **{processed_segments}/{total_segments}**\n\n"
+    "**💡 Recommendation:** {recommendation}\n"
+)
+
+# (minimum compliance percent, emoji, status, recommendation), sorted by threshold
+_STATUS_LADDER = (
+    (0, "❌", "NON-COMPLIANT", "Document has significant compliance issues."),
+    (60, "⚠️", "PARTIALLY COMPLIANT", "Document has compliance gaps that need attention."),
+    (80, "✅", "LARGELY COMPLIANT", "Document meets most compliance requirements."),
+)
+_STATUS_THRESHOLDS = [threshold for threshold, *_ in _STATUS_LADDER]
+
+
+def _status(compliance_percent: float) -> Tuple[str, str, str]:
+    """Return (emoji, status, recommendation) for a 0-100 compliance score."""
+    index = max(bisect.bisect_right(_STATUS_THRESHOLDS, compliance_percent) - 1, 0)
+    return _STATUS_LADDER[index][1:]
+
 
 class AnalysisServiceImpl(AnalysisService):
     """Concrete implementation of AnalysisService."""
     
-    def __init__(self):
+    def __init__(self, max_concurrent_frameworks: int = 10):
         self.evaluation_service = document_evaluation_service
+        # Bounds concurrent framework evaluations against the LLM provider
+        self.max_concurrent_frameworks = max_concurrent_frameworks
     
     async def analyze_document(self, 
                              file_stream: io.BytesIO, 
                              filename: str, 
-                             framework_ids: List[str]) -> AnalysisResult:
+                             framework_ids: List[str],
+                             document_text: Optional[str] = None) -> AnalysisResult:
         """Analyze a document against specified frameworks."""
         try:
             logger.info(f"Analyzing document {filename} against {len(framework_ids)} frameworks")
@@ -33,35 +73,27 @@ class AnalysisServiceImpl(AnalysisService):
                     error="No frameworks provided"
                 )
             
-            # Run analysis against each framework
+            # Parse and chunk once; every framework evaluates the same segments
+            segments = await asyncio.to_thread(
+                self.evaluation_service.segment_document, file_stream, filename, document_text
+            )
+            
+            outcomes = await asyncio.gather(
+                *self._start_evaluations(filename, framework_ids, segments),
+                return_exceptions=True
+            )
+            
             results = []
             successful_results = []
             
-            for framework_id in framework_ids:
-                try:
-                    logger.info(f"Running analysis against framework: {framework_id}")
-                    
-                    # Create fresh file stream for each analysis
-                    file_stream.seek(0)  # Reset stream position
-                    
-                    result = self.evaluation_service.evaluate_document(
-                        file_stream, filename, framework_id
-                    )
-                    
-                    results.append({
-                        "framework_id": framework_id,
-                        "result": result,
-                        "success": True
-                    })
-                    successful_results.append(result)
-                    
-                except Exception as e:
-                    logger.error(f"Analysis failed for framework {framework_id}: {str(e)}")
-                    results.append({
-                        "framework_id": framework_id,
-                        "error": str(e),
-                        "success": False
-                    })
+            for framework_id, outcome in zip(framework_ids, outcomes):
+                if isinstance(outcome, Exception):
+                    logger.error(f"Analysis failed for framework {framework_id}: {str(outcome)}")
+                    results.append(FrameworkError(framework_id, str(outcome)))
+                    continue
+                
+                results.append(outcome)
+                successful_results.append(outcome)
             
             # Check if all analyses failed
             if not successful_results:
@@ -92,8 +124,91 @@ class AnalysisServiceImpl(AnalysisService):
                 error=str(e)
             )
     
+    async def stream_analysis_results(self,
+                                      file_stream: Optional[io.BytesIO],
+                                      filename: str,
+                                      framework_ids: List[str],
+                                      document_text: Optional[str] = None) -> AsyncGenerator[str, None]:
+        """
+        Analyze a document and yield each report section as soon as it is ready.
+        
+        Framework sections are emitted in completion order, so the fastest
+        framework is shown first; the overall summary follows the last one.
+        
+        Raises:
+            ValueError: If no frameworks are given
+            RuntimeError: If every framework analysis failed
+        """
+        if not framework_ids:
+            raise ValueError("No frameworks provided")
+        
+        logger.info(f"Streaming analysis of {filename} against {len(framework_ids)} frameworks")
+        
+        segments = await asyncio.to_thread(
+            self.evaluation_service.segment_document, file_stream, filename, document_text
+        )
+        tasks = self._start_evaluations(filename, framework_ids, segments)
+        framework_names = self._get_framework_names(framework_ids)
+        positions = {task: i for i, task in enumerate(tasks, 1)}
+        
+        yield f"# 📋 Compliance Analysis: {filename}\n\n"
+        
+        # (framework position, result) so the summary does not depend on completion order
+        successful_results = []
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in sorted(done, key=positions.__getitem__):
+                    i = positions[task]
+                    error = task.exception()
+                    if error is not None:
+                        logger.error(f"Analysis failed for framework {framework_ids[i - 1]}: {str(error)}")
+                        yield f"❌ **Framework {i}**: Analysis failed - {str(error)}\n\n"
+                        continue
+                    
+                    result = task.result()
+                    buf = io.StringIO()
+                    self._write_framework_result(result, framework_names, buf)
+                    yield buf.getvalue()
+                    successful_results.append((i, result))
+        finally:
+            # Stop outstanding evaluations if the consumer goes away early
+            for task in pending:
+                task.cancel()
+        
+        successful_results = [result for _, result in sorted(successful_results, key=lambda item: item[0])]
+        
+        if not successful_results:
+            raise RuntimeError("All analyses failed")
+        
+        buf = io.StringIO()
+        self._write_overall_summary(successful_results, buf)
+        # Drop the newline that terminates the last section
+        yield buf.getvalue()[:-1]
+        
+        logger.info(f"Streamed analysis completed: {len(successful_results)}/{len(framework_ids)} frameworks succeeded")
+    
+    def _start_evaluations(self,
+                           filename: str,
+                           framework_ids: List[str],
+                           segments: List[Any]) -> List[asyncio.Task]:
+        """Schedule one evaluation task per framework over shared segments."""
+        # Frameworks are evaluated independently, so run them concurrently
+        semaphore = asyncio.Semaphore(self.max_concurrent_frameworks)
+        
+        async def evaluate(framework_id: str):
+            async with semaphore:
+                logger.info(f"Running analysis against framework: {framework_id}")
+                return await asyncio.to_thread(
+                    self.evaluation_service.evaluate_document,
+                    None, filename, framework_id, segments
+                )
+        
+        return [asyncio.ensure_future(evaluate(framework_id)) for framework_id in framework_ids]
+    
     async def format_analysis_results(self, 
-                                    results: List[Dict[str, Any]], 
+                                    results: List[Any], 
                                     filename: str) -> str:
         """Format analysis results for presentation."""
         try:
@@ -102,29 +217,29 @@ class AnalysisServiceImpl(AnalysisService):
             if not results:
                 return f"❌ **No analysis results available for {filename}**"
             
-            output_sections = []
-            output_sections.append(f"# 📋 Compliance Analysis: {filename}\n")
+            # Every line is written with its newline into one buffer
+            buf = io.StringIO()
+            buf.write(f"# 📋 Compliance Analysis: {filename}\n\n")
+            
+            successful_results = [r for r in results if type(r) is not FrameworkError]
+            
+            # Resolve every framework name with a single lookup
+            framework_names = self._get_framework_names([r.framework_id for r in successful_results])
             
             # Process each framework result
-            successful_results = []
-            for i, result_data in enumerate(results, 1):
-                if not result_data.get("success", False):
-                    error_msg = result_data.get("error", "Unknown error")
-                    output_sections.append(f"❌ **Framework {i}**: Analysis failed - {error_msg}\n")
+            for i, result in enumerate(results, 1):
+                if type(result) is FrameworkError:
+                    buf.write(f"❌ **Framework {i}**: Analysis failed - {result.message}\n\n")
                     continue
                 
-                result = result_data.get("result")
-                if result:
-                    framework_section = self._format_framework_result(result)
-                    output_sections.append(framework_section)
-                    successful_results.append(result)
+                self._write_framework_result(result, framework_names, buf)
             
             # Add overall summary if we have successful results
             if successful_results:
-                overall_summary = self._format_overall_summary(successful_results)
-                output_sections.append(overall_summary)
+                self._write_overall_summary(successful_results, buf)
             
-            formatted_result = "\n".join(output_sections)
+            # Drop the newline that terminates the last section
+            formatted_result = buf.getvalue()[:-1]
             logger.info(f"Successfully formatted analysis results for {filename}")
             
             return formatted_result
@@ -133,64 +248,75 @@ class AnalysisServiceImpl(AnalysisService):
             logger.error(f"Failed to format analysis results: {str(e)}")
             return f"❌ **Error formatting analysis results**: {str(e)}"
     
+    def _get_framework_names(self, framework_ids: List[str]) -> Dict[str, Optional[str]]:
+        """Look up framework display names, falling back to ids if the lookup fails."""
+        if not framework_ids:
+            return {}
+        try:
+            from database.postgres_client import postgres_client
+            return postgres_client.get_compliance_group_names(framework_ids)
+        except Exception as e:
+            logger.error(f"Failed to get framework names: {str(e)}")
+            return {}
+    
     def _generate_overall_summary(self, results: List[Any], filename: str) -> str:
         """Generate overall summary from analysis results."""
         if not results:
             return "No successful analyses to summarize."
         
-        # Calculate statistics
-        total_segments = sum(getattr(r, 'total_segments', 0) for r in results)
-        processed_segments = sum(getattr(r, 'segments_processed', 0) for r in results)
-        avg_score = sum(getattr(r, 'overall_compliance_score', 0) for r in results) / len(results)
+        total_segments, processed_segments, avg_score = self._aggregate_statistics(results)
         
-        # Determine overall status
-        if avg_score >= 0.8:
-            status = "LARGELY COMPLIANT"
-        elif avg_score >= 0.6:
-            status = "PARTIALLY COMPLIANT"
-        else:
-            status = "NON-COMPLIANT"
+        _, status, _ = _status(avg_score * 100)
         
         return f"Overall Status: {status} (Average Score: {avg_score:.1%}, Segments: {processed_segments}/{total_segments})"
     
-    def _format_framework_result(self, result) -> str:
-        """Format individual framework result with detailed policy failures."""
-        try:
-            from database.postgres_client import postgres_client
-            framework = postgres_client.get_compliance_group_by_id(result.framework_id)
-            framework_name = framework.name if framework else f"Framework {result.framework_id}"
-        except Exception:
-            framework_name = f"Framework {result.framework_id}"
+    @staticmethod
+    def _aggregate_statistics(results: List[Any]) -> Tuple[int, int, float]:
+        """Return (total_segments, processed_segments, avg_score) in one pass over results."""
+        total_segments = processed_segments = 0
+        score_sum = 0.0
+        for result in results:
+            total_segments += getattr(result, 'total_segments', 0)
+            processed_segments += getattr(result, 'segments_processed', 0)
+            score_sum += getattr(result, 'overall_compliance_score', 0)
+        return total_segments, processed_segments, score_sum / len(results)
+    
+    def _write_framework_result(self, result, framework_names: Dict[str, Optional[str]], buf: io.StringIO):
+        """Write individual framework result with detailed policy failures."""
+        framework_name = framework_names.get(result.framework_id) or f"Framework {result.framework_id}"
         
         compliance_percent = int(getattr(result, 'overall_compliance_score', 0) * 100)
-        status_emoji = "✅" if compliance_percent >= 80 else "⚠️" if compliance_percent >= 60 else "❌"
-        
-        output = []
-        output.append(f"## {status_emoji} {framework_name}")
-        output.append(f"**Overall Compliance Score**: {compliance_percent}% ({getattr(result, 'segments_processed', 0)}/{getattr(result, 'total_segments', 0)} segments)")
+        status_emoji, _, _ = _status(compliance_percent)
         
         # Add summary if available
         summary = getattr(result, 'summary', 'No summary available')
-        output.append(f"**📝 Summary**: {summary}")
-        output.append("")
+        buf.write(_FRAMEWORK_HEADER_TEMPLATE.format_map({
+            "status_emoji": status_emoji,
+            "framework_name": framework_name,
+            "compliance_percent": compliance_percent,
+            "segments_processed": getattr(result, 'segments_processed', 0),
+            "total_segments": getattr(result, 'total_segments', 0),
+            "summary": summary
+        }))
         
         # Add detailed policy failures
         policy_failures = self._extract_policy_failures(result)
         if policy_failures:
-            output.append("### 🚨 Policy Failures Identified:")
-            output.append("")
-            for i, failure in enumerate(policy_failures, 1):
-                output.append(f"**{i}. {failure['rule_code']}**")
-                output.append(f"   - **Issue Type**: {failure['issue_type'].replace('_', ' ').title()}")
-                output.append(f"   - **Description**: {failure['description']}")
-                output.append(f"   - **Segment**: {failure['segment_info']}")
-                output.append("")
+            buf.write("### 🚨 Policy Failures Identified:\n\n")
+            # All failure blocks are rendered with one join and a single write
+            buf.write("".join(
+                _POLICY_FAILURE_TEMPLATE.format_map({
+                    **failure,
+                    "index": i,
+                    "issue_type": failure['issue_type'].replace('_', ' ').title()
+                })
+                for i, failure in enumerate(policy_failures, 1)
+            ))
         else:
-            output.append("### ✅ No Policy Failures Identified")
-            output.append("The document appears to meet all applicable compliance requirements for this framework.")
-            output.append("")
-        
-        return "\n".join(output)
+            buf.write(
+                "### ✅ No Policy Failures Identified\n"
+                "The document appears to meet all applicable compliance requirements for this framework.\n\n"
+            )
     
     def _extract_policy_failures(self, result) -> List[Dict[str, str]]:
         """Extract detailed policy failures from analysis result."""
@@ -219,48 +345,38 @@ class AnalysisServiceImpl(AnalysisService):
         
         return policy_failures
     
-    def _format_overall_summary(self, results: List[Any]) -> str:
-        """Format overall summary section."""
+    def _write_overall_summary(self, results: List[Any], buf: io.StringIO):
+        """Write overall summary section."""
         if not results:
-            return "## ❌ Overall Assessment\nNo results to assess."
+            buf.write("## ❌ Overall Assessment\nNo results to assess.\n")
+            return
         
-        # Calculate statistics
-        total_segments = sum(getattr(r, 'total_segments', 0) for r in results)
-        processed_segments = sum(getattr(r, 'segments_processed', 0) for r in results)
-        avg_score = sum(getattr(r, 'overall_compliance_score', 0) for r in results) / len(results)
+        # Statistics and policy failures are gathered in one pass over the results
+        total_segments = processed_segments = 0
+        score_sum = 0.0
+        all_failures = []
+        for result in results:
+            total_segments += getattr(result, 'total_segments', 0)
+            processed_segments += getattr(result, 'segments_processed', 0)
+            score_sum += getattr(result, 'overall_compliance_score', 0)
+            all_failures.extend(self._extract_policy_failures(result))
+        avg_score = score_sum / len(results)
         
         # Overall status
-        if avg_score >= 0.8:
-            status_emoji = "✅"
-            status_text = "LARGELY COMPLIANT"
-            recommendation = "Document meets most compliance requirements."
-        elif avg_score >= 0.6:
-            status_emoji = "⚠️"
-            status_text = "PARTIALLY COMPLIANT"
-            recommendation = "Document has compliance gaps that need attention."
-        else:
-            status_emoji = "❌"
-            status_text = "NON-COMPLIANT"
-            recommendation = "Document has significant compliance issues."
+        status_emoji, status_text, recommendation = _status(avg_score * 100)
         
-        output = []
-        output.append(f"## {status_emoji} Overall Assessment: {status_text}")
-        output.append("")
-        output.append(f"**📊 Summary Statistics:**")
-        output.append(f"- Overall Compliance Score: **{avg_score:.1%}**")
-        output.append(f"- Segments Analyzed: **{processed_segments}/{total_segments}**")
-        output.append("")
-        output.append(f"**💡 Recommendation:** {recommendation}")
+        buf.write(_OVERALL_ASSESSMENT_TEMPLATE.format_map({
+            "status_emoji": status_emoji,
+            "status_text": status_text,
+            "avg_score": avg_score,
+            "processed_segments": processed_segments,
+            "total_segments": total_segments,
+            "recommendation": recommendation
+        }))
         
         # Add summary of all policy failures
-        all_failures = []
-        for result in results:
-            failures = self._extract_policy_failures(result)
-            all_failures.extend(failures)
-        
         if all_failures:
-            output.append("")
-            output.append("### 🚨 Key Policy Failures Across All Frameworks:")
+            buf.write("\n### 🚨 Key Policy Failures Across All Frameworks:\n")
             
             # Group failures by rule code to avoid duplicates
             unique_failures = {}
@@ -273,11 +389,10 @@ class AnalysisServiceImpl(AnalysisService):
             top_failures = sorted(unique_failures.values(), 
                                 key=lambda x: {'high': 0, 'medium': 1, 'low': 2}.get(x['severity'], 1))[:5]
             
-            for i, failure in enumerate(top_failures, 1):
-                output.append(f"**{i}. {failure['rule_code']}**")
-                output.append(f"   {failure['description']}")
+            buf.write("".join(
+                _KEY_FAILURE_TEMPLATE.format_map({**failure, "index": i})
+                for i, failure in enumerate(top_failures, 1)
+            ))
             
             if len(all_failures) > 5:
-                output.append(f"   *... and {len(all_failures) - 5} additional policy issues*")
-        
-        return "\n".join(output)
+                buf.write(f"   *... and {len(all_failures) - 5} additional policy issues*\n")
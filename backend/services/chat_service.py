@@ -1,7 +1,7 @@
 import base64
-import json
 import asyncio
-from typing import List, AsyncGenerator
+import orjson
+from typing import List, AsyncGenerator, Union
 from fastapi import UploadFile
 from langchain_openai import ChatOpenAI
 from langchain.schema import SystemMessage, HumanMessage
@@ -116,7 +116,7 @@ Begin reasoning privately when needed, then provide the final response.
         image_data_tuple: tuple = None,
         document_data_tuple: tuple = None,
         document_id: int = None
-    ) -> AsyncGenerator[str, None]:
+    ) -> AsyncGenerator[Union[str, bytes], None]:
         
         # Process image if present - content already read in routes
         has_image = image_data_tuple is not None
@@ -160,7 +160,7 @@ Begin reasoning privately when needed, then provide the final response.
         
         try:
             # First try the old light routing for simple responses
-            routing_result = route_message(message)
+            routing_result = await route_message(message)
             
             # Apply routing logic for simple chitchat
             should_use_light = (
@@ -171,7 +171,7 @@ Begin reasoning privately when needed, then provide the final response.
             
             if should_use_light:
                 # Try light path first
-                light_response = run_light_agent(
+                light_response = await run_light_agent(
                     message,
                     routing_result["intent"],
                     routing_result["query"],
@@ -180,7 +180,7 @@ Begin reasoning privately when needed, then provide the final response.
                 
                 if light_response != "ESCALATE":
                     # Yield light response as a single event
-                    yield f"data: {json.dumps({'type': 'response_complete', 'content': light_response})}\n\n"
+                    yield b"data: " + orjson.dumps({'type': 'response_complete', 'content': light_response}) + b"\n\n"
                     return
             
             # For heavy processing, use streaming smart orchestrator
@@ -203,13 +203,14 @@ Begin reasoning privately when needed, then provide the final response.
                     yield event
             
             # Yield stream end
-            yield f"data: {json.dumps({'type': 'stream_end', 'content': 'Response complete'})}\n\n"
+            yield b"data: " + orjson.dumps({'type': 'stream_end', 'content': 'Response complete'}) + b"\n\n"
                 
         except Exception as e:
             logger.error(f"Smart orchestrator streaming failed: {e}")
             # Fallback to heavy agent streaming on any orchestration errors
             async for event in self.agent.stream_request(message, context, has_image):
-                yield event.to_sse_format()
+                # StreamingResponse writes bytes as-is, skipping a per-chunk re-encode
+                yield event.to_sse_bytes()
     
 
     
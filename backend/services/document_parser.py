@@ -29,10 +29,11 @@ class DocumentParser:
         text_content = []
         for page_num, page in enumerate(reader.pages):
             text = page.extract_text()
-            if text.strip():
+            # isspace() stops at the first non-blank character instead of copying the page
+            if text and not text.isspace():
                 # Clean up each page before combining
                 page_text = self._clean_page_text(text)
-                if page_text.strip():
+                if page_text and not page_text.isspace():
                     text_content.append(page_text)
         
         full_text = '\n\n'.join(text_content)
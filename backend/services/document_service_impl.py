@@ -2,6 +2,7 @@
 Concrete implementation of DocumentService.
 """
 
+import asyncio
 import io
 from typing import Dict, Any, Optional
 from services.interfaces import DocumentService, DocumentParseResult
@@ -33,10 +34,10 @@ class DocumentServiceImpl(DocumentService):
                     error="File stream is empty"
                 )
             
-            # Parse the document
-            document_text = self.parser.parse_document(file_stream, filename)
+            # Parse the document off the event loop; PDF/DOCX parsing is CPU bound
+            document_text = await asyncio.to_thread(self.parser.parse_document, file_stream, filename)
             
-            if not document_text.strip():
+            if not document_text or document_text.isspace():
                 return DocumentParseResult(
                     text="",
                     metadata={"filename": filename},
@@ -120,8 +121,8 @@ class DocumentServiceImpl(DocumentService):
             # Try a quick parse test
             file_stream = io.BytesIO(file_content)
             try:
-                test_text = self.parser.parse_document(file_stream, filename)
-                if not test_text.strip():
+                test_text = await asyncio.to_thread(self.parser.parse_document, file_stream, filename)
+                if not test_text or test_text.isspace():
                     logger.warning(f"Document {filename} appears to be empty")
                     return False
             except Exception as parse_error:
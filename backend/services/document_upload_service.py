@@ -95,6 +95,12 @@ class DocumentUploadService:
             postgres_client.update_document_embedding(document_id, document_embedding)
             logger.info(f"Updated document embedding")
         
+        # Cached searches and answers may no longer reflect the document set
+        from agent.search_cache import evict_document
+        if existing_doc:
+            evict_document(existing_doc.id)
+        evict_document(document_id)
+        
         # Step 11: Return response
         return DocumentUploadResponse(
             document_id=document_id,
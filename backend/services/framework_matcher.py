@@ -1,6 +1,8 @@
-from typing import List, Optional, Dict, Any
+import hashlib
+from collections import OrderedDict
+from typing import List, Optional, Dict, Any, Tuple
 from services.embedding_service import embedding_service
-from database.postgres_client import postgres_client
+from database.postgres_client import postgres_client, vector_literal
 from utils.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -8,8 +10,14 @@ logger = get_logger(__name__)
 class FrameworkMatcher:
     """Service for matching documents to relevant compliance frameworks using embeddings."""
     
+    # Number of document samples whose matches are remembered
+    MATCH_CACHE_SIZE = 256
+    
     def __init__(self, similarity_threshold: float = 0.3):
         self.similarity_threshold = similarity_threshold
+        self._match_cache: "OrderedDict[Tuple[str, int], List[str]]" = OrderedDict()
+        self._cache_hits = 0
+        self._cache_misses = 0
     
     async def find_relevant_frameworks(self, document_text: str, max_frameworks: int = 3) -> List[str]:
         """
@@ -22,11 +30,26 @@ class FrameworkMatcher:
         Returns:
             List of framework IDs ordered by relevance
         """
+        if not document_text or document_text.isspace():
+            logger.warning("Skipping framework matching for empty document")
+            return []
+        
+        # Generate embedding for document (use first 2000 chars for efficiency)
+        doc_text_sample = document_text[:2000] if len(document_text) > 2000 else document_text
+        
+        # Only the sample is embedded, so it fully determines the match
+        cache_key = (hashlib.blake2b(doc_text_sample.encode("utf-8"), digest_size=16).hexdigest(), max_frameworks)
+        cached = self._match_cache.get(cache_key)
+        if cached is not None:
+            self._match_cache.move_to_end(cache_key)
+            self._cache_hits += 1
+            logger.info(f"Reusing {len(cached)} cached framework matches")
+            return list(cached)
+        self._cache_misses += 1
+        
         try:
-            # Generate embedding for document (use first 2000 chars for efficiency)
-            doc_text_sample = document_text[:2000] if len(document_text) > 2000 else document_text
             doc_embedding = embedding_service.generate_embedding(doc_text_sample)
-            embedding_str = '[' + ','.join(map(str, doc_embedding)) + ']'
+            embedding_str = vector_literal(doc_embedding)
             
             # Query for similar frameworks using vector similarity
             sql = """
@@ -55,12 +78,33 @@ class FrameworkMatcher:
                     logger.info(f"Found relevant framework: {framework_name} (similarity: {similarity:.2f})")
             
             # Limit to requested number
-            return relevant_frameworks[:max_frameworks]
+            relevant_frameworks = relevant_frameworks[:max_frameworks]
+            
+            # Misses are not cached so newly added frameworks can still match
+            if relevant_frameworks:
+                self._match_cache[cache_key] = relevant_frameworks
+                if len(self._match_cache) > self.MATCH_CACHE_SIZE:
+                    self._match_cache.popitem(last=False)
+            
+            return list(relevant_frameworks)
             
         except Exception as e:
             logger.error(f"Error finding relevant frameworks: {str(e)}")
             raise RuntimeError(f"Failed to find relevant frameworks: {str(e)}")
     
+    def cache_info(self) -> Dict[str, int]:
+        """Framework match cache statistics."""
+        return {
+            "hits": self._cache_hits,
+            "misses": self._cache_misses,
+            "size": len(self._match_cache),
+            "max_size": self.MATCH_CACHE_SIZE
+        }
+    
+    def cache_clear(self):
+        """Forget all cached framework matches."""
+        self._match_cache.clear()
+    
     async def debug_framework_matching(self, document_text: str) -> Dict[str, Any]:
         """Debug method to show detailed framework matching information."""
         try:
@@ -85,7 +129,7 @@ class FrameworkMatcher:
             # Generate embedding for document
             doc_text_sample = document_text[:2000] if len(document_text) > 2000 else document_text
             doc_embedding = embedding_service.generate_embedding(doc_text_sample)
-            embedding_str = '[' + ','.join(map(str, doc_embedding)) + ']'
+            embedding_str = vector_literal(doc_embedding)
             
             # Get similarity scores for all frameworks with embeddings
             similarity_sql = """
@@ -4,7 +4,7 @@ Service interfaces for dependency injection.
 
 from abc import ABC, abstractmethod
 from typing import List, Dict, Any, Optional, AsyncGenerator
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import io
 
 
@@ -35,15 +35,49 @@ class FrameworkMatchResult:
     reasoning: str
 
 
+@dataclass(slots=True)
+class FrameworkError:
+    """A framework whose analysis failed."""
+    framework_id: str
+    message: str
+
+
 @dataclass
 class AnalysisResult:
-    """Result from document analysis operations."""
-    framework_results: List[Dict[str, Any]]
+    """Result from document analysis operations.
+    
+    framework_results holds one DocumentEvaluationResponse or FrameworkError
+    per requested framework, in request order.
+    """
+    framework_results: List[Any]
     overall_summary: str
     success: bool
     error: Optional[str] = None
 
 
+@dataclass
+class AnalysisReport:
+    """Structured outcome of a document analysis; markdown is rendered on demand.
+    
+    Consumers that only need scores read frameworks directly and never pay
+    for formatting.
+    """
+    filename: str
+    frameworks: List[Any]
+    overall_summary: str
+    formatter: "AnalysisService" = field(repr=False, compare=False)
+    
+    @property
+    def overall_score(self) -> Optional[float]:
+        """Average compliance score over the frameworks that were analyzed."""
+        scores = [r.overall_compliance_score for r in self.frameworks if type(r) is not FrameworkError]
+        return sum(scores) / len(scores) if scores else None
+    
+    async def to_markdown(self) -> str:
+        """Render the report for display."""
+        return await self.formatter.format_analysis_results(self.frameworks, self.filename)
+
+
 class DocumentService(ABC):
     """Abstract service for document operations."""
     
@@ -108,13 +142,23 @@ class AnalysisService(ABC):
     async def analyze_document(self, 
                              file_stream: io.BytesIO, 
                              filename: str, 
-                             framework_ids: List[str]) -> AnalysisResult:
-        """Analyze a document against specified frameworks."""
+                             framework_ids: List[str],
+                             document_text: Optional[str] = None) -> AnalysisResult:
+        """Analyze a document against specified frameworks, reusing document_text if already parsed."""
+        pass
+    
+    @abstractmethod
+    async def stream_analysis_results(self,
+                                      file_stream: Optional[io.BytesIO],
+                                      filename: str,
+                                      framework_ids: List[str],
+                                      document_text: Optional[str] = None) -> AsyncGenerator[str, None]:
+        """Analyze a document and yield formatted report sections as they complete."""
         pass
     
     @abstractmethod
     async def format_analysis_results(self, 
-                                    results: List[Dict[str, Any]], 
+                                    results: List[Any], 
                                     filename: str) -> str:
         """Format analysis results for presentation."""
         pass
@@ -2,15 +2,19 @@
 Concrete implementation of SearchService.
 """
 
+import re
 from typing import List, Dict, Any, Optional
 from services.interfaces import SearchService, SearchResult
 from search.multi_document_search import build_grouped_context
 from services.embedding_service import embedding_service
-from database.postgres_client import postgres_client
+from database.postgres_client import postgres_client, vector_literal
 from utils.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+# Snippet format: "[§ordinal] text"
+_CITATION_RE = re.compile(r"\[§(\d+)\]\s?(.*)", re.DOTALL)
+
 
 class SearchServiceImpl(SearchService):
     """Concrete implementation of SearchService."""
@@ -49,19 +53,16 @@ class SearchServiceImpl(SearchService):
                 total_snippets += len(block.snippets)
                 
                 # Extract citation information from snippets
-                for snippet in block.snippets:
-                    # Parse snippet format: "[§ordinal] text"
-                    if snippet.startswith("[§") and "]" in snippet:
-                        ordinal_end = snippet.find("]")
-                        ordinal = snippet[2:ordinal_end]
-                        text = snippet[ordinal_end + 2:]  # Skip "] "
-                        
-                        citations.append({
-                            "document_id": block.document_id,
-                            "segment_ordinal": int(ordinal),
-                            "text": text.strip(),
-                            "document_title": block.title
-                        })
+                citations.extend(
+                    {
+                        "document_id": block.document_id,
+                        "segment_ordinal": int(match.group(1)),
+                        "text": match.group(2).strip(),
+                        "document_title": block.title
+                    }
+                    for match in map(_CITATION_RE.match, block.snippets)
+                    if match
+                )
             
             result = SearchResult(
                 documents_found=len(context_bundle.blocks),
@@ -105,7 +106,7 @@ class SearchServiceImpl(SearchService):
             """
             
             # Convert embedding to PostgreSQL vector format
-            embedding_str = '[' + ','.join(map(str, embedding)) + ']'
+            embedding_str = vector_literal(embedding)
             
             response = self.db_client.execute_statement(
                 sql.replace('%s', ':param'),
@@ -108,6 +108,12 @@ export function useStreamingChat() {
                         ? { ...msg, text: msg.text + parsed.data, isThinking: false }
                         : msg
                     ));
+                  } else if (parsed.type === 'response_chunk') {
+                    setMessages(prev => prev.map(msg =>
+                      msg.id === botMessageId
+                        ? { ...msg, text: msg.text + parsed.content, isThinking: false }
+                        : msg
+                    ));
                   } else if (parsed.type === 'error') {
                     console.error('Streaming error:', parsed.content);
                     setMessages(prev => prev.map(msg => 